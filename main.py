@@ -3,64 +3,30 @@ import argparse
 import backtrader as bt
 from datetime import datetime, timedelta
 import logging
+import functools
 import json
 import sys
-import numpy as np
-
-from backtrader.observers import BuySell
+import math
+from types import MappingProxyType
 
 from src.data_fetcher import DataFetcher
+from src.bar_feed import PreloadedBarsData, frame_to_bar_columns
 from src.magic_nine_strategy import MagicNineStrategy
 from src.magic_nine_strategy_with_stoploss import MagicNineStrategyWithStopLoss
 from src.magic_nine_strategy_with_advanced_stoploss import MagicNineStrategyWithAdvancedStopLoss
 from src.magic_nine_strategy_with_smart_stoploss import MagicNineStrategyWithSmartStopLoss
-from src.multi_asset_strategy import MultiAssetStrategy
-from src.strategy_selector import StrategySelector, StrategyType
-from src.market_analyzer import MarketAnalyzer
-from src.adaptive_strategy import AdaptiveStrategy
 from src.trading_fee_util import TradingFeeUtil
-# 导入配置系统和参数优化器
-from src.config_system import SymbolConfig, StrategyFactory
-from src.parameter_optimizer import ParameterOptimizer
+from src.utils import get_nested
+# 导入配置系统（参数优化器、自适应策略相关模块只在对应模式下才导入）
+from src.config_system import SymbolConfig, StrategyFactory, filter_strategy_params
 # 导入自定义分析器
 from src.analyzers.sortino_ratio import SortinoRatio
+from src.analyzers.custom_drawdown import CustomDrawDown
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# 自定义回撤分析器
-class CustomDrawDown(bt.Analyzer):
-    """自定义回撤分析器，确保计算正确的回撤值"""
-    
-    def __init__(self):
-        self.peak = 0.0
-        self.valley = float('inf')
-        self.max_dd = 0.0
-        self.max_dd_len = 0
-        self.dd_len = 0
-        
-    def next(self):
-        # 获取当前资金曲线值
-        value = self.strategy.broker.getvalue()
-        
-        # 更新峰值
-        if value > self.peak:
-            self.peak = value
-            self.dd_len = 0
-        else:
-            self.dd_len += 1
-            
-        # 计算回撤
-        if self.peak > 0:
-            dd = (self.peak - value) / self.peak
-            if dd > self.max_dd:
-                self.max_dd = dd
-                self.max_dd_len = self.dd_len
-        
-    def get_analysis(self):
-        return {'max': {'drawdown': self.max_dd, 'len': self.max_dd_len}}
-
 def parse_args():
     """解析命令行参数"""
     parser = argparse.ArgumentParser(description='神奇九转策略回测')
@@ -143,6 +109,8 @@ def parse_args():
                              help='参数优化时测试的参数组合数量')
     optimize_group.add_argument('--optimization-output', type=str, default='logs/optimization',
                              help='优化结果输出目录')
+    optimize_group.add_argument('--optimize-workers', type=int, default=1,
+                             help='参数优化并行进程数(默认1为串行，0为使用全部CPU核数，仅支持fork的平台生效)')
     
     return parser.parse_args()
 
@@ -155,42 +123,224 @@ def fetch_data(symbol, days, use_cache, data_fetcher):
     
     # 如果使用缓存，输出使用缓存的信息
     if use_cache:
-        logger.info(f"使用缓存模式获取数据: {symbol}")
+        logger.info("使用缓存模式获取数据: %s", symbol)
     
-    # 获取数据并准备用于backtrader
+    # 获取数据，数据源直接由DataFrame构建，不再写出backtrader数据文件
     df = data_fetcher.get_bar_data(symbol, begin_time=start_date, end_time=end_date, use_cache=use_cache)
-    data_file = data_fetcher.prepare_backtrader_data(symbol, df)
     
-    if data_file is None:
-        logger.error(f"无法获取或准备 {symbol} 的数据")
+    if df is None or df.empty:
+        logger.error("无法获取或准备 %s 的数据", symbol)
         return None
     
-    # 创建backtrader数据源
-    data = bt.feeds.GenericCSVData(
-        dataname=data_file,
-        datetime=0,
-        open=1,
-        high=2,
-        low=3,
-        close=4,
-        volume=5,
-        openinterest=-1,
-        dtformat='%Y-%m-%d %H:%M:%S',
-        timeframe=bt.TimeFrame.Minutes
-    )
+    # 创建backtrader数据源：直接回放已加载的DataFrame
+    data = PreloadedBarsData(columns=frame_to_bar_columns(df), timeframe=bt.TimeFrame.Minutes)
     return data
 
-def main():
-    """主函数"""
-    # 解析命令行参数
-    args = parse_args()
+# 辅助函数：为所有标的获取数据并添加到Cerebro
+def add_symbol_data(cerebro, args, data_fetcher):
+    """获取各标的的数据并添加到Cerebro，无法获取数据的标的跳过
+    
+    参数:
+        cerebro: Cerebro实例
+        args: 命令行参数
+        data_fetcher: 数据获取器
+        
+    返回:
+        [(标的代码, 添加后的数据源)] 列表
+    """
+    feeds = []
+    for symbol in args.symbols:
+        data = fetch_data(symbol, args.days, args.use_cache, data_fetcher)
+        if data is None:
+            continue
+        feeds.append((symbol, cerebro.adddata(data, name=symbol)))
+    return feeds
+
+# 回测使用的分析器及其参数，模块加载时构建一次
+_ANALYZER_SPECS = (
+    (bt.analyzers.SharpeRatio, dict(_name='sharpe_ratio', riskfreerate=0.0, annualize=True,
+                                    timeframe=bt.TimeFrame.Days, compression=1440)),
+    (SortinoRatio, dict(_name='sortino_ratio', riskfreerate=0.0, annualize=True,
+                        timeframe=bt.TimeFrame.Days)),  # 使用自定义索提诺比率分析器
+    (bt.analyzers.Calmar, dict(_name='calmar', timeframe=bt.TimeFrame.Days)),  # 卡尔玛比率
+    (CustomDrawDown, dict(_name='drawdown')),
+    (bt.analyzers.TradeAnalyzer, dict(_name='trade_analyzer')),
+    (bt.analyzers.SQN, dict(_name='sqn')),
+    (bt.analyzers.AnnualReturn, dict(_name='annual')),  # 年化收益率
+    (bt.analyzers.PeriodStats, dict(_name='period_stats')),  # 周期统计
+)
+
+# 分析结果缺失某一层时使用的共享空映射，只读，避免每次取值都新建字典
+_EMPTY = MappingProxyType({})
+
+def _pct(fraction):
+    """将比例值格式化为保留两位小数的百分比字符串"""
+    return f"{fraction * 100:.2f}%"
+
+def _pnl_ratio(won, lost):
+    """盈利与亏损（负数）之比的绝对值，没有亏损时为无穷大"""
+    return abs(won / lost) if lost != 0 else math.inf
+
+def _append_ratio(lines, analysis, key, label):
+    """
+    将比率类分析结果格式化后追加到输出行，值缺失或非有限数时输出"无效"
+    
+    参数:
+        lines: 输出行列表
+        analysis: 分析器的get_analysis()结果，为空时不输出
+        key: 比率在分析结果中的键名
+        label: 输出标签
+    """
+    if not analysis:
+        return
+    value = analysis.get(key, 0.0)
+    if value is not None and math.isfinite(value):
+        lines.append(f"{label}: {value:.4f}")
+    else:
+        lines.append(f"{label}: 无效")
+
+def _emit_summary(strategy, final_value, args):
+    """
+    汇总回测结果并一次性输出到日志
+    
+    所有结果行先收集到列表中，最后通过一次logger.info调用输出，
+    避免逐行经过日志处理器带来的格式化和IO开销。
+    
+    参数:
+        strategy: 回测完成后的策略实例
+        final_value: 最终资金
+        args: 命令行参数
+    """
+    # INFO级别被过滤时（如批量优化以WARNING运行）直接跳过全部格式化工作
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    
+    lines = []
+    lines.append(f"最终资金: {final_value:.2f}")
+    lines.append(f"总收益率: {_pct(final_value / args.cash - 1)}")
     
-    # 设置日志级别
-    if args.verbose:
-        logger.setLevel(logging.DEBUG)
+    # 获取分析结果
+    analyzers = strategy.analyzers
+    _append_ratio(lines, analyzers.sharpe_ratio.get_analysis(), 'sharperatio', "夏普比率")
+    # 索提诺比率（自定义分析器的键名为'sortinoratio'）
+    _append_ratio(lines, analyzers.sortino_ratio.get_analysis(), 'sortinoratio', "索提诺比率")
+    
+    # 使用自定义回撤分析器结果
+    drawdown = analyzers.drawdown.get_analysis()
+    if drawdown:
+        dd_max = drawdown.get('max') or _EMPTY
+        max_drawdown = dd_max.get('drawdown', 0.0)
+        max_dd_len = dd_max.get('len', 0)
+        lines.append(f"最大回撤: {_pct(max_drawdown)}，持续周期: {max_dd_len}")
+            
+    # 添加卡尔玛比率
+    _append_ratio(lines, analyzers.calmar.get_analysis(), 'calmar', "卡尔玛比率")
+            
+    # 添加年化收益率
+    annual = analyzers.annual.get_analysis()
+    if annual:
+        # 显示最近一年的年化收益率，或者整个回测期间的平均年化收益率
+        years = list(annual.keys())
+        if years:
+            latest_year = max(years)
+            lines.append(f"年化收益率: {_pct(annual[latest_year])}")
+                
+    # 获取周期统计数据
+    period_stats = analyzers.period_stats.get_analysis()
+    if period_stats:
+        if 'rnorm100' in period_stats:
+            norm_return = period_stats['rnorm100']
+            lines.append(f"标准化百日收益率: {norm_return:.2f}%")
+        if 'volatility' in period_stats:
+            lines.append(f"价格波动率: {_pct(period_stats['volatility'])}")
+
+    trade_analyzer = analyzers.trade_analyzer.get_analysis()
+    
+    # 简单检查是否有交易发生（更安全的方式）
+    if trade_analyzer:  # 如果有分析结果
+        # 一次性取出交易统计的各级子字典，后续直接按键取值
+        ta_total = trade_analyzer.get('total') or _EMPTY
+        ta_won = trade_analyzer.get('won') or _EMPTY
+        ta_lost = trade_analyzer.get('lost') or _EMPTY
+        won_pnl = ta_won.get('pnl') or _EMPTY
+        lost_pnl = ta_lost.get('pnl') or _EMPTY
+        
+        if 'closed' in ta_total:
+            total_trades = ta_total['closed']
+            days = args.days
+            lines.append(f"总交易次数: {total_trades}")
+            lines.append(f"平均每天交易次数: {total_trades / days:.2f}")
+            
+            if 'total' in ta_won:
+                winning_trades = ta_won['total']
+                win_rate = winning_trades / total_trades if total_trades > 0 else 0
+                lines.append(f"盈利交易次数: {winning_trades}")
+                lines.append(f"胜率: {_pct(win_rate)}")
+                
+                # 添加平均盈亏比
+                avg_won = won_pnl.get('average', 0)
+                avg_lost = lost_pnl.get('average', 0)
+                if avg_lost < 0:  # 确保分母为负数转为正数
+                    lines.append(f"平均盈亏比: {_pnl_ratio(avg_won, avg_lost):.2f}")
+                
+                # 添加盈利因子
+                gross_won = won_pnl.get('total', 0)
+                gross_lost = lost_pnl.get('total', 0)
+                if gross_lost < 0:  # 确保分母为负数转为正数
+                    lines.append(f"盈利因子: {_pnl_ratio(gross_won, gross_lost):.2f}")
+                
+                # 添加期望收益
+                expected_return = win_rate * avg_won + (1 - win_rate) * avg_lost
+                lines.append(f"每笔交易期望收益: {expected_return:.2f}")
+                
+                # 添加最大连续盈利和亏损次数
+                max_win_streak = get_nested(trade_analyzer, 'streak', 'won', 'longest')
+                max_loss_streak = get_nested(trade_analyzer, 'streak', 'lost', 'longest')
+                lines.append(f"最大连续盈利次数: {max_win_streak}")
+                lines.append(f"最大连续亏损次数: {max_loss_streak}")
+        else:
+            lines.append("没有交易发生")
     else:
-        logger.setLevel(logging.INFO)
+        lines.append("没有交易分析数据")
+    
+    # 输出SQN
+    sqn_analyzer = analyzers.sqn.get_analysis()
+    if sqn_analyzer:
+        sqn_value = sqn_analyzer.get('sqn', 0.0)
+        if math.isfinite(sqn_value):
+            lines.append(f"系统质量指标(SQN): {sqn_value:.4f}")
+    
+    # 如果使用了自适应策略，输出策略切换统计信息
+    if args.adaptive and hasattr(strategy, 'strategy_switches'):
+        strategy_switches = strategy.strategy_switches
+        lines.append(f"策略切换次数: {len(strategy_switches)}")
+        strategy_usage = strategy.strategy_usage_count
+        total_bars = sum(strategy_usage.values())
+        
+        for strategy_type, count in strategy_usage.items():
+            usage = count / total_bars if total_bars > 0 else 0
+            lines.append(f"策略 {strategy_type.value} 使用比例: {_pct(usage)}")
+        
+        lines.append("策略切换详情:")
+        for i, switch in enumerate(strategy_switches[:10]):  # 只显示前10个切换
+            lines.append(f"  {i+1}. 日期: {switch['date']} 从 {switch['from'].value} 切换到 {switch['to'].value} 原因: {switch['reason']}")
         
+        if len(strategy_switches) > 10:
+            lines.append(f"  ... 共 {len(strategy_switches)} 次切换")
+    
+    logger.info("\n".join(lines))
+
+@functools.lru_cache(maxsize=None)
+def _setup_file_logging():
+    """
+    为根日志器添加文件处理器（进程内只执行一次）
+    
+    在同一进程中多次调用main()（如批量参数扫描）时复用已安装的处理器，
+    避免处理器重复挂载导致每条日志被重复格式化和写入。
+    
+    返回:
+        日志文件路径
+    """
     # 确保日志目录存在
     os.makedirs("logs", exist_ok=True)
     
@@ -199,26 +349,38 @@ def main():
     file_handler = logging.FileHandler(log_path, encoding='utf-8')
     file_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
     logging.getLogger().addHandler(file_handler)
+    return log_path
+
+def main():
+    """主函数"""
+    # 解析命令行参数
+    args = parse_args()
     
-    logger.info(f"日志将保存到: {log_path}")
+    # 设置日志级别
+    if args.verbose:
+        logger.setLevel(logging.DEBUG)
+    else:
+        logger.setLevel(logging.INFO)
+        
+    log_path = _setup_file_logging()
+    logger.info("日志将保存到: %s", log_path)
     
     # 处理生成默认配置的情况
     if args.generate_default_config:
         config_path = args.symbol_config
         config = SymbolConfig()
         saved_path = config.save_config(config_path)
-        logger.info(f"已生成默认配置文件: {saved_path}")
+        logger.info("已生成默认配置文件: %s", saved_path)
         sys.exit(0)
     
-    # 创建缓存目录
+    # 初始化数据获取器（缓存目录由DataFetcher创建）
     cache_dir = 'data/cache'
-    os.makedirs(cache_dir, exist_ok=True)
-    
-    # 初始化数据获取器
     data_fetcher = DataFetcher(config_path=args.config, private_key_path=args.key, cache_dir=cache_dir)
     
     # 处理参数优化
     if args.optimize_params or args.optimize_all or args.optimize_strategy_types:
+        from src.parameter_optimizer import ParameterOptimizer
+        
         optimizer = ParameterOptimizer(
             days=args.days,
             cash=args.cash,
@@ -228,36 +390,42 @@ def main():
             optimize_metrics=args.optimize_metrics,
             output_dir=args.optimization_output,
             api_config_path=args.config,
-            api_key_path=args.key
+            api_key_path=args.key,
+            max_workers=args.optimize_workers
         )
         
         if args.optimize_params:
-            logger.info(f"开始为指定标的优化参数...")
+            logger.info("开始为指定标的优化参数...")
             for symbol in args.symbols:
                 optimizer.optimize_strategy_params(symbol)
         elif args.optimize_strategy_types:
-            logger.info(f"开始为指定标的优化策略类型...")
+            logger.info("开始为指定标的优化策略类型...")
             for symbol in args.symbols:
                 optimizer.optimize_strategy_types(symbol)
         elif args.optimize_all:
-            logger.info(f"开始为所有支持的标的优化参数...")
+            logger.info("开始为所有支持的标的优化参数...")
             optimizer.optimize_all_symbols()
         
         logger.info("参数优化完成")
         sys.exit(0)
     
     # 显示初始资金
-    logger.info(f"初始资金: {args.cash:.2f}")
+    logger.info("初始资金: %.2f", args.cash)
+    
+    # 只有少量标的且不禁用绘图时才绘图
+    plot_enabled = len(args.symbols) <= 2 and not args.no_plot
     
     # 创建Cerebro实例
-    cerebro = bt.Cerebro(oldbuysell=True)
+    # 不绘图时不添加买卖点和交易观察器，它们只为绘图逐根K线记录数据
+    # 注意不能使用exactbars：它会关闭runonce，且神奇九转指标的next需要完整的历史K线
+    cerebro = bt.Cerebro(oldbuysell=True, stdstats=plot_enabled)
     
     # 设置初始资金
     cerebro.broker.setcash(args.cash)
     
     # 设置交易费用和滑点
     if args.real_costs:
-        logger.info(f"使用真实交易成本(券商: {args.broker_type}, 滑点: {args.slippage})")
+        logger.info("使用真实交易成本(券商: %s, 滑点: %s)", args.broker_type, args.slippage)
         
         # 创建自定义佣金计算类
         class CustomCommissionInfo(bt.CommInfoBase):
@@ -310,9 +478,9 @@ def main():
     if args.weights:
         try:
             weights = json.loads(args.weights)
-            logger.info(f"使用自定义资产权重: {weights}")
+            logger.info("使用自定义资产权重: %s", weights)
         except json.JSONDecodeError:
-            logger.error(f"权重解析错误，请使用正确的JSON格式。使用平均权重。")
+            logger.error("权重解析错误，请使用正确的JSON格式。使用平均权重。")
     
     # 加载配置
     symbol_config = SymbolConfig.load_config(args.symbol_config)
@@ -322,12 +490,13 @@ def main():
     if args.adaptive:
         logger.info("使用自适应策略(动态策略选择)")
         
+        # 市场分析器依赖talib和sklearn，只在自适应模式下导入
+        from src.market_analyzer import MarketAnalyzer
+        from src.strategy_selector import StrategySelector
+        from src.adaptive_strategy import AdaptiveStrategy
+        
         # 添加数据
-        for symbol in args.symbols:
-            data = fetch_data(symbol, args.days, args.use_cache, data_fetcher)
-            if data is None:
-                continue
-            cerebro.adddata(data, name=symbol)
+        add_symbol_data(cerebro, args, data_fetcher)
         
         # 初始化市场分析器
         market_analyzer = MarketAnalyzer(
@@ -368,15 +537,7 @@ def main():
         # 多资产模式 - 为每个标的创建独立的策略实例
         logger.info("使用多资产独立交易策略(基于配置)")
         
-        for symbol in args.symbols:
-            # 获取数据
-            data = fetch_data(symbol, args.days, args.use_cache, data_fetcher)
-            if data is None:
-                continue
-            
-            # 添加数据
-            data_feed = cerebro.adddata(data, name=symbol)
-            
+        for symbol, data_feed in add_symbol_data(cerebro, args, data_fetcher):
             # 获取标的特定的策略和参数
             strategy_class, strategy_params = strategy_factory.create_strategy(symbol)
             
@@ -401,25 +562,15 @@ def main():
                 strategy_params['trailing_stop'] = False
             
             # 再次过滤参数以确保兼容性
-            for key in list(strategy_params.keys()):
-                try:
-                    # 尝试访问参数，如果不存在会抛出异常
-                    getattr(strategy_class.params, key)
-                except AttributeError:
-                    logger.debug(f"参数 {key} 不适用于策略类 {strategy_class.__name__}，将被忽略")
-                    strategy_params.pop(key, None)
+            filter_strategy_params(strategy_class, strategy_params)
             
             # 创建策略并关联特定的数据
             cerebro.addstrategy(strategy_class, data=data_feed, **strategy_params)
             
-            logger.info(f"已添加标的 {symbol} 使用 {strategy_class.__name__} 参数: {strategy_params}")
+            logger.info("已添加标的 %s 使用 %s 参数: %s", symbol, strategy_class.__name__, strategy_params)
     else:
         # 添加数据
-        for symbol in args.symbols:
-            data = fetch_data(symbol, args.days, args.use_cache, data_fetcher)
-            if data is None:
-                continue
-            cerebro.adddata(data, name=symbol)
+        add_symbol_data(cerebro, args, data_fetcher)
                 
         # 单资产或简单多资产模式
         if len(args.symbols) == 1 and (args.use_config or not (args.advanced_stop_loss or args.smart_stop_loss or args.stop_loss)):
@@ -446,28 +597,25 @@ def main():
                     strategy_params['trailing_stop'] = False
             
             # 再次过滤参数以确保兼容性
-            for key in list(strategy_params.keys()):
-                try:
-                    # 尝试访问参数，如果不存在会抛出异常
-                    getattr(strategy_class.params, key)
-                except AttributeError:
-                    logger.debug(f"参数 {key} 不适用于策略类 {strategy_class.__name__}，将被忽略")
-                    strategy_params.pop(key, None)
+            filter_strategy_params(strategy_class, strategy_params)
             
             # 添加策略
             cerebro.addstrategy(strategy_class, **strategy_params)
             
-            logger.info(f"使用策略 {strategy_class.__name__} 参数: {strategy_params}")
+            logger.info("使用策略 %s 参数: %s", strategy_class.__name__, strategy_params)
         else:
             # 使用命令行指定的策略参数
             if args.smart_stop_loss:
-                logger.info(f"使用智能止损的神奇九转策略 [ATR周期: {args.atr_period}, ATR乘数: {args.atr_multiplier}, " 
-                        f"最大止损: {args.stop_loss_pct}%%, 追踪止损: {not args.no_trailing}, "
-                        f"风险规避系数: {args.risk_aversion}, "
-                        f"波动性自适应: {not args.no_volatility_adjust}, "
-                        f"市场感知: {not args.no_market_aware}, "
-                        f"时间衰减: {not args.no_time_decay}, "
-                        f"做空交易: {args.enable_short}]")
+                logger.info("使用智能止损的神奇九转策略 [ATR周期: %s, ATR乘数: %s, " 
+                        "最大止损: %s%%, 追踪止损: %s, "
+                        "风险规避系数: %s, "
+                        "波动性自适应: %s, "
+                        "市场感知: %s, "
+                        "时间衰减: %s, "
+                        "做空交易: %s]",
+                        args.atr_period, args.atr_multiplier, args.stop_loss_pct, not args.no_trailing,
+                        args.risk_aversion, not args.no_volatility_adjust, not args.no_market_aware,
+                        not args.no_time_decay, args.enable_short)
                 cerebro.addstrategy(MagicNineStrategyWithSmartStopLoss, 
                                 magic_period=args.magic_period,
                                 atr_period=args.atr_period,
@@ -482,9 +630,10 @@ def main():
                                 time_decay_days=args.time_decay_days,
                                 enable_short=args.enable_short)
             elif args.advanced_stop_loss:
-                logger.info(f"使用高级止损的神奇九转策略 [ATR周期: {args.atr_period}, ATR乘数: {args.atr_multiplier}, " 
-                        f"最大止损: {args.stop_loss_pct}%%, 追踪止损: {not args.no_trailing}, "
-                        f"做空交易: {args.enable_short}]")
+                logger.info("使用高级止损的神奇九转策略 [ATR周期: %s, ATR乘数: %s, " 
+                        "最大止损: %s%%, 追踪止损: %s, "
+                        "做空交易: %s]",
+                        args.atr_period, args.atr_multiplier, args.stop_loss_pct, not args.no_trailing, args.enable_short)
                 cerebro.addstrategy(MagicNineStrategyWithAdvancedStopLoss, 
                                 magic_period=args.magic_period,
                                 atr_period=args.atr_period,
@@ -494,177 +643,40 @@ def main():
                                 trailing_stop=not args.no_trailing,
                                 enable_short=args.enable_short)
             elif args.stop_loss:
-                logger.info(f"使用普通止损的神奇九转策略 [止损比例: {args.stop_loss_pct}%%, 做空交易: {args.enable_short}]")
+                logger.info("使用普通止损的神奇九转策略 [止损比例: %s%%, 做空交易: %s]", args.stop_loss_pct, args.enable_short)
                 cerebro.addstrategy(MagicNineStrategyWithStopLoss, 
                                magic_period=args.magic_period, 
                                stop_loss_pct=args.stop_loss_pct, 
                                enable_short=args.enable_short)
             else:
                 # 原始策略
-                logger.info(f"使用原始神奇九转策略 [做空交易: {args.enable_short}]")
+                logger.info("使用原始神奇九转策略 [做空交易: %s]", args.enable_short)
                 cerebro.addstrategy(MagicNineStrategy, 
                                 magic_period=args.magic_period, 
                                 stop_loss_pct=args.stop_loss_pct,
                                 enable_short=args.enable_short)
     
     # 添加分析器
-    cerebro.addanalyzer(bt.analyzers.SharpeRatio, _name='sharpe_ratio', 
-                        riskfreerate=0.0, 
-                        annualize=True, 
-                        timeframe=bt.TimeFrame.Days,
-                        compression=1440)
-    cerebro.addanalyzer(SortinoRatio, _name='sortino_ratio',
-                        riskfreerate=0.0,
-                        annualize=True,
-                        timeframe=bt.TimeFrame.Days)  # 使用自定义索提诺比率分析器
-    cerebro.addanalyzer(bt.analyzers.Calmar, _name='calmar',
-                        timeframe=bt.TimeFrame.Days)  # 卡尔玛比率
-    cerebro.addanalyzer(CustomDrawDown, _name='drawdown')
-    cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name='trade_analyzer')
-    cerebro.addanalyzer(bt.analyzers.SQN, _name='sqn')
-    cerebro.addanalyzer(bt.analyzers.Returns, _name='returns')  # 用于计算各种收益率指标
-    cerebro.addanalyzer(bt.analyzers.AnnualReturn, _name='annual')  # 年化收益率
-    cerebro.addanalyzer(bt.analyzers.PeriodStats, _name='period_stats')  # 周期统计
-    cerebro.addobserver(BuySell)
+    for analyzer_class, analyzer_kwargs in _ANALYZER_SPECS:
+        cerebro.addanalyzer(analyzer_class, **analyzer_kwargs)
+    if plot_enabled:
+        from backtrader.observers import BuySell
+        cerebro.addobserver(BuySell)
+    else:
+        # 年化收益分析器依赖资金观察器
+        cerebro.addobserver(bt.observers.Broker)
     
     # 运行回测
-    logger.info(f"初始资金: {cerebro.broker.getvalue():.2f}")
+    logger.info("初始资金: %.2f", cerebro.broker.getvalue())
     results = cerebro.run()
     strategy = results[0]
     
     # 输出结果
     final_value = cerebro.broker.getvalue()
-    total_return_pct = (final_value / args.cash - 1) * 100
-    
-    logger.info(f"最终资金: {final_value:.2f}")
-    logger.info(f"总收益率: {total_return_pct:.2f}%")
-    
-    # 获取分析结果
-    sharpe = strategy.analyzers.sharpe_ratio.get_analysis()
-    if sharpe:
-        sharpe_ratio = sharpe.get('sharperatio', 0.0)
-        if sharpe_ratio is not None and np.isfinite(sharpe_ratio):
-            logger.info(f"夏普比率: {sharpe_ratio:.4f}")
-        else:
-            logger.info("夏普比率: 无效")
-            
-    # 添加索提诺比率
-    sortino = strategy.analyzers.sortino_ratio.get_analysis()
-    if sortino:
-        sortino_ratio = sortino.get('sortinoratio', 0.0)  # 使用正确的键名'sortinoratio'
-        if sortino_ratio is not None and np.isfinite(sortino_ratio):
-            logger.info(f"索提诺比率: {sortino_ratio:.4f}")
-        else:
-            logger.info("索提诺比率: 无效")
-    
-    # 使用自定义回撤分析器结果
-    drawdown = strategy.analyzers.drawdown.get_analysis()
-    if drawdown:
-        raw_drawdown = drawdown.get('max', {}).get('drawdown', 0.0)
-        max_drawdown = raw_drawdown * 100  # 正确转换为百分比
-        max_dd_len = drawdown.get('max', {}).get('len', 0)
-        logger.info(f"最大回撤: {max_drawdown:.2f}%，持续周期: {max_dd_len}")
-            
-    # 添加卡尔玛比率
-    calmar = strategy.analyzers.calmar.get_analysis()
-    if calmar:
-        calmar_ratio = calmar.get('calmar', 0.0)
-        if calmar_ratio is not None and np.isfinite(calmar_ratio):
-            logger.info(f"卡尔玛比率: {calmar_ratio:.4f}")
-        else:
-            logger.info("卡尔玛比率: 无效")
-            
-    # 添加年化收益率
-    annual = strategy.analyzers.annual.get_analysis()
-    if annual:
-        # 显示最近一年的年化收益率，或者整个回测期间的平均年化收益率
-        years = list(annual.keys())
-        if years:
-            latest_year = max(years)
-            annual_return = annual[latest_year] * 100
-            logger.info(f"年化收益率: {annual_return:.2f}%")
-                
-    # 获取周期统计数据
-    period_stats = strategy.analyzers.period_stats.get_analysis()
-    if period_stats:
-        if 'rnorm100' in period_stats:
-            norm_return = period_stats['rnorm100']
-            logger.info(f"标准化百日收益率: {norm_return:.2f}%")
-        if 'volatility' in period_stats:
-            volatility = period_stats['volatility'] * 100
-            logger.info(f"价格波动率: {volatility:.2f}%")
-
-    trade_analyzer = strategy.analyzers.trade_analyzer.get_analysis()
-    
-    # 简单检查是否有交易发生（更安全的方式）
-    if trade_analyzer:  # 如果有分析结果
-        if 'total' in trade_analyzer and 'closed' in trade_analyzer.total:
-            total_trades = trade_analyzer.total.closed
-            days = args.days
-            logger.info(f"总交易次数: {total_trades}")
-            logger.info(f"平均每天交易次数: {total_trades / days:.2f}")
-            
-            if 'won' in trade_analyzer and 'total' in trade_analyzer.won:
-                winning_trades = trade_analyzer.won.total
-                win_rate = (winning_trades / total_trades) * 100 if total_trades > 0 else 0
-                logger.info(f"盈利交易次数: {winning_trades}")
-                logger.info(f"胜率: {win_rate:.2f}%")
-                
-                # 添加平均盈亏比
-                avg_won = trade_analyzer.won.pnl.average if hasattr(trade_analyzer.won, 'pnl') and hasattr(trade_analyzer.won.pnl, 'average') else 0
-                avg_lost = trade_analyzer.lost.pnl.average if hasattr(trade_analyzer.lost, 'pnl') and hasattr(trade_analyzer.lost.pnl, 'average') else 0
-                if avg_lost < 0:  # 确保分母为负数转为正数
-                    profit_loss_ratio = abs(avg_won / avg_lost) if avg_lost != 0 else float('inf')
-                    logger.info(f"平均盈亏比: {profit_loss_ratio:.2f}")
-                
-                # 添加盈利因子
-                gross_won = trade_analyzer.won.pnl.total if hasattr(trade_analyzer.won, 'pnl') and hasattr(trade_analyzer.won.pnl, 'total') else 0
-                gross_lost = trade_analyzer.lost.pnl.total if hasattr(trade_analyzer.lost, 'pnl') and hasattr(trade_analyzer.lost.pnl, 'total') else 0
-                if gross_lost < 0:  # 确保分母为负数转为正数
-                    profit_factor = abs(gross_won / gross_lost) if gross_lost != 0 else float('inf')
-                    logger.info(f"盈利因子: {profit_factor:.2f}")
-                
-                # 添加期望收益
-                expected_return = (win_rate/100 * avg_won) + ((100-win_rate)/100 * avg_lost)
-                logger.info(f"每笔交易期望收益: {expected_return:.2f}")
-                
-                # 添加最大连续盈利和亏损次数
-                max_win_streak = trade_analyzer.streak.won.longest if hasattr(trade_analyzer, 'streak') and hasattr(trade_analyzer.streak, 'won') and hasattr(trade_analyzer.streak.won, 'longest') else 0
-                max_loss_streak = trade_analyzer.streak.lost.longest if hasattr(trade_analyzer, 'streak') and hasattr(trade_analyzer.streak, 'lost') and hasattr(trade_analyzer.streak.lost, 'longest') else 0
-                logger.info(f"最大连续盈利次数: {max_win_streak}")
-                logger.info(f"最大连续亏损次数: {max_loss_streak}")
-        else:
-            logger.info("没有交易发生")
-    else:
-        logger.info("没有交易分析数据")
-    
-    # 输出SQN
-    sqn_analyzer = strategy.analyzers.sqn.get_analysis()
-    if sqn_analyzer:
-        sqn_value = sqn_analyzer.get('sqn', 0.0)
-        if np.isfinite(sqn_value):
-            logger.info(f"系统质量指标(SQN): {sqn_value:.4f}")
-    
-    # 如果使用了自适应策略，输出策略切换统计信息
-    if args.adaptive and hasattr(strategy, 'strategy_switches'):
-        strategy_switches = strategy.strategy_switches
-        logger.info(f"策略切换次数: {len(strategy_switches)}")
-        strategy_usage = strategy.strategy_usage_count
-        total_bars = sum(strategy_usage.values())
-        
-        for strategy_type, count in strategy_usage.items():
-            usage_pct = (count / total_bars) * 100 if total_bars > 0 else 0
-            logger.info(f"策略 {strategy_type.value} 使用比例: {usage_pct:.2f}%")
-        
-        logger.info("策略切换详情:")
-        for i, switch in enumerate(strategy_switches[:10]):  # 只显示前10个切换
-            logger.info(f"  {i+1}. 日期: {switch['date']} 从 {switch['from'].value} 切换到 {switch['to'].value} 原因: {switch['reason']}")
-        
-        if len(strategy_switches) > 10:
-            logger.info(f"  ... 共 {len(strategy_switches)} 次切换")
+    _emit_summary(strategy, final_value, args)
     
     # 绘制结果
-    if len(args.symbols) <= 2 and not args.no_plot:  # 只有少量标的且不禁用绘图时才绘图
+    if plot_enabled:
         from matplotlib import rcParams
         rcParams['figure.figsize'] = 20, 10
         rcParams['font.size'] = 12
@@ -7,20 +7,18 @@ import re
 import sys
 import argparse
 import numpy as np
-import matplotlib
-matplotlib.use('Agg')  # 使用Agg后端，不需要GUI界面
-import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
-import seaborn as sns
 from pathlib import Path
 import platform
 import time  # 添加time模块用于延迟
-import traceback
+import multiprocessing
 import concurrent.futures  # 添加用于并行处理的模块
-from matplotlib.markers import MarkerStyle  # 导入MarkerStyle
 
-# 配置中文字体 - 在导入后立即设置
+# 配置中文字体 - 创建图表前调用
 def set_chinese_font():
+    import matplotlib
+    import matplotlib.pyplot as plt
+    import matplotlib.font_manager as fm
+    
     # 设置显示负号
     plt.rcParams['axes.unicode_minus'] = False
     
@@ -37,7 +35,7 @@ def set_chinese_font():
     for font in chinese_fonts:
         if font in fonts:
             plt.rcParams['font.sans-serif'] = [font] + plt.rcParams['font.sans-serif']
-            logging.info(f"找到并设置中文字体: {font}")
+            logging.info("找到并设置中文字体: %s", font)
             font_found = True
             break
     
@@ -46,7 +44,7 @@ def set_chinese_font():
         chinese_like_fonts = [f for f in fonts if any(keyword in f for keyword in ['黑体', '雅黑', 'Hei', 'YaHei', 'Gothic', 'Sans', '宋体', 'Song'])]
         if chinese_like_fonts:
             plt.rcParams['font.sans-serif'] = [chinese_like_fonts[0]] + plt.rcParams['font.sans-serif']
-            logging.info(f"找到并设置替代中文字体: {chinese_like_fonts[0]}")
+            logging.info("找到并设置替代中文字体: %s", chinese_like_fonts[0])
             font_found = True
     
     # 如果是Windows系统，使用更直接的字体设置方式
@@ -58,15 +56,12 @@ def set_chinese_font():
         logging.info("Windows系统直接设置中文字体")
     
     if font_found:
-        logging.info(f"成功设置中文字体: {plt.rcParams['font.sans-serif'][:3]}")
+        logging.info("成功设置中文字体: %s", plt.rcParams['font.sans-serif'][:3])
     else:
         logging.warning("未能找到合适的中文字体，图表中的中文可能无法正确显示")
     
     return font_found
 
-# 立即设置中文字体
-set_chinese_font()
-
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -94,11 +89,6 @@ STRATEGIES = {
 # 设置回测天数
 DAYS = 30
 
-# 创建结果目录
-OUTPUT_DIR = "out"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-RESULTS_DIR = os.path.join(OUTPUT_DIR, "backtest_results")
-os.makedirs(RESULTS_DIR, exist_ok=True)
 
 def parse_args():
     """解析命令行参数"""
@@ -122,6 +112,10 @@ args = parse_args()
 SYMBOLS = args.symbols
 DAYS = args.days
 RESULTS_DIR = args.output_dir
+# 结果目录在启动时创建一次，各回测日志和结果文件直接写入，不再逐次检查
+os.makedirs(RESULTS_DIR, exist_ok=True)
+# 本次批量回测的运行标识，启动时格式化一次，各回测日志和结果文件名共用
+RUN_ID = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
 
 def check_dependencies():
     """检查所需依赖是否已安装"""
@@ -151,14 +145,14 @@ def get_cached_symbols(symbols, days):
 def run_cache_warmup(symbols, days, min_wait=10):
     """预热缓存：为每个股票获取数据并缓存"""
     logger.info("===== 启动缓存预热阶段 =====")
-    logger.info(f"预热以下股票的缓存数据: {', '.join(symbols)}")
+    logger.info("预热以下股票的缓存数据: %s", ', '.join(symbols))
     
     for symbol in symbols:
         if check_data_cached(symbol, days):
-            logger.info(f"股票 {symbol} 已有缓存数据，跳过预热")
+            logger.info("股票 %s 已有缓存数据，跳过预热", symbol)
             continue
         
-        logger.info(f"开始预热股票 {symbol} 的缓存数据...")
+        logger.info("开始预热股票 %s 的缓存数据...", symbol)
         cmd = f"python main.py --symbols {symbol} --days {days} --use-cache --no-plot"
         
         process = subprocess.Popen(
@@ -172,10 +166,10 @@ def run_cache_warmup(symbols, days, min_wait=10):
         output, error = process.communicate()
         
         if process.returncode != 0:
-            logger.warning(f"预热 {symbol} 时出错，可能需要API调用，等待{min_wait}秒...")
+            logger.warning("预热 %s 时出错，可能需要API调用，等待%s秒...", symbol, min_wait)
             time.sleep(min_wait)
         else:
-            logger.info(f"股票 {symbol} 缓存预热成功")
+            logger.info("股票 %s 缓存预热成功", symbol)
     
     logger.info("===== 缓存预热阶段完成 =====")
     
@@ -189,15 +183,15 @@ def check_data_cached(symbol, days):
     
     # 如果缓存目录不存在，说明没有缓存
     if not os.path.exists(cache_dir):
-        logger.warning(f"缓存目录不存在: {cache_dir}")
+        logger.warning("缓存目录不存在: %s", cache_dir)
         return False
     
     # 获取当前日期和开始日期
     end_date = datetime.datetime.now()
     start_date = end_date - datetime.timedelta(days=days)
     
-    begin_str = start_date.strftime("%Y-%m-%d")
-    end_str = end_date.strftime("%Y-%m-%d")
+    begin_str = start_date.date().isoformat()
+    end_str = end_date.date().isoformat()
     
     # 检查该股票的缓存文件是否存在 
     # 1. 尝试精确匹配日期的缓存文件
@@ -205,16 +199,16 @@ def check_data_cached(symbol, days):
     
     if os.path.exists(cache_filename):
         file_size = os.path.getsize(cache_filename)
-        logger.info(f"找到精确匹配缓存文件: {cache_filename}, 大小: {file_size} 字节")
+        logger.info("找到精确匹配缓存文件: %s, 大小: %s 字节", cache_filename, file_size)
         if file_size > 1000:  # 假设小于1KB的文件不是有效缓存
             return True
     
     # 2. 如果精确匹配不存在或太小，查找包含该股票代码的所有缓存文件
-    logger.info(f"检查 {symbol} 所有可能的缓存文件...")
+    logger.info("检查 %s 所有可能的缓存文件...", symbol)
     all_files = [f for f in os.listdir(cache_dir) if f.startswith(f"{symbol}_1m_") and f.endswith(".csv")]
     
     if not all_files:
-        logger.warning(f"未找到 {symbol} 的任何缓存文件")
+        logger.warning("未找到 %s 的任何缓存文件", symbol)
         return False
     
     # 检查是否有能够覆盖所需日期范围的缓存文件
@@ -225,8 +219,8 @@ def check_data_cached(symbol, days):
             date_parts = cache_file.replace(f"{symbol}_1m_", "").replace(".csv", "").split("_")
             if len(date_parts) == 2:
                 file_begin_str, file_end_str = date_parts
-                file_begin_date = datetime.datetime.strptime(file_begin_str, "%Y-%m-%d")
-                file_end_date = datetime.datetime.strptime(file_end_str, "%Y-%m-%d")
+                file_begin_date = datetime.datetime.fromisoformat(file_begin_str)
+                file_end_date = datetime.datetime.fromisoformat(file_end_str)
                 
                 # 检查文件大小
                 file_path = os.path.join(cache_dir, cache_file)
@@ -234,29 +228,28 @@ def check_data_cached(symbol, days):
                 
                 # 检查日期范围是否覆盖所需日期，并且文件大小合适
                 if file_begin_date <= start_date and file_end_date >= end_date and file_size > 10000:
-                    logger.info(f"找到覆盖所需日期范围的缓存文件: {cache_file}, 大小: {file_size} 字节")
+                    logger.info("找到覆盖所需日期范围的缓存文件: %s, 大小: %s 字节", cache_file, file_size)
                     return True
                 # 如果文件的结束日期足够近（如果比所需的结束日期晚或只早1-2天）
                 elif file_begin_date <= start_date and (end_date - file_end_date).days <= 2 and file_size > 10000:
-                    logger.info(f"找到接近所需日期范围的缓存文件: {cache_file}, 大小: {file_size} 字节")
+                    logger.info("找到接近所需日期范围的缓存文件: %s, 大小: %s 字节", cache_file, file_size)
                     return True
         except Exception as e:
-            logger.warning(f"解析缓存文件名失败: {cache_file}, 错误: {e}")
+            logger.warning("解析缓存文件名失败: %s, 错误: %s", cache_file, e)
             continue
     
     # 3. 检查是否有bt文件
     bt_filename = f"{cache_dir}/{symbol}_1m_bt.csv"
     if os.path.exists(bt_filename) and os.path.getsize(bt_filename) > 10000:
-        logger.info(f"找到bt缓存文件: {bt_filename}, 大小: {os.path.getsize(bt_filename)} 字节")
+        logger.info("找到bt缓存文件: %s, 大小: %s 字节", bt_filename, os.path.getsize(bt_filename))
         return True
     
-    logger.warning(f"未找到合适的缓存文件: {symbol}")
+    logger.warning("未找到合适的缓存文件: %s", symbol)
     return False
 
 def run_backtest(symbol, strategy_name, strategy_args, use_cache=False, min_wait=5, max_wait=10, skip_wait=False):
     """运行单个股票和策略的回测"""
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    log_file = f"{RESULTS_DIR}/{symbol}_{strategy_name}_{timestamp}.log"
+    log_file = f"{RESULTS_DIR}/{symbol}_{strategy_name}_{RUN_ID}.log"
     
     # 检查是否已缓存
     data_cached = check_data_cached(symbol, DAYS)
@@ -271,7 +264,7 @@ def run_backtest(symbol, strategy_name, strategy_args, use_cache=False, min_wait
     if use_cache or data_cached:
         cmd_args.append("--use-cache")
         if data_cached:
-            logger.info(f"股票 {symbol} 发现缓存数据，将使用缓存")
+            logger.info("股票 %s 发现缓存数据，将使用缓存", symbol)
     
     # 策略特定参数
     strategy_specific_args = strategy_args.split()
@@ -282,9 +275,9 @@ def run_backtest(symbol, strategy_name, strategy_args, use_cache=False, min_wait
     
     # 记录命令执行信息
     if data_cached:
-        logger.info(f"股票 {symbol} 的数据已缓存，使用缓存数据执行策略: {strategy_name}")
+        logger.info("股票 %s 的数据已缓存，使用缓存数据执行策略: %s", symbol, strategy_name)
     
-    logger.info(f"执行命令: {cmd}")
+    logger.info("执行命令: %s", cmd)
     
     # 添加自适应重试机制
     max_retries = 5  # 最大重试次数
@@ -295,7 +288,7 @@ def run_backtest(symbol, strategy_name, strategy_args, use_cache=False, min_wait
     
     while retries < max_retries and not success:
         if retries > 0:
-            logger.info(f"第 {retries} 次重试执行命令: {cmd}")
+            logger.info("第 %s 次重试执行命令: %s", retries, cmd)
             
         # 执行命令
         process = subprocess.Popen(
@@ -311,11 +304,11 @@ def run_backtest(symbol, strategy_name, strategy_args, use_cache=False, min_wait
         
         # 处理命令返回结果
         if process.returncode != 0:
-            logger.error(f"命令执行失败，错误代码: {process.returncode}")
+            logger.error("命令执行失败，错误代码: %s", process.returncode)
             
             # 只显示错误的前200个字符
             error_preview = error[:200] + "..." if len(error) > 200 else error
-            logger.error(f"错误信息: {error_preview}")
+            logger.error("错误信息: %s", error_preview)
             
             # 检查是否是API限制错误
             if "rate limit error" in error or "Too many requests" in error:
@@ -325,12 +318,12 @@ def run_backtest(symbol, strategy_name, strategy_args, use_cache=False, min_wait
                 wait_time = min(max_wait, current_wait * (1.5 ** consecutive_api_errors))
                 current_wait = wait_time
                 
-                logger.warning(f"检测到API调用限制错误 (连续 {consecutive_api_errors} 次)，等待{wait_time:.1f}秒后继续...")
+                logger.warning("检测到API调用限制错误 (连续 %s 次)，等待%.1f秒后继续...", consecutive_api_errors, wait_time)
                 time.sleep(wait_time)
                 retries += 1
             else:
                 # 如果不是API限制错误，等待短时间后重试
-                logger.warning(f"遇到非API限制错误，等待{min_wait}秒后重试...")
+                logger.warning("遇到非API限制错误，等待%s秒后重试...", min_wait)
                 time.sleep(min_wait)
                 retries += 1
                 # 重置连续API错误计数
@@ -347,7 +340,7 @@ def run_backtest(symbol, strategy_name, strategy_args, use_cache=False, min_wait
         f.write("\n\n=== STDERR ===\n")
         f.write(error)
     
-    logger.info(f"命令输出已保存到: {log_file}")
+    logger.info("命令输出已保存到: %s", log_file)
     
     # 分析输出日志，获取交易统计信息
     return_rate = None
@@ -361,21 +354,18 @@ def run_backtest(symbol, strategy_name, strategy_args, use_cache=False, min_wait
             match = re.search(r'总收益率[：:]\s*([0-9.-]+)%', line)
             if match:
                 return_rate = float(match.group(1))
-                logger.info(f"找到总收益率: {return_rate}%")
                 
         # 检查总交易次数
         elif "总交易次数:" in line or "总交易次数：" in line:
             match = re.search(r'总交易次数[：:]\s*([0-9]+)', line)
             if match:
                 total_trades = int(match.group(1))
-                logger.info(f"找到总交易次数: {total_trades}")
                 
         # 检查胜率
         elif "胜率:" in line or "胜率：" in line:
             match = re.search(r'胜率[：:]\s*([0-9.-]+)%', line)
             if match:
                 win_rate = float(match.group(1))
-                logger.info(f"找到胜率: {win_rate}%")
     
     # 创建结果字典
     metrics = {}
@@ -386,7 +376,8 @@ def run_backtest(symbol, strategy_name, strategy_args, use_cache=False, min_wait
     if win_rate is not None:
         metrics['胜率'] = win_rate
         
-    logger.info(f"提取的指标: {metrics}")
+    # 解析到的各项指标只在这里汇总输出一次，不再每找到一项就单独记录一条日志
+    logger.info("%s %s 提取的指标: %s", symbol, strategy_name, metrics)
     
     # 处理等待时间逻辑
     if skip_wait:
@@ -394,12 +385,12 @@ def run_backtest(symbol, strategy_name, strategy_args, use_cache=False, min_wait
     elif data_cached:
         # 数据已缓存，极短等待
         wait_time = min_wait / 5  # 等待时间降至最小的1/5
-        logger.info(f"数据已缓存，短暂等待{wait_time:.1f}秒...")
+        logger.info("数据已缓存，短暂等待%.1f秒...", wait_time)
         time.sleep(wait_time)
     else:
         # 正常等待逻辑
         wait_time = min_wait
-        logger.info(f"等待{wait_time:.1f}秒，避免超过API调用限制...")
+        logger.info("等待%.1f秒，避免超过API调用限制...", wait_time)
         time.sleep(wait_time)
     
     return metrics
@@ -417,7 +408,7 @@ def format_excel(excel_file, formatted_excel_file):
     # 读取数据
     df = pd.read_excel(excel_file)
     
-    logger.info(f"格式化Excel文件, 列名: {df.columns.tolist()}")
+    logger.info("格式化Excel文件, 列名: %s", df.columns.tolist())
     
     # 检查是否是策略平均表现数据
     if "平均收益率(%)" in df.columns:
@@ -450,7 +441,7 @@ def format_excel(excel_file, formatted_excel_file):
         
         # 保存文件
         writer.close()
-        logger.info(f"格式化Excel文件已生成: {formatted_excel_file}")
+        logger.info("格式化Excel文件已生成: %s", formatted_excel_file)
         return True
         
     # 处理详细的回测结果数据
@@ -537,14 +528,24 @@ def format_excel(excel_file, formatted_excel_file):
     
     # 保存文件
     writer.close()
-    logger.info(f"格式化Excel文件已生成: {formatted_excel_file}")
+    logger.info("格式化Excel文件已生成: %s", formatted_excel_file)
     return True
 
 def create_visualizations(excel_file, output_dir=RESULTS_DIR):
     """创建可视化图表"""
     try:
+        # 绘图相关模块只在创建图表时才导入（通常在后台子进程中），
+        # 批量回测主流程及不生成图表的运行不再承担matplotlib/seaborn的导入和字体扫描开销
+        import matplotlib
+        matplotlib.use('Agg')  # 使用Agg后端，不需要GUI界面
+        import matplotlib.pyplot as plt
+        import matplotlib.font_manager as fm
+        import seaborn as sns
+        from matplotlib.markers import MarkerStyle
+        from matplotlib.lines import Line2D
+        
         print(f"开始创建可视化图表，Excel文件: {excel_file}, 输出目录: {output_dir}")
-        logger.info(f"开始创建可视化图表，Excel文件: {excel_file}, 输出目录: {output_dir}")
+        logger.info("开始创建可视化图表，Excel文件: %s, 输出目录: %s", excel_file, output_dir)
         
         # 再次确保字体设置正确
         set_chinese_font()
@@ -563,37 +564,36 @@ def create_visualizations(excel_file, output_dir=RESULTS_DIR):
         # 确保文件存在
         if not os.path.exists(excel_file):
             print(f"错误: Excel文件不存在 - {excel_file}")
-            logger.error(f"创建可视化图表失败: Excel文件不存在 - {excel_file}")
+            logger.error("创建可视化图表失败: Excel文件不存在 - %s", excel_file)
             return False
             
         # 确保输出目录存在
         if not os.path.exists(output_dir):
             print(f"创建输出目录: {output_dir}")
-            logger.info(f"创建输出目录: {output_dir}")
+            logger.info("创建输出目录: %s", output_dir)
             os.makedirs(output_dir)
             
         try:
             # 读取CSV文件，因为它包含更完整的数据
             csv_files = [f for f in os.listdir(output_dir) if f.startswith('backtest_results_') and f.endswith('.csv')]
             if csv_files:
-                # 按修改时间排序，获取最新的CSV文件
-                csv_files.sort(key=lambda x: os.path.getmtime(os.path.join(output_dir, x)), reverse=True)
-                latest_csv = os.path.join(output_dir, csv_files[0])
+                # 只需要最新的CSV文件，直接取修改时间最大者，无需整体排序
+                latest_csv = max((os.path.join(output_dir, f) for f in csv_files), key=os.path.getmtime)
                 
                 print(f"使用最新的CSV文件: {latest_csv}")
-                logger.info(f"使用最新的CSV文件: {latest_csv}")
+                logger.info("使用最新的CSV文件: %s", latest_csv)
                 
                 # 直接读取CSV文件，不从Excel读取
                 df = pd.read_csv(latest_csv)
             else:
                 # 读取数据 - 检查可用的sheet名
                 print(f"正在读取Excel数据，文件: {excel_file}")
-                logger.info(f"正在读取Excel数据，文件: {excel_file}")
+                logger.info("正在读取Excel数据，文件: %s", excel_file)
                 
                 # 获取可用的sheet名
                 xls = pd.ExcelFile(excel_file)
                 available_sheets = xls.sheet_names
-                logger.info(f"Excel文件中的sheet: {available_sheets}")
+                logger.info("Excel文件中的sheet: %s", available_sheets)
                 
                 # 根据可用sheet选择读取方式
                 if '策略平均表现' in available_sheets:
@@ -625,7 +625,7 @@ def create_visualizations(excel_file, output_dir=RESULTS_DIR):
                 else:
                     # 使用原有的读取逻辑
                     sheet_name = '所有回测结果' if '所有回测结果' in available_sheets else available_sheets[0]
-                    logger.info(f"使用sheet: {sheet_name}")
+                    logger.info("使用sheet: %s", sheet_name)
                     
                     df = pd.read_excel(excel_file, sheet_name=sheet_name)
             
@@ -642,7 +642,7 @@ def create_visualizations(excel_file, output_dir=RESULTS_DIR):
             # 检查列名是否存在，并验证列名格式
             expected_columns = ['股票', '策略', '收益率(%)', '交易次数', '胜率(%)']
             if not all(col in df.columns for col in expected_columns[:2]):
-                logger.warning(f"缺少必要的列: {[col for col in expected_columns[:2] if col not in df.columns]}")
+                logger.warning("缺少必要的列: %s", [col for col in expected_columns[:2] if col not in df.columns])
                 
                 # 尝试根据列名进行推断和调整
                 if '标的' in df.columns and '股票' not in df.columns:
@@ -658,7 +658,7 @@ def create_visualizations(excel_file, output_dir=RESULTS_DIR):
             df_clean = df_clean.dropna(subset=['收益率(%)'], how='all')
             
             print(f"清理NaN后的数据形状: {df_clean.shape}")
-            logger.info(f"清理后的数据形状: {df_clean.shape}")
+            logger.info("清理后的数据形状: %s", df_clean.shape)
             
             if df_clean.empty:
                 print("警告: 清理NaN值后没有有效数据可用于创建可视化图表")
@@ -669,7 +669,7 @@ def create_visualizations(excel_file, output_dir=RESULTS_DIR):
             for col in ['股票', '策略', '收益率(%)', '胜率(%)', '交易次数']:
                 if col not in df_clean.columns:
                     df_clean[col] = np.nan if col in ['收益率(%)', '胜率(%)', '交易次数'] else '未知'
-                    logger.info(f"为df_clean添加缺失的列: {col}")
+                    logger.info("为df_clean添加缺失的列: %s", col)
             
             # 计算每个策略的平均值
             strategy_avg = df_clean.groupby('策略').agg({
@@ -816,8 +816,7 @@ def create_visualizations(excel_file, output_dir=RESULTS_DIR):
                         
                     except Exception as e:
                         print(f"创建热力图时出错: {str(e)}")
-                        logger.error(f"创建热力图时出错: {e}")
-                        traceback.print_exc()  # 打印完整堆栈
+                        logger.exception("创建热力图时出错: %s", e)
                         plt.text(0.5, 0.5, f'创建热力图失败: {str(e)}', 
                               ha='center', va='center', fontsize=12, fontproperties=font_props)
                 else:
@@ -831,16 +830,16 @@ def create_visualizations(excel_file, output_dir=RESULTS_DIR):
                 # 保存图像
                 chart_file = f'{output_dir}/strategy_performance_visualization.png'
                 print(f"正在保存图表到: {chart_file}")
-                logger.info(f"保存图表到文件: {chart_file}")
+                logger.info("保存图表到文件: %s", chart_file)
                 plt.savefig(chart_file, dpi=300, bbox_inches='tight')
                 
                 # 确认文件是否保存成功
                 if os.path.exists(chart_file):
                     print(f"可视化图表已保存为: {chart_file}")
-                    logger.info(f"可视化图表已保存为: {chart_file}")
+                    logger.info("可视化图表已保存为: %s", chart_file)
                 else:
                     print(f"错误: 保存图表失败，文件不存在: {chart_file}")
-                    logger.error(f"保存图表失败，文件不存在: {chart_file}")
+                    logger.error("保存图表失败，文件不存在: %s", chart_file)
                 
                 # 额外创建一个胜率与收益率的散点图
                 try:
@@ -900,7 +899,6 @@ def create_visualizations(excel_file, output_dir=RESULTS_DIR):
                             legend = plt.legend(title="股票-策略", loc="best", fontsize=8)
                         else:
                             # 如果图例条目太多，只显示股票级别的图例
-                            from matplotlib.lines import Line2D
                             custom_lines = [Line2D([0], [0], color=color_map[stock], lw=4) for stock in unique_stocks]
                             legend = plt.legend(custom_lines, unique_stocks, title="股票", loc="best")
                         
@@ -913,26 +911,24 @@ def create_visualizations(excel_file, output_dir=RESULTS_DIR):
                         # 保存图像
                         scatter_file = f'{output_dir}/win_rate_vs_return_scatter.png'
                         print(f"正在保存散点图到: {scatter_file}")
-                        logger.info(f"保存散点图到文件: {scatter_file}")
+                        logger.info("保存散点图到文件: %s", scatter_file)
                         plt.savefig(scatter_file, dpi=300, bbox_inches='tight')
                         
                         # 确认文件是否保存成功
                         if os.path.exists(scatter_file):
                             print(f"胜率与收益率散点图已保存为: {scatter_file}")
-                            logger.info(f"胜率与收益率散点图已保存为: {scatter_file}")
+                            logger.info("胜率与收益率散点图已保存为: %s", scatter_file)
                         else:
                             print(f"错误: 保存散点图失败，文件不存在: {scatter_file}")
-                            logger.error(f"保存散点图失败，文件不存在: {scatter_file}")
+                            logger.error("保存散点图失败，文件不存在: %s", scatter_file)
                 
                 except Exception as e:
                     print(f"创建散点图时出错: {str(e)}")
-                    logger.error(f"创建散点图时出错: {e}")
-                    traceback.print_exc()
+                    logger.exception("创建散点图时出错: %s", e)
             
             except Exception as e:
                 print(f"创建图表时出错: {str(e)}")
-                logger.error(f"创建图表时出错: {e}")
-                traceback.print_exc()
+                logger.exception("创建图表时出错: %s", e)
                 return False
             
             plt.close('all')  # 关闭所有图形
@@ -942,34 +938,52 @@ def create_visualizations(excel_file, output_dir=RESULTS_DIR):
             
         except Exception as e:
             print(f"读取Excel数据时出错: {str(e)}")
-            logger.error(f"读取Excel数据或创建图表时出错: {e}")
-            traceback.print_exc()
+            logger.exception("读取Excel数据或创建图表时出错: %s", e)
             return False
             
     except Exception as e:
         print(f"创建可视化图表的整体过程出错: {str(e)}")
-        logger.error(f"创建可视化图表的整体过程出错: {e}")
-        traceback.print_exc()
+        logger.exception("创建可视化图表的整体过程出错: %s", e)
         return False
 
+def start_visualization_worker(excel_file, output_dir):
+    """在后台子进程中创建可视化图表
+    
+    pyplot不是线程安全的，而且绘图占用的内存随子进程退出一并释放，不会留在主进程中。
+    子进程使用spawn启动：主进程可能有回测线程池在运行，fork会连同其他线程持有的
+    日志等锁一起复制，子进程可能因此死锁。
+    
+    参数:
+        excel_file: 结果Excel文件路径
+        output_dir: 图表输出目录
+        
+    返回:
+        已启动的守护进程，主流程结束时自动终止
+    """
+    worker = multiprocessing.get_context('spawn').Process(
+        target=create_visualizations, args=(excel_file, output_dir))
+    worker.daemon = True
+    worker.start()
+    logger.info("已启动后台子进程创建可视化图表")
+    return worker
+
 def save_results(df, args):
     """保存结果到CSV和Excel文件"""
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    csv_file = f"{RESULTS_DIR}/backtest_results_{timestamp}.csv"
-    excel_file = f"{RESULTS_DIR}/backtest_results_{timestamp}.xlsx"
+    csv_file = f"{RESULTS_DIR}/backtest_results_{RUN_ID}.csv"
+    excel_file = f"{RESULTS_DIR}/backtest_results_{RUN_ID}.xlsx"
     combined_file = f"{RESULTS_DIR}/{args.combined_file}"
     
     # 保存为CSV
     df.to_csv(csv_file, index=False)
-    logger.info(f"结果保存到CSV: {csv_file}")
+    logger.info("结果保存到CSV: %s", csv_file)
     
     # 保存为Excel - 不使用try-except，直接执行
     df.to_excel(excel_file, index=False, sheet_name='回测结果')
-    logger.info(f"结果保存到Excel: {excel_file}")
+    logger.info("结果保存到Excel: %s", excel_file)
     
     # 保存合并结果
     df.to_excel(combined_file, index=False, sheet_name='回测结果')
-    logger.info(f"合并结果保存到: {combined_file}")
+    logger.info("合并结果保存到: %s", combined_file)
     
     # 如果需要格式化Excel
     if not args.no_format:
@@ -979,6 +993,75 @@ def save_results(df, args):
     if not args.no_visualize:
         create_visualizations(f"{RESULTS_DIR}/formatted_{args.combined_file}")
 
+def run_strategy_backtest(symbol, strategy_name, strategy_args, args):
+    """运行单个股票的单个策略回测
+    
+    参数:
+        symbol: 股票代码
+        strategy_name: 策略名称
+        strategy_args: 传给main.py的策略参数
+        args: 命令行参数
+        
+    返回:
+        一行结果的DataFrame，回测出错时返回None
+    """
+    logger.info("运行策略: %s 对股票: %s", strategy_name, symbol)
+    try:
+        # 执行回测
+        metrics = run_backtest(
+            symbol, 
+            strategy_name, 
+            strategy_args, 
+            use_cache=args.use_cache,
+            min_wait=args.min_wait,
+            max_wait=args.max_wait,
+            skip_wait=False  # 移除skip_wait选项，使用更安全的等待策略
+        )
+        
+        return pd.DataFrame({
+            '股票': [symbol],
+            '策略': [strategy_name],
+            '收益率(%)': [metrics.get('收益率', float('nan'))],
+            '交易次数': [metrics.get('交易次数', float('nan'))],
+            '胜率(%)': [metrics.get('胜率', float('nan'))]
+        })
+        
+    except Exception as e:
+        logger.exception("运行回测时出错: %s", e)
+        return None
+
+def run_symbol_backtests(symbol, args):
+    """依次运行单个股票的所有策略回测
+    
+    参数:
+        symbol: 股票代码
+        args: 命令行参数
+        
+    返回:
+        每个成功完成的策略对应一行结果的DataFrame列表
+    """
+    logger.info("开始对 %s 进行回测", symbol)
+    results = (run_strategy_backtest(symbol, strategy_name, strategy_args, args)
+               for strategy_name, strategy_args in STRATEGIES.items())
+    return [result for result in results if result is not None]
+
+def run_batch_backtests_parallel(symbol_batch, args, max_workers):
+    """并行运行一批股票的所有策略回测
+    
+    不同股票之间并行，同一股票的各策略仍依次执行。
+    
+    参数:
+        symbol_batch: 股票代码列表
+        args: 命令行参数
+        max_workers: 最大并行股票数
+        
+    返回:
+        按股票顺序排列的结果列表，每项为该股票成功完成的策略结果DataFrame列表
+    """
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # executor.map按提交顺序返回，结果与symbol_batch顺序一致
+        return list(executor.map(lambda symbol: run_symbol_backtests(symbol, args), symbol_batch))
+
 def main():
     # 解析命令行参数
     args = parse_args()
@@ -999,50 +1082,34 @@ def main():
     # 将股票列表分成批次
     symbol_batches = [symbols[i:i+args.batch_size] for i in range(0, len(symbols), args.batch_size)]
     
-    logger.warning(f"注意：Tiger API有调用频率限制(每分钟最多10次)，股票将分成{len(symbol_batches)}批处理，每批{len(symbol_batches[0])}个")
+    logger.warning("注意：Tiger API有调用频率限制(每分钟最多10次)，股票将分成%s批处理，每批%s个", len(symbol_batches), len(symbol_batches[0]))
     
     # 按批次处理股票
     for batch_idx, symbol_batch in enumerate(symbol_batches):
-        logger.info(f"开始处理第{batch_idx+1}批股票: {', '.join(symbol_batch)}")
+        logger.info("开始处理第%s批股票: %s", batch_idx+1, ', '.join(symbol_batch))
         
         # 批处理逻辑
         batch_success_count = 0  # 批次中成功完成的任务数
-        for symbol in symbol_batch:
-            logger.info(f"开始对 {symbol} 进行回测")
-            for strategy_name, strategy_args in STRATEGIES.items():
-                logger.info(f"运行策略: {strategy_name} 对股票: {symbol}")
-                try:
-                    # 执行回测
-                    metrics = run_backtest(
-                        symbol, 
-                        strategy_name, 
-                        strategy_args, 
-                        use_cache=args.use_cache,
-                        min_wait=args.min_wait,
-                        max_wait=args.max_wait,
-                        skip_wait=False  # 移除skip_wait选项，使用更安全的等待策略
-                    )
-                    
-                    # 将结果添加到表格
-                    metrics_df = pd.DataFrame({
-                        '股票': [symbol],
-                        '策略': [strategy_name],
-                        '收益率(%)': [metrics.get('收益率', float('nan'))],
-                        '交易次数': [metrics.get('交易次数', float('nan'))],
-                        '胜率(%)': [metrics.get('胜率', float('nan'))]
-                    })
-                    results_df = pd.concat([results_df, metrics_df], ignore_index=True)
-                    batch_success_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"运行回测时出错: {e}")
-                    traceback.print_exc()
+        
+        # 整批数据都已缓存时不会调用API，不同股票使用各自的数据文件互不影响，
+        # 每个回测本身就是独立的子进程，用线程池按股票同时驱动多个子进程即可并行
+        max_workers = min(args.max_workers, len(symbol_batch))
+        if max_workers > 1 and all(check_data_cached(s, DAYS) for s in symbol_batch):
+            logger.info("本批股票数据均已缓存，使用 %s 个并行任务执行回测", max_workers)
+            batch_results = run_batch_backtests_parallel(symbol_batch, args, max_workers)
+        else:
+            batch_results = [run_symbol_backtests(symbol, args) for symbol in symbol_batch]
+        
+        # 按股票顺序将结果添加到表格
+        for symbol_results in batch_results:
+            if symbol_results:
+                results_df = pd.concat([results_df, *symbol_results], ignore_index=True)
+                batch_success_count += len(symbol_results)
         
         # 批处理完成后保存阶段性结果
         if not results_df.empty and batch_idx > 0 and batch_idx % 2 == 0:
-            interim_timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            interim_csv = f"{RESULTS_DIR}/interim_results_{interim_timestamp}.csv"
-            logger.info(f"保存阶段性结果到: {interim_csv}")
+            interim_csv = f"{RESULTS_DIR}/interim_results_{RUN_ID}_batch{batch_idx + 1}.csv"
+            logger.info("保存阶段性结果到: %s", interim_csv)
             results_df.to_csv(interim_csv, index=False, encoding='utf-8-sig')
         
         # 批次间等待逻辑 - 简化版本
@@ -1057,31 +1124,28 @@ def main():
                 cache_ratio = cached_count / total_count
                 # 缓存比例越高，等待时间越短
                 adjusted_wait = args.batch_wait * (1 - cache_ratio * 0.8)
-                logger.info(f"下一批中 {cached_count}/{total_count} 股票已缓存 (比例: {cache_ratio:.1%})，等待 {adjusted_wait:.1f} 秒...")
+                logger.info("下一批中 %s/%s 股票已缓存 (比例: %.1f%%)，等待 %.1f 秒...",
+                            cached_count, total_count, cache_ratio * 100, adjusted_wait)
                 time.sleep(adjusted_wait)
             else:
-                logger.info(f"等待 {args.batch_wait} 秒后处理下一批...")
+                logger.info("等待 %s 秒后处理下一批...", args.batch_wait)
                 time.sleep(args.batch_wait)
     
     # 保存结果到CSV和Excel
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    csv_file = f"{RESULTS_DIR}/backtest_results_{timestamp}.csv"
-    excel_file = f"{RESULTS_DIR}/backtest_results_{timestamp}.xlsx"
-    
-    # 确保结果目录存在
-    os.makedirs(os.path.dirname(csv_file), exist_ok=True)
+    csv_file = f"{RESULTS_DIR}/backtest_results_{RUN_ID}.csv"
+    excel_file = f"{RESULTS_DIR}/backtest_results_{RUN_ID}.xlsx"
     
     # 如果结果表不为空则保存
     if not results_df.empty:
-        logger.info(f"保存结果到CSV: {csv_file}")
+        logger.info("保存结果到CSV: %s", csv_file)
         results_df.to_csv(csv_file, index=False, encoding='utf-8-sig')
         
-        logger.info(f"保存结果到Excel: {excel_file}")
+        logger.info("保存结果到Excel: %s", excel_file)
         results_df.to_excel(excel_file, index=False, sheet_name='回测结果')
         
         # 保存组合结果，包括所有策略在所有股票上的平均表现
         combined_file = f"{RESULTS_DIR}/{args.combined_file}"
-        logger.info(f"保存组合结果到: {combined_file}")
+        logger.info("保存组合结果到: %s", combined_file)
         
         # 按策略分组，只计算数值列的平均值
         combined_results = results_df.groupby('策略').agg({
@@ -1102,19 +1166,11 @@ def main():
         
         # 创建可视化图表
         if not args.no_visualize:
-            # 使用多线程处理可视化，不阻塞主流程
-            import threading
-            viz_thread = threading.Thread(
-                target=create_visualizations,
-                args=(f"{RESULTS_DIR}/formatted_{args.combined_file}", RESULTS_DIR)
-            )
-            viz_thread.daemon = True  # 设置为守护线程，主线程结束时自动结束
-            viz_thread.start()
-            logger.info("已启动后台线程创建可视化图表")
+            viz_worker = start_visualization_worker(f"{RESULTS_DIR}/formatted_{args.combined_file}", RESULTS_DIR)
             
-            # 等待可视化线程完成，但最多等待60秒
-            viz_thread.join(timeout=60)
-            if viz_thread.is_alive():
+            # 等待可视化完成，但最多等待60秒
+            viz_worker.join(timeout=60)
+            if viz_worker.is_alive():
                 logger.warning("可视化图表创建超时，但程序将继续运行")
             else:
                 logger.info("可视化图表创建完成")
@@ -9,6 +9,9 @@ from .indicators import MagicNine, RSIBundle, KDJBundle
 
 logger = logging.getLogger(__name__)
 
+# 使用ATR追踪止损的策略类型，逐K线判断时直接与模块级元组比较，不再每次构造列表
+_STOP_LOSS_STRATEGY_TYPES = (StrategyType.ADVANCED_STOP_LOSS, StrategyType.SMART_STOP_LOSS)
+
 class AdaptiveStrategy(bt.Strategy):
     """
     自适应策略类：根据市场情况动态切换不同的交易策略模式
@@ -49,6 +52,8 @@ class AdaptiveStrategy(bt.Strategy):
         # 当前策略状态
         self.current_strategy = {}  # 当前激活的策略类型（按标的存储）
         self.strategy_switch_time = {}  # 上次策略切换时间（按标的存储）
+        self.next_switch_time = {}  # 允许再次切换策略的最早时间（按标的存储）
+        self.switch_delay = timedelta(days=self.p.switch_delay)
         self.strategy_switches = []  # 策略切换记录
         self.strategy_usage_count = defaultdict(int)  # 策略使用计数
         
@@ -56,15 +61,25 @@ class AdaptiveStrategy(bt.Strategy):
         if self.p.strategy_selector is None:
             raise ValueError("必须提供策略选择器")
         
+        # 按数据源顺序存放的指标引用及标的到序号的映射，逐K线取用时不再按拼接的属性名查找
+        self.magic_nines = []
+        self.atrs = []
+        self.data_index = {}
+        
         # 为每个数据源创建指标和初始化状态
         for i, d in enumerate(self.datas):
             symbol = d._name
+            self.data_index[symbol] = i
             
             # 计算神奇九转指标
-            setattr(self, f'magic_nine_{i}', MagicNine(d, period=self.p.magic_period))
+            magic_nine = MagicNine(d, period=self.p.magic_period)
+            setattr(self, f'magic_nine_{i}', magic_nine)
+            self.magic_nines.append(magic_nine)
             
             # 计算ATR指标，用于动态止损
-            setattr(self, f'atr_{i}', bt.indicators.ATR(d, period=self.p.atr_period))
+            atr = bt.indicators.ATR(d, period=self.p.atr_period)
+            setattr(self, f'atr_{i}', atr)
+            self.atrs.append(atr)
             
             # 其他辅助指标（不强制用于信号决策）
             setattr(self, f'rsi_{i}', RSIBundle(d))
@@ -82,11 +97,12 @@ class AdaptiveStrategy(bt.Strategy):
             # 初始情况下，使用原始策略
             self.current_strategy[symbol] = StrategyType.ORIGINAL
             self.strategy_switch_time[symbol] = datetime.now() - timedelta(days=self.p.switch_delay + 1)
+            self.next_switch_time[symbol] = self.strategy_switch_time[symbol] + self.switch_delay
             
             # 记录初始策略使用
             self.strategy_usage_count[StrategyType.ORIGINAL] += 1
         
-        logger.info(f"自适应策略初始化完成 (比较周期:{self.p.magic_period}, 信号触发计数:{self.p.magic_count})")
+        logger.info("自适应策略初始化完成 (比较周期:%s, 信号触发计数:%s)", self.p.magic_period, self.p.magic_count)
     
     def notify_order(self, order):
         """订单状态通知"""
@@ -98,24 +114,26 @@ class AdaptiveStrategy(bt.Strategy):
         
         if order.status in [order.Completed]:
             if order.isbuy():
-                logger.info(f'{order.data.datetime.datetime(0).isoformat()} 买入执行: 价格: {order.executed.price:.2f}, '
-                         f'成本: {order.executed.value:.2f}, 手续费: {order.executed.comm:.2f}')
+                logger.info('%s 买入执行: 价格: %.2f, '
+                         '成本: %.2f, 手续费: %.2f',
+                         order.data.datetime.datetime(0), order.executed.price, order.executed.value, order.executed.comm)
                 self.buy_price[symbol] = order.executed.price
                 self.buy_comm[symbol] = order.executed.comm
                 
                 # 设置初始止损价格（如果使用止损策略）
                 active_strategy_type = self.current_strategy[symbol]
-                if active_strategy_type in [StrategyType.ADVANCED_STOP_LOSS, StrategyType.SMART_STOP_LOSS]:
+                if active_strategy_type in _STOP_LOSS_STRATEGY_TYPES:
                     self._set_initial_stop_loss(order.data)
                 
             elif order.issell():
-                logger.info(f'{order.data.datetime.datetime(0).isoformat()} 卖出执行: 价格: {order.executed.price:.2f}, '
-                         f'成本: {order.executed.value:.2f}, 手续费: {order.executed.comm:.2f}')
+                logger.info('%s 卖出执行: 价格: %.2f, '
+                         '成本: %.2f, 手续费: %.2f',
+                         order.data.datetime.datetime(0), order.executed.price, order.executed.value, order.executed.comm)
                 
                 if self.buy_price[symbol] is not None:
                     profit = (order.executed.price - self.buy_price[symbol]) * order.executed.size
                     profit_pct = (order.executed.price / self.buy_price[symbol] - 1) * 100
-                    logger.info(f'{order.data.datetime.datetime(0).isoformat()} 交易利润: {profit:.2f} ({profit_pct:.2f}%)')
+                    logger.info('%s 交易利润: %.2f (%.2f%%)', order.data.datetime.datetime(0), profit, profit_pct)
                 
                 # 重置止损和最高价格
                 self.stop_loss_price[symbol] = None
@@ -127,12 +145,12 @@ class AdaptiveStrategy(bt.Strategy):
     def notify_trade(self, trade):
         """交易结果通知"""
         if trade.isclosed:
-            logger.info(f'{trade.data.datetime.datetime(0).isoformat()} 交易利润, 毛利润: {trade.pnl:.2f}, 净利润: {trade.pnlcomm:.2f}')
+            logger.info('%s 交易利润, 毛利润: %.2f, 净利润: %.2f', trade.data.datetime.datetime(0), trade.pnl, trade.pnlcomm)
     
     def next(self):
         """每个K线触发的主要逻辑"""
-        current_date = self.datetime.date()
-        
+        # 当前时间每根K线只取一次，各标的检查策略切换时共用
+        now = datetime.now()
         for i, d in enumerate(self.datas):
             symbol = d._name
             
@@ -141,7 +159,7 @@ class AdaptiveStrategy(bt.Strategy):
                 continue
             
             # 检查是否应该切换策略
-            self._check_strategy_switch(symbol, d, i)
+            self._check_strategy_switch(symbol, d, i, now)
             
             # 获取当前激活的策略
             active_strategy_type = self.current_strategy[symbol]
@@ -154,8 +172,7 @@ class AdaptiveStrategy(bt.Strategy):
                 self.holding_days[symbol] += 1
             
             # 获取当前指标值
-            magic_nine = getattr(self, f'magic_nine_{i}')
-            atr = getattr(self, f'atr_{i}')
+            magic_nine = self.magic_nines[i]
             
             # 检查是否有仓位
             if self.getposition(d).size == 0:
@@ -166,8 +183,9 @@ class AdaptiveStrategy(bt.Strategy):
                     size = int(value * 0.95 / current_price)  # 使用95%资金
                     
                     if size > 0:
-                        logger.info(f'{d.datetime.datetime(0).isoformat()} 买入信号! 神奇九转计数: {magic_nine.lines.buy_setup[0]}, '
-                                 f'价格: {current_price:.2f}, 数量: {size}, 策略类型: {active_strategy_type.value}')
+                        logger.info('%s 买入信号! 神奇九转计数: %s, '
+                                 '价格: %.2f, 数量: %s, 策略类型: %s',
+                                 d.datetime.datetime(0), magic_nine.lines.buy_setup[0], current_price, size, active_strategy_type.value)
                         
                         # 下买入订单
                         self.order = self.buy(data=d, size=size)
@@ -179,18 +197,19 @@ class AdaptiveStrategy(bt.Strategy):
                     self.highest_price[symbol] = current_price
                     
                     # 如果使用高级或智能止损，更新止损价格
-                    if active_strategy_type in [StrategyType.ADVANCED_STOP_LOSS, StrategyType.SMART_STOP_LOSS]:
+                    if active_strategy_type in _STOP_LOSS_STRATEGY_TYPES:
                         self._update_stop_loss(d, i)
                 
                 # 检查止损条件
-                if active_strategy_type in [StrategyType.ADVANCED_STOP_LOSS, StrategyType.SMART_STOP_LOSS]:
+                if active_strategy_type in _STOP_LOSS_STRATEGY_TYPES:
                     if self.stop_loss_price[symbol] is not None and current_price <= self.stop_loss_price[symbol]:
                         # 触发止损
                         pos_size = self.getposition(d).size
                         loss_pct = (self.buy_price[symbol] - current_price) / self.buy_price[symbol] * 100.0
-                        logger.info(f'{d.datetime.datetime(0).isoformat()} 止损触发! 亏损: {loss_pct:.2f}%, '
-                                 f'价格: {current_price:.2f}, 止损价: {self.stop_loss_price[symbol]:.2f}, '
-                                 f'数量: {pos_size}, 策略类型: {active_strategy_type.value}')
+                        logger.info('%s 止损触发! 亏损: %.2f%%, '
+                                 '价格: %.2f, 止损价: %.2f, '
+                                 '数量: %s, 策略类型: %s',
+                                 d.datetime.datetime(0), loss_pct, current_price, self.stop_loss_price[symbol], pos_size, active_strategy_type.value)
                         
                         # 下卖出订单
                         self.order = self.sell(data=d, size=pos_size)
@@ -201,8 +220,9 @@ class AdaptiveStrategy(bt.Strategy):
                 if magic_nine.lines.sell_setup[0] >= self.p.magic_count:
                     # 卖出信号
                     pos_size = self.getposition(d).size
-                    logger.info(f'{d.datetime.datetime(0).isoformat()} 卖出信号! 神奇九转计数: {magic_nine.lines.sell_setup[0]}, '
-                             f'价格: {current_price:.2f}, 数量: {pos_size}, 策略类型: {active_strategy_type.value}')
+                    logger.info('%s 卖出信号! 神奇九转计数: %s, '
+                             '价格: %.2f, 数量: %s, 策略类型: %s',
+                             d.datetime.datetime(0), magic_nine.lines.sell_setup[0], current_price, pos_size, active_strategy_type.value)
                     
                     # 下卖出订单
                     self.order = self.sell(data=d, size=pos_size)
@@ -214,9 +234,7 @@ class AdaptiveStrategy(bt.Strategy):
     def _set_initial_stop_loss(self, data):
         """设置初始止损价格"""
         symbol = data._name
-        i = [d._name for d in self.datas].index(symbol)
-        
-        atr_value = getattr(self, f'atr_{i}')[0]
+        atr_value = self.atrs[self.data_index[symbol]][0]
         current_price = self.buy_price[symbol]
         active_strategy_type = self.current_strategy[symbol]
         
@@ -246,8 +264,9 @@ class AdaptiveStrategy(bt.Strategy):
         self.stop_loss_price[symbol] = current_price - stop_loss_distance
         self.highest_price[symbol] = current_price
         
-        logger.info(f'{data.datetime.datetime(0).isoformat()} 设置初始止损: {self.stop_loss_price[symbol]:.2f} '
-                 f'(ATR: {atr_value:.2f}, 距离: {stop_loss_distance:.2f}, 策略: {active_strategy_type.value})')
+        logger.info('%s 设置初始止损: %.2f '
+                 '(ATR: %.2f, 距离: %.2f, 策略: %s)',
+                 data.datetime.datetime(0), self.stop_loss_price[symbol], atr_value, stop_loss_distance, active_strategy_type.value)
     
     def _update_stop_loss(self, data, idx):
         """更新止损价格"""
@@ -264,7 +283,7 @@ class AdaptiveStrategy(bt.Strategy):
         
         # 如果盈利超过最小盈利百分比，更新止损价格
         if profit_pct >= self.p.min_profit_pct and self.p.trailing_stop:
-            atr_value = getattr(self, f'atr_{idx}')[0]
+            atr_value = self.atrs[idx][0]
             
             # 基础止损距离
             stop_loss_distance = atr_value * self.p.atr_multiplier
@@ -299,18 +318,15 @@ class AdaptiveStrategy(bt.Strategy):
             if new_stop_loss > self.stop_loss_price[symbol]:
                 old_stop_loss = self.stop_loss_price[symbol]
                 self.stop_loss_price[symbol] = new_stop_loss
-                logger.info(f'{data.datetime.datetime(0).isoformat()} 更新追踪止损: {old_stop_loss:.2f} -> {new_stop_loss:.2f} '
-                         f'(最高价: {self.highest_price[symbol]:.2f}, 盈利: {profit_pct:.2f}%, 策略: {active_strategy_type.value})')
+                logger.info('%s 更新追踪止损: %.2f -> %.2f '
+                         '(最高价: %.2f, 盈利: %.2f%%, 策略: %s)',
+                         data.datetime.datetime(0), old_stop_loss, new_stop_loss, self.highest_price[symbol], profit_pct, active_strategy_type.value)
     
-    def _check_strategy_switch(self, symbol, data, idx):
-        """检查是否应该切换策略"""
-        current_date = self.datetime.date()
-        
-        # 检查是否满足切换延迟
-        last_switch_time = self.strategy_switch_time[symbol]
-        days_since_last_switch = (datetime.now() - last_switch_time).days
-        
-        if days_since_last_switch < self.p.switch_delay:
+    def _check_strategy_switch(self, symbol, data, idx, now):
+        """检查是否应该切换策略，now为本根K线开始处理时取得的当前时间"""
+        # 检查是否满足切换延迟（切换时已算好最早可切换时间，每根K线只需一次比较，
+        # 等价于"距上次切换的整天数 < switch_delay"）
+        if now < self.next_switch_time[symbol]:
             return
         
         # 获取历史收盘价
@@ -331,7 +347,8 @@ class AdaptiveStrategy(bt.Strategy):
             market_regime = self.p.market_analyzer.get_market_regime(prices)
             regime_type = market_regime.get('regime', 'unknown')
             
-            # 记录策略切换
+            # 记录策略切换（只在真正切换时才构造日期对象，避免每根K线都创建date）
+            current_date = self.datetime.date()
             switch_info = {
                 'date': current_date,
                 'from': current_strategy_type,
@@ -342,17 +359,18 @@ class AdaptiveStrategy(bt.Strategy):
             
             # 更新当前策略和切换时间
             self.current_strategy[symbol] = new_strategy_type
-            self.strategy_switch_time[symbol] = datetime.now()
+            self.strategy_switch_time[symbol] = now
+            self.next_switch_time[symbol] = self.strategy_switch_time[symbol] + self.switch_delay
             
             # 记录日志
-            logger.info(f"{current_date} - {symbol}: 策略切换从 {current_strategy_type.value} 到 {new_strategy_type.value}，原因: {switch_info['reason']}")
+            logger.info("%s - %s: 策略切换从 %s 到 %s，原因: %s", current_date, symbol, current_strategy_type.value, new_strategy_type.value, switch_info['reason'])
             
             # 更新策略参数（如果需要）
             if params:
                 if new_strategy_type == StrategyType.SMART_STOP_LOSS and 'risk_aversion' in params:
                     self.p.risk_aversion = params['risk_aversion']
-                    logger.info(f"更新 {symbol} 的智能止损风险规避系数为 {params['risk_aversion']}")
+                    logger.info("更新 %s 的智能止损风险规避系数为 %s", symbol, params['risk_aversion'])
                     
                 elif new_strategy_type == StrategyType.ADVANCED_STOP_LOSS and 'atr_multiplier' in params:
                     self.p.atr_multiplier = params['atr_multiplier']
-                    logger.info(f"更新 {symbol} 的高级止损ATR乘数为 {params['atr_multiplier']}") 
\ No newline at end of file
+                    logger.info("更新 %s 的高级止损ATR乘数为 %s", symbol, params['atr_multiplier']) 
\ No newline at end of file
@@ -3,5 +3,6 @@
 """
 
 from .sortino_ratio import SortinoRatio
+from .custom_drawdown import CustomDrawDown
 
-__all__ = ['SortinoRatio'] 
\ No newline at end of file
+__all__ = ['SortinoRatio', 'CustomDrawDown'] 
\ No newline at end of file
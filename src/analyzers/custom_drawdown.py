@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+"""
+自定义回撤分析器
+基于每个bar的账户总值计算最大回撤及其持续周期
+"""
+import backtrader as bt
+import numpy as np
+
+
+class CustomDrawDown(bt.Analyzer):
+    """自定义回撤分析器，确保计算正确的回撤值"""
+    
+    def __init__(self):
+        self.values = []
+        self.value = 0.0
+        self.max_dd = 0.0
+        self.max_dd_len = 0
+        
+    def notify_fund(self, cash, value, fundvalue, shares):
+        # 策略每个bar通知资金时已经计算过账户总值，直接记录下来，
+        # 避免在next中再次调用broker.getvalue()遍历所有持仓重新估值
+        self.value = value
+        
+    def next(self):
+        # 每个bar只记录资金曲线值，回撤在stop中对整条曲线一次性计算
+        self.values.append(self.value)
+    
+    def stop(self):
+        """
+        对整条资金曲线计算最大回撤及其持续周期
+        
+        与逐bar跟踪的结果一致：峰值初始为0，只有严格高于峰值才刷新峰值并重置持续周期，
+        最大回撤取首次达到的最大值，持续周期为该时刻距最近一次创新高的bar数。
+        """
+        if not self.values:
+            return
+        
+        values = np.asarray(self.values, dtype=np.float64)
+        # 截至每个bar（含）的峰值，以及截至前一个bar的峰值
+        peaks = np.maximum.accumulate(np.maximum(values, 0.0))
+        prev_peaks = np.concatenate(([0.0], peaks[:-1]))
+        
+        # 持续周期 = 当前位置 - 最近一次创新高的位置（从未创新高时从-1起算）
+        positions = np.arange(len(values))
+        new_high = values > prev_peaks
+        dd_len = positions - np.maximum.accumulate(np.where(new_high, positions, -1))
+        
+        valid = peaks > 0
+        if not valid.any():
+            return
+        dd = np.full(len(values), -np.inf)
+        dd[valid] = (peaks[valid] - values[valid]) / peaks[valid]
+        
+        i = int(np.argmax(dd))
+        if dd[i] > 0.0:
+            self.max_dd = float(dd[i])
+            self.max_dd_len = int(dd_len[i])
+        
+    def get_analysis(self):
+        return {'max': {'drawdown': self.max_dd, 'len': self.max_dd_len}}
@@ -56,34 +56,32 @@ class SortinoRatio(bt.Analyzer):
         else:
             self.factor = float(self.p.factor)
         
-        # 跟踪策略的价值
-        self.value = self.strategy.broker.getvalue()
+        # 跟踪策略的价值，首项为初始资金
+        self.current_value = self.strategy.broker.getvalue()
+        self.values = [self.current_value]
         self.target_return = self.p.target_return / self.factor if self.p.annualize else self.p.target_return
     
+    def notify_fund(self, cash, value, fundvalue, shares):
+        # 与CustomDrawDown共用每个bar通知的账户总值，不再各自调用broker.getvalue()重新估值
+        self.current_value = value
+    
     def next(self):
-        """每个bar都会调用此方法来计算当天的收益率"""
-        # 获取当前价值
-        current_value = self.strategy.broker.getvalue()
-        
-        # 计算简单回报率
-        r = (current_value / self.value) - 1.0
-        
-        # 记录回报
-        self.returns.append(r)
-        
-        # 更新当前价值作为下一周期的基线
-        self.value = current_value
+        """每个bar记录账户价值，收益率在stop中对整条资金曲线一次性计算"""
+        self.values.append(self.current_value)
     
     def stop(self):
         """回测结束时计算最终的Sortino比率"""
+        # 每个bar相对前一bar的简单回报率
+        values = np.asarray(self.values, dtype=np.float64)
+        self.returns = values[1:] / values[:-1] - 1.0
+        
         # 如果没有足够的数据，无法计算或返回0
-        if not self.returns or len(self.returns) < 2:
+        if len(self.returns) < 2:
             self.ratio = 0.0
             self.downside_deviation = 0.0
             return
         
-        # 将日度回报转换为numpy数组方便计算
-        returns = np.array(self.returns)
+        returns = self.returns
         
         # 计算平均回报率
         avg_return = np.mean(returns)
@@ -118,7 +116,7 @@ class SortinoRatio(bt.Analyzer):
         self.downside_deviation = downside_deviation
         
         # 记录计算信息
-        logger.debug(f"Sortino比率计算: 平均回报={avg_return:.6f}, 下行标准差={downside_deviation:.6f}, 比率={self.ratio:.6f}")
+        logger.debug("Sortino比率计算: 平均回报=%.6f, 下行标准差=%.6f, 比率=%.6f", avg_return, downside_deviation, self.ratio)
     
     def get_analysis(self):
         """返回分析结果，包含Sortino比率"""
@@ -0,0 +1,67 @@
+"""
+内存K线数据源：直接从DataFrame构建backtrader数据源，不再经由CSV文件重新解析。
+"""
+
+from array import array
+
+import backtrader as bt
+from backtrader.utils import date2num
+
+# K线列的顺序，与数据源的line名称对应
+BAR_FIELDS = ('datetime', 'open', 'high', 'low', 'close', 'volume', 'openinterest')
+
+
+def frame_to_bar_columns(df):
+    """将K线DataFrame转换为按列存放的float64数组
+
+    转换结果与prepare_backtrader_data写出的CSV再由GenericCSVData读入时一致：
+    时间按秒精度的本地时间处理，没有持仓量数据，该列记为NaN。
+
+    参数:
+        df: 以datetime为索引、包含open/high/low/close/volume列的DataFrame
+
+    返回:
+        与BAR_FIELDS顺序一致的array('d')元组
+    """
+    index = df.index
+    if index.tz is not None:
+        # CSV中写出的是不带时区的本地时间
+        index = index.tz_localize(None)
+    index = index.floor('s')
+
+    datetimes = array('d', map(date2num, index.to_pydatetime()))
+    prices = tuple(array('d', df[field].to_numpy(dtype='float64'))
+                   for field in ('open', 'high', 'low', 'close', 'volume'))
+    openinterest = array('d', [float('nan')]) * len(df)
+    return (datetimes, *prices, openinterest)
+
+
+class PreloadedBarsData(bt.feed.DataBase):
+    """回放按列存放的K线数据的数据源
+
+    同一份列数据可被多次回测共享，每次回测创建新的数据源实例即可；
+    预加载时整列写入线缓冲，省去逐根K线的load循环。
+    """
+    params = (('columns', ()),)
+
+    def start(self):
+        super().start()
+        self._idx = -1
+
+    def preload(self):
+        # 没有时区转换、日期区间和过滤器时，load循环只是逐根追加K线，直接整列写入线缓冲
+        if self._tzinput or self._filters or self.p.fromdate is not None or self.p.todate is not None:
+            return super().preload()
+        for field, column in zip(BAR_FIELDS, self.p.columns):
+            getattr(self.lines, field).array.extend(column)
+        self._idx = len(self.p.columns[0])  # 数据已全部回放，之后的_load直接返回False
+        self._last()
+        self.home()
+
+    def _load(self):
+        self._idx += 1
+        if self._idx >= len(self.p.columns[0]):
+            return False
+        for field, column in zip(BAR_FIELDS, self.p.columns):
+            getattr(self.lines, field)[0] = column[self._idx]
+        return True
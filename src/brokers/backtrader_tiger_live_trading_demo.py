@@ -435,9 +435,7 @@ class TradingEngine:
         except KeyboardInterrupt:
             logging.info("用户中断程序，正在退出...")
         except Exception as e:
-            logging.error(f"运行策略时发生错误: {e}")
-            import traceback
-            traceback.print_exc()
+            logging.exception("运行策略时发生错误: %s", e)
 
 
 def main():
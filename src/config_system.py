@@ -1,3 +1,5 @@
+import functools
+import importlib
 import json
 import os
 import logging
@@ -5,9 +7,92 @@ from typing import Dict, Any, Optional, List
 
 logger = logging.getLogger(__name__)
 
+# orjson为可选依赖，解析速度明显快于标准库json，不可用时回退到json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+@functools.lru_cache(maxsize=32)
+def _load_json_cached(file_path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """按(绝对路径, 纳秒级修改时间, 文件大小)缓存解析后的JSON配置
+
+    文件被修改后mtime或大小变化，缓存自动失效。使用纳秒级mtime并附加文件大小，
+    避免在mtime精度较粗的文件系统上，同一秒内save_config后读到旧缓存。
+    返回的字典为共享对象，调用方需要自行复制后再修改。
+
+    Args:
+        file_path: 配置文件的绝对路径
+        mtime_ns: 文件修改时间（纳秒），仅用作缓存键
+        size: 文件大小，仅用作缓存键
+
+    Returns:
+        解析后的配置字典
+    """
+    if orjson is not None:
+        with open(file_path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(file_path, 'r') as f:
+        return json.load(f)
+
+def _copy_json(obj: Any) -> Any:
+    """复制JSON解析结果（仅含dict/list/标量）
+
+    缓存的配置只由dict、list和不可变标量组成，按结构递归复制即可，
+    省去copy.deepcopy的memo记录和类型分派，速度约为其两倍。
+
+    Args:
+        obj: JSON解析得到的对象
+
+    Returns:
+        可以安全修改的副本
+    """
+    if isinstance(obj, dict):
+        return {key: _copy_json(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [_copy_json(value) for value in obj]
+    return obj
+
+@functools.lru_cache(maxsize=None)
+def get_strategy_param_names(strategy_class: type) -> frozenset:
+    """获取策略类支持的参数名集合
+
+    策略类的参数定义在进程内不会变化，按类缓存解析结果，
+    优化循环中反复过滤参数时无需再逐个反射查询。
+
+    Args:
+        strategy_class: backtrader策略类
+
+    Returns:
+        参数名集合
+    """
+    return frozenset(strategy_class.params._getkeys())
+
+
+def filter_strategy_params(strategy_class: type, params: Dict[str, Any]) -> Dict[str, Any]:
+    """原地移除策略类不支持的参数
+
+    Args:
+        strategy_class: backtrader策略类
+        params: 参数字典
+
+    Returns:
+        过滤后的参数字典（即传入的params）
+    """
+    param_names = get_strategy_param_names(strategy_class)
+    for key in [k for k in params if k not in param_names]:
+        logger.debug("参数 %s 不适用于策略类 %s，将被忽略", key, strategy_class.__name__)
+        del params[key]
+    return params
+
+
 class SymbolConfig:
     """标的特定参数配置类，管理不同标的的策略参数"""
     
+    # 优化过程中会反复创建配置实例，使用__slots__省去实例字典
+    __slots__ = ('default_params', 'symbol_params')
+    
     def __init__(self, symbol_params: Optional[Dict[str, Dict[str, Any]]] = None):
         """初始化配置
         
@@ -168,13 +253,15 @@ class SymbolConfig:
         for symbol, params in self.symbol_params.items():
             converted_symbols[symbol] = convert_numpy_types(params)
         
+        config_data = {
+            "default": converted_default,
+            "symbols": converted_symbols
+        }
+        # 保持配置文件原有的4空格缩进格式（orjson只支持2空格缩进，写出时不使用）
         with open(config_path, 'w', encoding='utf-8') as f:
-            json.dump({
-                "default": converted_default,
-                "symbols": converted_symbols
-            }, f, indent=4, ensure_ascii=False)
+            json.dump(config_data, f, indent=4, ensure_ascii=False)
         
-        logger.info(f"配置已保存到: {config_path}")
+        logger.info("配置已保存到: %s", config_path)
     
     @classmethod
     def load_config(cls, file_path: str = 'config/symbol_params.json') -> 'SymbolConfig':
@@ -187,12 +274,13 @@ class SymbolConfig:
             SymbolConfig实例
         """
         if not os.path.exists(file_path):
-            logger.warning(f"配置文件不存在: {file_path}，将使用默认配置")
+            logger.warning("配置文件不存在: %s，将使用默认配置", file_path)
             return cls()
         
         try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
+            # 优化/批量回测会反复加载同一配置，复用缓存的解析结果
+            stat = os.stat(file_path)
+            data = _copy_json(_load_json_cached(os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size))
                 
             instance = cls()
             if 'default' in data:
@@ -200,10 +288,10 @@ class SymbolConfig:
             if 'symbols' in data:
                 instance.symbol_params = data['symbols']
                 
-            logger.info(f"已从 {file_path} 加载配置")
+            logger.info("已从 %s 加载配置", file_path)
             return instance
         except Exception as e:
-            logger.error(f"加载配置失败: {e}")
+            logger.error("加载配置失败: %s", e)
             return cls()
     
     def get_all_symbols(self) -> List[str]:
@@ -218,6 +306,18 @@ class SymbolConfig:
 class StrategyFactory:
     """策略工厂，根据配置创建适合的策略实例"""
     
+    __slots__ = ('symbol_config',)
+    
+    # 策略类型到(模块路径, 类名)的分派表，策略模块在首次使用时才导入
+    _STRATEGY_MODULES = {
+        'original': ('src.magic_nine_strategy', 'MagicNineStrategy'),
+        'advanced_stoploss': ('src.magic_nine_strategy_with_advanced_stoploss', 'MagicNineStrategyWithAdvancedStopLoss'),
+        'smart_stoploss': ('src.magic_nine_strategy_with_smart_stoploss', 'MagicNineStrategyWithSmartStopLoss'),
+    }
+    
+    # 已解析的策略类缓存
+    _strategy_classes: Dict[str, type] = {}
+    
     def __init__(self, symbol_config: Optional[SymbolConfig] = None):
         """初始化策略工厂
         
@@ -242,40 +342,29 @@ class StrategyFactory:
         strategy_type = params.pop('strategy_type', 'smart_stoploss')
         
         # 根据策略类型选择相应的策略类
-        if strategy_type == 'original':
-            from src.magic_nine_strategy import MagicNineStrategy
-            strategy_class = MagicNineStrategy
-            # 移除不兼容的参数
-            for key in list(params.keys()):
-                try:
-                    # 尝试访问参数，如果不存在会抛出异常
-                    getattr(strategy_class.params, key)
-                except AttributeError:
-                    logger.debug(f"参数 {key} 不适用于策略类型 {strategy_type}，将被忽略")
-                    params.pop(key, None)
-        elif strategy_type == 'advanced_stoploss':
-            from src.magic_nine_strategy_with_advanced_stoploss import MagicNineStrategyWithAdvancedStopLoss
-            strategy_class = MagicNineStrategyWithAdvancedStopLoss
-            # 移除不兼容的参数
-            for key in list(params.keys()):
-                try:
-                    # 尝试访问参数，如果不存在会抛出异常
-                    getattr(strategy_class.params, key)
-                except AttributeError:
-                    logger.debug(f"参数 {key} 不适用于策略类型 {strategy_type}，将被忽略")
-                    params.pop(key, None)
-        elif strategy_type == 'smart_stoploss':
-            from src.magic_nine_strategy_with_smart_stoploss import MagicNineStrategyWithSmartStopLoss
-            strategy_class = MagicNineStrategyWithSmartStopLoss
-            # 移除不兼容的参数
-            for key in list(params.keys()):
-                try:
-                    # 尝试访问参数，如果不存在会抛出异常
-                    getattr(strategy_class.params, key)
-                except AttributeError:
-                    logger.debug(f"参数 {key} 不适用于策略类型 {strategy_type}，将被忽略")
-                    params.pop(key, None)
-        else:
-            raise ValueError(f"不支持的策略类型: {strategy_type}")
+        strategy_class = self._get_strategy_class(strategy_type)
         
-        return strategy_class, params 
\ No newline at end of file
+        # 移除不兼容的参数
+        filter_strategy_params(strategy_class, params)
+        
+        return strategy_class, params
+    
+    @classmethod
+    def _get_strategy_class(cls, strategy_type: str) -> type:
+        """根据策略类型获取策略类
+        
+        Args:
+            strategy_type: 策略类型
+            
+        Returns:
+            策略类
+        """
+        strategy_class = cls._strategy_classes.get(strategy_type)
+        if strategy_class is None:
+            target = cls._STRATEGY_MODULES.get(strategy_type)
+            if target is None:
+                raise ValueError(f"不支持的策略类型: {strategy_type}")
+            module_path, class_name = target
+            strategy_class = getattr(importlib.import_module(module_path), class_name)
+            cls._strategy_classes[strategy_type] = strategy_class
+        return strategy_class
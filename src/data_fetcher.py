@@ -4,40 +4,62 @@ import logging
 from datetime import datetime, timedelta
 import time
 
-# 简化日志配置
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+# 日志的级别和格式由入口脚本配置，库模块只获取自己的logger
 logger = logging.getLogger(__name__)
 
-# 导入老虎证券API
-try:
-    from tigeropen.tiger_open_config import TigerOpenClientConfig
-    from tigeropen.common.consts import Language
-    from tigeropen.quote.quote_client import QuoteClient
-    from tigeropen.common.util.signature_utils import read_private_key
-    from tigeropen.common.consts import BarPeriod
-    logger.info("成功导入老虎证券API")
-except ImportError as e:
-    logger.warning(f"无法导入老虎证券API: {e}")
-
 class DataFetcher:
     def __init__(self, config_path, private_key_path, cache_dir):
         """初始化数据获取器"""
         self.cache_dir = cache_dir
         os.makedirs(cache_dir, exist_ok=True)
         
+        # API客户端在首次需要从API获取数据时才创建（见quote_client）
+        self.config_path = config_path
+        self.private_key_path = private_key_path
+        self._quote_client = None
+        self._quote_client_initialized = False
+
+    @property
+    def quote_client(self):
+        """老虎证券行情客户端
+        
+        首次访问时才导入老虎证券API并初始化客户端。命中缓存的回测（如批量回测
+        启动的每个子进程）不再承担tigeropen的导入和权限请求开销。
+        
+        返回:
+            QuoteClient实例，API不可用或初始化失败时为None
+        """
+        if not self._quote_client_initialized:
+            self._quote_client_initialized = True
+            self._quote_client = self._create_quote_client()
+        return self._quote_client
+
+    def _create_quote_client(self):
+        """导入老虎证券API并创建行情客户端"""
+        try:
+            from tigeropen.tiger_open_config import TigerOpenClientConfig
+            from tigeropen.common.consts import Language
+            from tigeropen.quote.quote_client import QuoteClient
+            from tigeropen.common.util.signature_utils import read_private_key
+            logger.info("成功导入老虎证券API")
+        except ImportError as e:
+            logger.warning("无法导入老虎证券API: %s", e)
+            return None
+        
         # 初始化API客户端
         try:
-            self.tiger_client_config = TigerOpenClientConfig(sandbox_debug=False, props_path=config_path)
-            self.tiger_client_config.private_key = read_private_key(private_key_path)
+            self.tiger_client_config = TigerOpenClientConfig(sandbox_debug=False, props_path=self.config_path)
+            self.tiger_client_config.private_key = read_private_key(self.private_key_path)
             self.tiger_client_config.language = Language.zh_CN
             self.tiger_client_config.timeout = 60
             
-            self.quote_client = QuoteClient(self.tiger_client_config)
-            self.quote_client.grab_quote_permission()
+            quote_client = QuoteClient(self.tiger_client_config)
+            quote_client.grab_quote_permission()
             logger.info("老虎证券API客户端初始化完成")
+            return quote_client
         except Exception as e:
-            logger.error(f"初始化API客户端失败: {e}")
-            self.quote_client = None
+            logger.error("初始化API客户端失败: %s", e)
+            return None
 
     def check_cache_exists(self, symbol, period, begin_time, end_time):
         """检查缓存是否存在
@@ -45,13 +67,13 @@ class DataFetcher:
         返回:
             (bool, str): 缓存是否存在，存在则返回缓存文件路径
         """
-        begin_str = begin_time.strftime("%Y-%m-%d")
-        end_str = end_time.strftime("%Y-%m-%d")
+        begin_str = begin_time.date().isoformat()
+        end_str = end_time.date().isoformat()
         
         # 尝试精确匹配的缓存文件
         exact_cache = f"{self.cache_dir}/{symbol}_{period}_{begin_str}_{end_str}.csv"
         if os.path.exists(exact_cache) and os.path.getsize(exact_cache) > 1000:
-            logger.info(f"找到精确匹配的缓存文件: {exact_cache}")
+            logger.info("找到精确匹配的缓存文件: %s", exact_cache)
             return True, exact_cache
             
         # 寻找可能包含所需数据范围的缓存文件
@@ -63,27 +85,68 @@ class DataFetcher:
                 # 从文件名提取日期范围
                 parts = cache_file.replace(f"{symbol}_{period}_", "").replace(".csv", "").split("_")
                 if len(parts) == 2:
-                    file_begin = datetime.strptime(parts[0], "%Y-%m-%d")
-                    file_end = datetime.strptime(parts[1], "%Y-%m-%d")
+                    file_begin = datetime.fromisoformat(parts[0])
+                    file_end = datetime.fromisoformat(parts[1])
                     
                     # 检查文件是否覆盖所需日期范围
                     if file_begin <= begin_time and file_end >= end_time:
                         full_path = os.path.join(self.cache_dir, cache_file)
                         if os.path.getsize(full_path) > 1000:
-                            logger.info(f"找到覆盖日期范围的缓存文件: {cache_file}")
+                            logger.info("找到覆盖日期范围的缓存文件: %s", cache_file)
                             return True, full_path
             except Exception as e:
-                logger.debug(f"解析缓存文件名失败: {cache_file}, 错误: {e}")
+                logger.debug("解析缓存文件名失败: %s, 错误: %s", cache_file, e)
         
         # 检查backtrader准备好的数据文件
         bt_file = f"{self.cache_dir}/{symbol}_{period}_bt.csv"
         if os.path.exists(bt_file) and os.path.getsize(bt_file) > 1000:
-            logger.info(f"找到backtrader数据文件: {bt_file}")
+            logger.info("找到backtrader数据文件: %s", bt_file)
             return True, bt_file
             
-        logger.info(f"未找到 {symbol} 的缓存数据")
+        logger.info("未找到 %s 的缓存数据", symbol)
         return False, None
 
+    def _read_cache_file(self, cache_file):
+        """读取K线缓存CSV
+        
+        CSV解析（尤其是日期列）开销较大，首次读取后在旁边保存一份pickle副本，
+        之后只要副本不比CSV旧就直接加载副本，结果与解析CSV完全一致。
+        backtrader数据文件(_bt.csv)可能被重写，不为其保存副本。
+        
+        参数:
+            cache_file: 缓存CSV文件路径
+            
+        返回:
+            以datetime为索引的DataFrame
+        """
+        use_pickle = not cache_file.endswith('_bt.csv')
+        pickle_file = os.path.splitext(cache_file)[0] + '.pkl'
+        if use_pickle:
+            try:
+                if os.path.getmtime(pickle_file) >= os.path.getmtime(cache_file):
+                    return pd.read_pickle(pickle_file)
+            except Exception as e:
+                # 副本不存在或无法读取（如pandas版本变化）时回退到解析CSV
+                logger.debug("未使用缓存副本 %s: %s", pickle_file, e)
+        
+        df = pd.read_csv(cache_file, index_col=0, parse_dates=True)
+        # 通常parse_dates已得到datetime64索引，直接检查dtype即可；
+        # 仅在自动解析失败（索引仍为object）时才显式转换
+        if df.index.dtype.kind != 'M':
+            df.index = pd.to_datetime(df.index)
+        
+        if use_pickle:
+            # 先写临时文件再原子替换，并发回测不会读到写了一半的副本
+            tmp_file = f"{pickle_file}.{os.getpid()}.tmp"
+            try:
+                df.to_pickle(tmp_file)
+                os.replace(tmp_file, pickle_file)
+            except Exception as e:
+                logger.debug("保存缓存副本失败: %s, 错误: %s", pickle_file, e)
+                if os.path.exists(tmp_file):
+                    os.remove(tmp_file)
+        return df
+
     def get_bar_data(self, symbol, period='1m', begin_time=None, end_time=None, use_cache=True):
         """获取K线数据，优先使用缓存
         
@@ -104,14 +167,14 @@ class DataFetcher:
         if use_cache:
             cache_exists, cache_file = self.check_cache_exists(symbol, period, begin_time, end_time)
             if cache_exists:
-                logger.info(f"使用缓存数据，无需API调用: {cache_file}")
+                logger.info("使用缓存数据，无需API调用: %s", cache_file)
                 try:
-                    return pd.read_csv(cache_file, index_col=0, parse_dates=True)
+                    return self._read_cache_file(cache_file)
                 except Exception as e:
-                    logger.warning(f"读取缓存文件失败: {e}, 将从API获取数据")
+                    logger.warning("读取缓存文件失败: %s, 将从API获取数据", e)
         
         # 如果没有缓存或不使用缓存，则从API获取数据
-        logger.info(f"从API获取数据: {symbol}")
+        logger.info("从API获取数据: %s", symbol)
         
         # 检查API客户端是否可用
         if self.quote_client is None:
@@ -119,6 +182,7 @@ class DataFetcher:
             return pd.DataFrame()
         
         # 转换周期字符串为Tiger API枚举值
+        from tigeropen.common.consts import BarPeriod
         tiger_period = self._convert_period(period)
         
         # 分段获取数据
@@ -151,7 +215,7 @@ class DataFetcher:
             for stock_code in stock_symbols:
                 try:
                     limit_value = 5000 if is_minute_level else 1000
-                    logger.info(f"调用Tiger API获取数据: {stock_code} [{current_begin} 至 {current_end}]")
+                    logger.info("调用Tiger API获取数据: %s [%s 至 %s]", stock_code, current_begin, current_end)
                     bars = self.quote_client.get_bars(
                         symbols=[stock_code],
                         period=tiger_period,
@@ -161,14 +225,10 @@ class DataFetcher:
                     )
                     
                     if isinstance(bars, pd.DataFrame) and not bars.empty:
-                        df = bars.copy()
-                        df['datetime'] = pd.to_datetime(df['time'], unit='ms')
-                        df.set_index('datetime', inplace=True)
-                        df.sort_index(inplace=True)
-                        all_data_frames.append(df)
+                        all_data_frames.append(bars)
                         break
                 except Exception as e:
-                    logger.warning(f"API调用失败，股票: {stock_code}, 错误: {e}")
+                    logger.warning("API调用失败，股票: %s, 错误: %s", stock_code, e)
                     continue
             
             current_begin = current_end
@@ -177,28 +237,35 @@ class DataFetcher:
         
         # 合并数据并保存缓存
         if not all_data_frames:
-            logger.warning(f"无法获取数据: {symbol}")
+            logger.warning("无法获取数据: %s", symbol)
             return pd.DataFrame()
         
-        combined_df = pd.concat(all_data_frames)
-        combined_df = combined_df[~combined_df.index.duplicated(keep='first')]
-        combined_df.sort_index(inplace=True)
+        # 合并后对整个区间的毫秒时间戳做一次向量化转换，不再逐段复制、转换和排序
+        combined_df = pd.concat(all_data_frames, ignore_index=True)
+        combined_df['datetime'] = pd.to_datetime(combined_df['time'], unit='ms')
+        combined_df.set_index('datetime', inplace=True)
+        # 分段请求的数据通常已按时间递增且无重叠，只在确有重复或乱序时才去重/排序，避免整表复制
+        if not combined_df.index.is_unique:
+            combined_df = combined_df[~combined_df.index.duplicated(keep='first')]
+        if not combined_df.index.is_monotonic_increasing:
+            combined_df.sort_index(inplace=True)
         
         # 保存到缓存
-        begin_str = begin_time.strftime("%Y-%m-%d")
-        end_str = end_time.strftime("%Y-%m-%d")
+        begin_str = begin_time.date().isoformat()
+        end_str = end_time.date().isoformat()
         cache_filename = f"{self.cache_dir}/{symbol}_{period}_{begin_str}_{end_str}.csv"
         
         try:
             combined_df.to_csv(cache_filename)
-            logger.info(f"数据已保存到缓存: {cache_filename}")
+            logger.info("数据已保存到缓存: %s", cache_filename)
         except Exception as e:
-            logger.warning(f"保存缓存失败: {e}")
+            logger.warning("保存缓存失败: %s", e)
         
         return combined_df
     
     def _convert_period(self, period):
         """转换周期字符串为Tiger API枚举值"""
+        from tigeropen.common.consts import BarPeriod
         if isinstance(period, str):
             period_map = {
                 '1m': BarPeriod.ONE_MINUTE,
@@ -221,12 +288,12 @@ class DataFetcher:
             df = self.get_bar_data(symbol, period, begin_time, end_time, use_cache=use_cache)
         
         if df.empty:
-            logger.warning(f"无数据可用于准备Backtrader文件: {symbol}")
+            logger.warning("无数据可用于准备Backtrader文件: %s", symbol)
             return None
             
         bt_filename = f"{self.cache_dir}/{symbol}_{period}_bt.csv"
         df.to_csv(bt_filename, date_format='%Y-%m-%d %H:%M:%S', 
                   columns=['open', 'high', 'low', 'close', 'volume'])
         
-        logger.info(f"已准备Backtrader数据文件: {bt_filename}")
+        logger.info("已准备Backtrader数据文件: %s", bt_filename)
         return bt_filename
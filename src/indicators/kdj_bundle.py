@@ -37,8 +37,8 @@ class KDJBundle(bt.Indicator):
         # 计算J值 (3*K - 2*D)
         self.J = 3.0 * self.K - 2.0 * self.D
         
-    def next(self):
-        # 将计算出的值赋给输出线
-        self.lines.K[0] = self.K[0]
-        self.lines.D[0] = self.D[0]
-        self.lines.J[0] = self.J[0] 
\ No newline at end of file
+        # 直接将计算结果绑定到输出线，runonce模式下整段数组批量赋值，
+        # 不再需要逐bar执行next复制数值
+        self.lines.K = self.K
+        self.lines.D = self.D
+        self.lines.J = self.J 
\ No newline at end of file
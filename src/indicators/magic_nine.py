@@ -1,3 +1,5 @@
+import array
+
 import backtrader as bt
 import numpy as np
 
@@ -49,4 +51,42 @@ class MagicNine(bt.Indicator):
         
         # 生成信号
         self.lines.buy_signal[0] = 1 if self.buy_count >= self.p.signal_threshold else 0
-        self.lines.sell_signal[0] = 1 if self.sell_count >= self.p.signal_threshold else 0 
\ No newline at end of file
+        self.lines.sell_signal[0] = 1 if self.sell_count >= self.p.signal_threshold else 0
+    
+    def once(self, start, end):
+        """
+        runonce模式下的批量计算，结果与逐bar执行next完全一致
+        
+        买入/卖出计数就是"收盘价低于/高于period前收盘价"连续成立的长度，
+        用NumPy在整段数组上一次算出，避免每个bar走一遍Python层的line访问。
+        可能被分段调用（oncestart + once），计数从上一段末尾的状态延续。
+        """
+        if start >= end:
+            return
+        
+        close = np.asarray(self.data.close.array, dtype=np.float64)
+        # 与next中close[-period]的取值方式一致（包括开头几个bar的负索引回绕）
+        bar_idx = np.arange(start, end)
+        current = close[bar_idx]
+        previous = close[bar_idx - self.p.period]
+        down = current < previous
+        up = current > previous
+        
+        # 连续成立长度 = 当前位置 - 最近一次不成立的位置；
+        # 段内尚未出现不成立时，把上一段延续下来的计数视为段首之前的虚拟位置
+        offsets = np.arange(end - start)
+        buy = offsets - np.maximum.accumulate(np.where(down, -1 - self.buy_count, offsets))
+        sell = offsets - np.maximum.accumulate(np.where(up, -1 - self.sell_count, offsets))
+        self.buy_count = int(buy[-1])
+        self.sell_count = int(sell[-1])
+        
+        threshold = self.p.signal_threshold
+        self._fill(self.lines.buy_setup, start, end, np.where(buy > 0, buy, np.nan))
+        self._fill(self.lines.sell_setup, start, end, np.where(sell > 0, sell, np.nan))
+        self._fill(self.lines.buy_signal, start, end, (buy >= threshold).astype(np.float64))
+        self._fill(self.lines.sell_signal, start, end, (sell >= threshold).astype(np.float64))
+    
+    @staticmethod
+    def _fill(line, start, end, values):
+        """将计算结果写入line的底层数组（结果已是连续float64时不再额外复制）"""
+        line.array[start:end] = array.array('d', np.ascontiguousarray(values, dtype=np.float64).tobytes()) 
\ No newline at end of file
@@ -28,9 +28,9 @@ class RSIBundle(bt.Indicator):
         self.rsi1 = bt.indicators.RSI(self.data, period=self.p.period1)
         self.rsi2 = bt.indicators.RSI(self.data, period=self.p.period2)
         self.rsi3 = bt.indicators.RSI(self.data, period=self.p.period3)
-    
-    def next(self):
-        # 更新lines值
-        self.lines.rsi6[0] = self.rsi1.lines.rsi[0]
-        self.lines.rsi12[0] = self.rsi2.lines.rsi[0]
-        self.lines.rsi24[0] = self.rsi3.lines.rsi[0] 
\ No newline at end of file
+        
+        # 直接将各RSI线绑定到输出线，runonce模式下整段数组批量赋值，
+        # 不再需要逐bar执行next复制数值
+        self.lines.rsi6 = self.rsi1.lines.rsi
+        self.lines.rsi12 = self.rsi2.lines.rsi
+        self.lines.rsi24 = self.rsi3.lines.rsi 
\ No newline at end of file
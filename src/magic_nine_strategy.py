@@ -1,8 +1,8 @@
 import backtrader as bt
 import logging
-import pytz
-from datetime import datetime, timedelta
+from datetime import timedelta, timezone
 from src.indicators import MagicNine, RSIBundle, KDJBundle
+from src.utils import EASTERN_TZ
 
 logger = logging.getLogger(__name__)
 
@@ -34,14 +34,19 @@ class MagicNineStrategy(bt.Strategy):
         self.trailing_activated = False
         self.is_short = False  # 标记当前是否为空头仓位
         
+        # 止损价格系数在回测期间不变，预先算好，持仓时每根K线只需一次乘法
+        self.long_trail_factor = 1 - self.p.trailing_pct / 100
+        self.short_trail_factor = 1 + self.p.trailing_pct / 100
+        self.short_stop_factor = 1 + self.p.stop_loss_pct / 100
+        
         # 指标初始化
         self.magic_nine = MagicNine(self.data, period=self.p.magic_period)
         self.rsi = bt.indicators.RSI(self.data, period=self.p.rsi_period)
         self.ema20 = bt.indicators.EMA(self.data, period=20)
         self.ema50 = bt.indicators.EMA(self.data, period=50)
         
-        logger.info(f"策略初始化完成 - 双向交易神奇九转模式 (比较周期:{self.p.magic_period}, 信号触发计数:{self.p.magic_count})")
-        logger.info(f"避开开盘后{self.p.avoid_open_minutes}分钟和收盘前{self.p.avoid_close_minutes}分钟的交易")
+        logger.info("策略初始化完成 - 双向交易神奇九转模式 (比较周期:%s, 信号触发计数:%s)", self.p.magic_period, self.p.magic_count)
+        logger.info("避开开盘后%s分钟和收盘前%s分钟的交易", self.p.avoid_open_minutes, self.p.avoid_close_minutes)
     
     def notify_order(self, order):
         """订单状态通知回调"""
@@ -53,26 +58,29 @@ class MagicNineStrategy(bt.Strategy):
         if order.status in [order.Completed]:
             if order.isbuy():
                 logger.info(
-                    f'{self.data.datetime.datetime(0).isoformat()} 买入执行，价格: {order.executed.price:.2f}, '
-                    f'成本: {order.executed.value:.2f}, 手续费: {order.executed.comm:.2f}'
+                    '%s 买入执行，价格: %.2f, '
+                    '成本: %.2f, 手续费: %.2f',
+                    self.data.datetime.datetime(0), order.executed.price, order.executed.value, order.executed.comm
                 )
                 self.buy_price = order.executed.price
                 self.buy_comm = order.executed.comm
             else:  # 卖出
                 if self.is_short:
                     logger.info(
-                        f'{self.data.datetime.datetime(0).isoformat()} 卖空执行，价格: {order.executed.price:.2f}, '
-                        f'成本: {order.executed.value:.2f}, 手续费: {order.executed.comm:.2f}'
+                        '%s 卖空执行，价格: %.2f, '
+                        '成本: %.2f, 手续费: %.2f',
+                        self.data.datetime.datetime(0), order.executed.price, order.executed.value, order.executed.comm
                     )
                     self.buy_price = order.executed.price  # 记录卖空价格
                     self.buy_comm = order.executed.comm  
                 else:
                     logger.info(
-                        f'{self.data.datetime.datetime(0).isoformat()} 卖出执行，价格: {order.executed.price:.2f}, '
-                        f'成本: {order.executed.value:.2f}, 手续费: {order.executed.comm:.2f}'
+                        '%s 卖出执行，价格: %.2f, '
+                        '成本: %.2f, 手续费: %.2f',
+                        self.data.datetime.datetime(0), order.executed.price, order.executed.value, order.executed.comm
                     )
         elif order.status in [order.Canceled, order.Margin, order.Rejected]:
-            logger.warning(f'{self.data.datetime.datetime(0).isoformat()} 订单取消/保证金不足/拒绝')
+            logger.warning('%s 订单取消/保证金不足/拒绝', self.data.datetime.datetime(0))
 
         # 重置订单引用
         self.order = None
@@ -84,10 +92,10 @@ class MagicNineStrategy(bt.Strategy):
                 # 计算空头交易利润
                 profit = (self.buy_price - trade.price) * trade.size
                 profit_pct = (self.buy_price / trade.price - 1) * 100
-                logger.info(f'{self.data.datetime.datetime(0).isoformat()} 空头交易利润: {profit:.2f}, 收益率: {profit_pct:.2f}%')
+                logger.info('%s 空头交易利润: %.2f, 收益率: %.2f%%', self.data.datetime.datetime(0), profit, profit_pct)
                 self.is_short = False
             
-            logger.info(f'{self.data.datetime.datetime(0).isoformat()} 交易利润, 毛利润: {trade.pnl:.2f}, 净利润: {trade.pnlcomm:.2f}')
+            logger.info('%s 交易利润, 毛利润: %.2f, 净利润: %.2f', self.data.datetime.datetime(0), trade.pnl, trade.pnlcomm)
     
     def next(self):
         """主策略逻辑"""
@@ -101,16 +109,11 @@ class MagicNineStrategy(bt.Strategy):
         # 时区判断与转换 - 证券交易时间处理
         # 美股正常交易时间是美东时间(ET)的9:30-16:00
         
-        # 使用pytz准确判断是否是夏令时
-        eastern = pytz.timezone('US/Eastern')
-        # 使用当前日期构建一个aware datetime对象
+        # 准确判断是否是夏令时
         # backtrader提供的datetime对象是naive的，我们需要假设它是UTC时间
         # 然后验证当前时间对应的美东时间是否在夏令时
-        utc_time = pytz.utc.localize(datetime(
-            current_time.year, current_time.month, current_time.day,
-            current_time.hour, current_time.minute, current_time.second
-        ))
-        et_time = utc_time.astimezone(eastern)
+        utc_time = current_time.replace(microsecond=0, tzinfo=timezone.utc)
+        et_time = utc_time.astimezone(EASTERN_TZ)
         is_dst = et_time.dst() != timedelta(0)
         
         # 初始假设时间是美东时间
@@ -153,21 +156,22 @@ class MagicNineStrategy(bt.Strategy):
         # 记录详细的时间信息用于调试
         if len(self) % 100 == 0 or is_near_close:  # 每100个bar记录一次或接近收盘时记录
             time_format = "UTC" if is_utc_time else "ET"
-            logger.info(f"时间检查: 原始时间={current_time.isoformat()}, 计算为美东时间:{et_hour}:{et_minute:02d}, "
-                       f"时间格式:{time_format}, 交易时段:{is_trading_time}, 安全交易时段:{is_safe_trading_time}, "
-                       f"开盘后分钟数:{minutes_since_open}, 收盘前分钟数:{minutes_before_close}, "
-                       f"接近收盘:{is_near_close}, 夏令时:{is_dst}")
+            logger.info("时间检查: 原始时间=%s, 计算为美东时间:%s:%02d, "
+                       "时间格式:%s, 交易时段:%s, 安全交易时段:%s, "
+                       "开盘后分钟数:%s, 收盘前分钟数:%s, "
+                       "接近收盘:%s, 夏令时:%s",
+                       current_time, et_hour, et_minute, time_format, is_trading_time, is_safe_trading_time, minutes_since_open, minutes_before_close, is_near_close, is_dst)
         
         # 如果接近收盘且有持仓，强制平仓
         if is_near_close and self.position:
             if self.position.size > 0:  # 多头持仓
-                logger.info(f'{current_time.isoformat()} 收盘前强制平仓多头! 价格: {self.data.close[0]:.2f}, ET时间约: {et_hour}:{et_minute:02d}')
+                logger.info('%s 收盘前强制平仓多头! 价格: %.2f, ET时间约: %s:%02d', current_time, self.data.close[0], et_hour, et_minute)
                 self.order = self.sell(size=self.position_size)
                 self.position_size = 0
                 self.stop_loss = None
                 return
             elif self.position.size < 0:  # 空头持仓
-                logger.info(f'{current_time.isoformat()} 收盘前强制平仓空头! 价格: {self.data.close[0]:.2f}, ET时间约: {et_hour}:{et_minute:02d}')
+                logger.info('%s 收盘前强制平仓空头! 价格: %.2f, ET时间约: %s:%02d', current_time, self.data.close[0], et_hour, et_minute)
                 self.order = self.buy(size=self.position_size)
                 self.position_size = 0
                 self.stop_loss = None
@@ -196,8 +200,9 @@ class MagicNineStrategy(bt.Strategy):
                     size = int(value * self.p.position_size / current_price)
                     
                     if size > 0:
-                        logger.info(f'{self.data.datetime.datetime(0).isoformat()} 买入信号! 计数: {self.magic_nine.buy_count}, '
-                                 f'价格: {current_price:.2f}, 数量: {size}, RSI: {self.rsi[0]:.2f}')
+                        logger.info('%s 买入信号! 计数: %s, '
+                                 '价格: %.2f, 数量: %s, RSI: %.2f',
+                                 self.data.datetime.datetime(0), self.magic_nine.buy_count, current_price, size, self.rsi[0])
                         
                         # 下买入订单
                         self.order = self.buy(size=size)
@@ -219,8 +224,9 @@ class MagicNineStrategy(bt.Strategy):
                     size = int(value * self.p.position_size / current_price)
                     
                     if size > 0:
-                        logger.info(f'{self.data.datetime.datetime(0).isoformat()} 卖空信号! 计数: {self.magic_nine.sell_count}, '
-                                 f'价格: {current_price:.2f}, 数量: {size}, RSI: {self.rsi[0]:.2f}')
+                        logger.info('%s 卖空信号! 计数: %s, '
+                                 '价格: %.2f, 数量: %s, RSI: %.2f',
+                                 self.data.datetime.datetime(0), self.magic_nine.sell_count, current_price, size, self.rsi[0])
                         
                         # 下卖空订单
                         self.order = self.sell(size=size)
@@ -228,7 +234,7 @@ class MagicNineStrategy(bt.Strategy):
                         self.is_short = True
                         
                         # 记录卖空价格用于计算止损
-                        self.stop_loss = current_price * (1 + self.p.stop_loss_pct / 100)
+                        self.stop_loss = current_price * self.short_stop_factor
         
         else:
             # 已有仓位，检查止损或平仓条件
@@ -238,25 +244,25 @@ class MagicNineStrategy(bt.Strategy):
                 # 计算移动止损价格
                 if self.trailing_activated:
                     # 已激活移动止损
-                    trail_price = current_price * (1 - self.p.trailing_pct / 100)
+                    trail_price = current_price * self.long_trail_factor
                     if trail_price > self.stop_loss:
                         old_stop = self.stop_loss
                         self.stop_loss = trail_price
-                        logger.info(f'{self.data.datetime.datetime(0).isoformat()} 更新移动止损: {old_stop:.2f} -> {trail_price:.2f}')
+                        logger.info('%s 更新移动止损: %.2f -> %.2f', self.data.datetime.datetime(0), old_stop, trail_price)
                 else:
                     # 判断是否达到移动止损激活条件
                     profit_pct = (current_price / self.buy_price - 1) * 100
                     if profit_pct >= self.p.trailing_pct:
                         self.trailing_activated = True
-                        trail_price = current_price * (1 - self.p.trailing_pct / 100)
+                        trail_price = current_price * self.long_trail_factor
                         if self.stop_loss is None or trail_price > self.stop_loss:
                             old_stop = self.stop_loss if self.stop_loss is not None else 0
                             self.stop_loss = trail_price
-                            logger.info(f'{self.data.datetime.datetime(0).isoformat()} 激活移动止损: {old_stop:.2f} -> {trail_price:.2f}')
+                            logger.info('%s 激活移动止损: %.2f -> %.2f', self.data.datetime.datetime(0), old_stop, trail_price)
                 
                 # 1. 多头止损检查
                 if self.stop_loss is not None and current_price <= self.stop_loss:
-                    logger.info(f'{self.data.datetime.datetime(0).isoformat()} 多头止损触发! 价格: {current_price:.2f}, 止损价: {self.stop_loss:.2f}')
+                    logger.info('%s 多头止损触发! 价格: %.2f, 止损价: %.2f', self.data.datetime.datetime(0), current_price, self.stop_loss)
                     self.order = self.sell(size=self.position_size)
                     self.position_size = 0
                     self.stop_loss = None
@@ -266,8 +272,9 @@ class MagicNineStrategy(bt.Strategy):
                 # 2. 获利目标检查
                 profit_pct = (current_price / self.buy_price - 1) * 100
                 if profit_pct >= self.p.profit_target_pct:
-                    logger.info(f'{self.data.datetime.datetime(0).isoformat()} 达到多头利润目标! 价格: {current_price:.2f}, '
-                             f'买入价: {self.buy_price:.2f}, 利润: {profit_pct:.2f}%')
+                    logger.info('%s 达到多头利润目标! 价格: %.2f, '
+                             '买入价: %.2f, 利润: %.2f%%',
+                             self.data.datetime.datetime(0), current_price, self.buy_price, profit_pct)
                     self.order = self.sell(size=self.position_size)
                     self.position_size = 0
                     self.stop_loss = None
@@ -276,8 +283,9 @@ class MagicNineStrategy(bt.Strategy):
                 
                 # 3. 检查卖出信号作为多头平仓条件
                 if self.magic_nine.lines.sell_setup[0] >= self.p.magic_count:
-                    logger.info(f'{self.data.datetime.datetime(0).isoformat()} 卖出信号! 计数: {self.magic_nine.sell_count}, '
-                             f'价格: {current_price:.2f}, 数量: {self.position_size}')
+                    logger.info('%s 卖出信号! 计数: %s, '
+                             '价格: %.2f, 数量: %s',
+                             self.data.datetime.datetime(0), self.magic_nine.sell_count, current_price, self.position_size)
                     
                     # 下卖出订单
                     self.order = self.sell(size=self.position_size)
@@ -289,7 +297,7 @@ class MagicNineStrategy(bt.Strategy):
             elif self.position.size < 0:
                 # 1. 空头止损检查
                 if self.stop_loss is not None and current_price >= self.stop_loss:
-                    logger.info(f'{self.data.datetime.datetime(0).isoformat()} 空头止损触发! 价格: {current_price:.2f}, 止损价: {self.stop_loss:.2f}')
+                    logger.info('%s 空头止损触发! 价格: %.2f, 止损价: %.2f', self.data.datetime.datetime(0), current_price, self.stop_loss)
                     self.order = self.buy(size=self.position_size)
                     self.position_size = 0
                     self.stop_loss = None
@@ -299,27 +307,28 @@ class MagicNineStrategy(bt.Strategy):
                 # 2. 移动止损更新
                 if self.trailing_activated:
                     # 已激活移动止损
-                    trail_price = current_price * (1 + self.p.trailing_pct / 100)
+                    trail_price = current_price * self.short_trail_factor
                     if trail_price < self.stop_loss:
                         old_stop = self.stop_loss
                         self.stop_loss = trail_price
-                        logger.info(f'{self.data.datetime.datetime(0).isoformat()} 更新空头移动止损: {old_stop:.2f} -> {trail_price:.2f}')
+                        logger.info('%s 更新空头移动止损: %.2f -> %.2f', self.data.datetime.datetime(0), old_stop, trail_price)
                 else:
                     # 判断是否达到移动止损激活条件
                     profit_pct = (self.buy_price / current_price - 1) * 100
                     if profit_pct >= self.p.trailing_pct:
                         self.trailing_activated = True
-                        trail_price = current_price * (1 + self.p.trailing_pct / 100)
+                        trail_price = current_price * self.short_trail_factor
                         if trail_price < self.stop_loss:
                             old_stop = self.stop_loss
                             self.stop_loss = trail_price
-                            logger.info(f'{self.data.datetime.datetime(0).isoformat()} 激活空头移动止损: {old_stop:.2f} -> {trail_price:.2f}')
+                            logger.info('%s 激活空头移动止损: %.2f -> %.2f', self.data.datetime.datetime(0), old_stop, trail_price)
                 
                 # 3. 检查空头利润目标
                 profit_pct = (self.buy_price / current_price - 1) * 100
                 if profit_pct >= self.p.profit_target_pct:
-                    logger.info(f'{self.data.datetime.datetime(0).isoformat()} 达到空头利润目标! 价格: {current_price:.2f}, '
-                             f'卖出价: {self.buy_price:.2f}, 利润: {profit_pct:.2f}%')
+                    logger.info('%s 达到空头利润目标! 价格: %.2f, '
+                             '卖出价: %.2f, 利润: %.2f%%',
+                             self.data.datetime.datetime(0), current_price, self.buy_price, profit_pct)
                     self.order = self.buy(size=self.position_size)
                     self.position_size = 0
                     self.stop_loss = None
@@ -328,8 +337,9 @@ class MagicNineStrategy(bt.Strategy):
                 
                 # 4. 检查买入信号作为空头平仓条件
                 if self.magic_nine.lines.buy_setup[0] >= self.p.magic_count:
-                    logger.info(f'{self.data.datetime.datetime(0).isoformat()} 买入信号! 计数: {self.magic_nine.buy_count}, '
-                             f'价格: {current_price:.2f}, 数量: {self.position_size}')
+                    logger.info('%s 买入信号! 计数: %s, '
+                             '价格: %.2f, 数量: %s',
+                             self.data.datetime.datetime(0), self.magic_nine.buy_count, current_price, self.position_size)
                     
                     # 下买入订单平空头仓位
                     self.order = self.buy(size=self.position_size)
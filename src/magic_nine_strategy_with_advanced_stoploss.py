@@ -89,9 +89,10 @@ class MagicNineStrategyWithAdvancedStopLoss(bt.Strategy):
             self.p.long_min_profit_pct = self.p.min_profit_pct
             self.p.short_min_profit_pct = self.p.min_profit_pct
         
-        logger.info(f"策略初始化完成 - 高级止损双向神奇九转模式 (比较周期:{self.p.magic_period}, ATR周期:{self.p.atr_period}, "
-                  f"ATR乘数:{self.p.atr_multiplier}, 最大止损:{self.p.max_loss_pct}%, 追踪止损:{self.p.trailing_stop})")
-        logger.info(f"避开开盘后{self.p.avoid_open_minutes}分钟和收盘前{self.p.avoid_close_minutes}分钟的交易")
+        logger.info("策略初始化完成 - 高级止损双向神奇九转模式 (比较周期:%s, ATR周期:%s, "
+                  "ATR乘数:%s, 最大止损:%s%%, 追踪止损:%s)",
+                  self.p.magic_period, self.p.atr_period, self.p.atr_multiplier, self.p.max_loss_pct, self.p.trailing_stop)
+        logger.info("避开开盘后%s分钟和收盘前%s分钟的交易", self.p.avoid_open_minutes, self.p.avoid_close_minutes)
     
     def notify_order(self, order):
         """订单状态通知"""
@@ -103,8 +104,9 @@ class MagicNineStrategyWithAdvancedStopLoss(bt.Strategy):
             
             if order.isbuy():
                 buy_or_cover = "买入" if not self.is_short else "平空买入"
-                logger.info(f'{self.data.datetime.datetime(0).isoformat()} {buy_or_cover}执行: 价格: {order.executed.price:.2f}, '
-                         f'成本: {order.executed.value:.2f}, 手续费: {order.executed.comm:.2f}, 交易#: {self.trade_count}')
+                logger.info('%s %s执行: 价格: %.2f, '
+                         '成本: %.2f, 手续费: %.2f, 交易#: %s',
+                         self.data.datetime.datetime(0), buy_or_cover, order.executed.price, order.executed.value, order.executed.comm, self.trade_count)
                 self.buy_price = order.executed.price
                 self.buy_comm = order.executed.comm
                 
@@ -120,12 +122,12 @@ class MagicNineStrategyWithAdvancedStopLoss(bt.Strategy):
                             self.profitable_trades += 1
                             self.short_profits += profit
                             self.total_profit += profit
-                            logger.info(f'{self.data.datetime.datetime(0).isoformat()} 空头交易盈利: {profit:.2f} ({profit_pct:.2f}%)')
+                            logger.info('%s 空头交易盈利: %.2f (%.2f%%)', self.data.datetime.datetime(0), profit, profit_pct)
                         else:
                             self.losing_trades += 1
                             self.short_losses += abs(profit)
                             self.total_loss += abs(profit)
-                            logger.info(f'{self.data.datetime.datetime(0).isoformat()} 空头交易亏损: {profit:.2f} ({profit_pct:.2f}%)')
+                            logger.info('%s 空头交易亏损: %.2f (%.2f%%)', self.data.datetime.datetime(0), profit, profit_pct)
                     
                     # 平仓后重置标志和止损
                     self.is_short = False
@@ -147,13 +149,15 @@ class MagicNineStrategyWithAdvancedStopLoss(bt.Strategy):
                     self.stop_loss_price = self.buy_price - stop_loss_distance
                     self.highest_price = self.buy_price
                     
-                    logger.info(f'{self.data.datetime.datetime(0).isoformat()} 设置多头初始止损: {self.stop_loss_price:.2f} '
-                             f'(ATR: {atr_value:.2f}, 距离: {stop_loss_distance:.2f}, 止损幅度: {(stop_loss_distance/self.buy_price*100):.2f}%)')
+                    logger.info('%s 设置多头初始止损: %.2f '
+                             '(ATR: %.2f, 距离: %.2f, 止损幅度: %.2f%%)',
+                             self.data.datetime.datetime(0), self.stop_loss_price, atr_value, stop_loss_distance, stop_loss_distance/self.buy_price*100)
                 
             elif order.issell():
                 sell_or_short = "卖出" if not self.is_short else "卖空"
-                logger.info(f'{self.data.datetime.datetime(0).isoformat()} {sell_or_short}执行: 价格: {order.executed.price:.2f}, '
-                         f'成本: {order.executed.value:.2f}, 手续费: {order.executed.comm:.2f}, 交易#: {self.trade_count}')
+                logger.info('%s %s执行: 价格: %.2f, '
+                         '成本: %.2f, 手续费: %.2f, 交易#: %s',
+                         self.data.datetime.datetime(0), sell_or_short, order.executed.price, order.executed.value, order.executed.comm, self.trade_count)
                 
                 # 如果是卖出平多仓
                 if not self.is_short and self.buy_price is not None:
@@ -165,12 +169,12 @@ class MagicNineStrategyWithAdvancedStopLoss(bt.Strategy):
                         self.profitable_trades += 1
                         self.long_profits += profit
                         self.total_profit += profit
-                        logger.info(f'{self.data.datetime.datetime(0).isoformat()} 多头交易盈利: {profit:.2f} ({profit_pct:.2f}%)')
+                        logger.info('%s 多头交易盈利: %.2f (%.2f%%)', self.data.datetime.datetime(0), profit, profit_pct)
                     else:
                         self.losing_trades += 1
                         self.long_losses += abs(profit)
                         self.total_loss += abs(profit)
-                        logger.info(f'{self.data.datetime.datetime(0).isoformat()} 多头交易亏损: {profit:.2f} ({profit_pct:.2f}%)')
+                        logger.info('%s 多头交易亏损: %.2f (%.2f%%)', self.data.datetime.datetime(0), profit, profit_pct)
                     
                     # 重置止损价格
                     self.stop_loss_price = None
@@ -196,18 +200,19 @@ class MagicNineStrategyWithAdvancedStopLoss(bt.Strategy):
                     self.stop_loss_price = self.buy_price + stop_loss_distance
                     self.lowest_price = self.buy_price
                     
-                    logger.info(f'{self.data.datetime.datetime(0).isoformat()} 设置空头初始止损: {self.stop_loss_price:.2f} '
-                             f'(ATR: {atr_value:.2f}, 距离: {stop_loss_distance:.2f}, 止损幅度: {(stop_loss_distance/self.buy_price*100):.2f}%)')
+                    logger.info('%s 设置空头初始止损: %.2f '
+                             '(ATR: %.2f, 距离: %.2f, 止损幅度: %.2f%%)',
+                             self.data.datetime.datetime(0), self.stop_loss_price, atr_value, stop_loss_distance, stop_loss_distance/self.buy_price*100)
         
         elif order.status in [order.Canceled, order.Margin, order.Rejected]:
-            logger.warning(f'{self.data.datetime.datetime(0).isoformat()} 订单被拒绝/取消/保证金不足: {order.status}')
+            logger.warning('%s 订单被拒绝/取消/保证金不足: %s', self.data.datetime.datetime(0), order.status)
         
         self.order = None
     
     def notify_trade(self, trade):
         """交易结果通知"""
         if trade.isclosed:
-            logger.info(f'{self.data.datetime.datetime(0).isoformat()} 交易利润, 毛利润: {trade.pnl:.2f}, 净利润: {trade.pnlcomm:.2f}')
+            logger.info('%s 交易利润, 毛利润: %.2f, 净利润: %.2f', self.data.datetime.datetime(0), trade.pnl, trade.pnlcomm)
             
             # 统计交易胜率
             if self.trade_count > 0:
@@ -221,12 +226,13 @@ class MagicNineStrategyWithAdvancedStopLoss(bt.Strategy):
                 
                 # 每10笔交易记录一次统计或在交易结束时记录
                 if self.trade_count % 10 == 0 or not self.position:
-                    logger.info(f'{self.data.datetime.datetime(0).isoformat()} 交易统计 - '
-                             f'胜率: {win_rate:.2f}%, 交易数: {self.trade_count}, '
-                             f'多/空比: {self.long_trades}/{self.short_trades}, '
-                             f'多头盈利/亏损: {self.long_profits:.2f}/{self.long_losses:.2f}, '
-                             f'空头盈利/亏损: {self.short_profits:.2f}/{self.short_losses:.2f}, '
-                             f'平均盈利: {avg_profit:.2f}, 平均亏损: {avg_loss:.2f}, 盈亏比: {profit_factor:.2f}')
+                    logger.info('%s 交易统计 - '
+                             '胜率: %.2f%%, 交易数: %s, '
+                             '多/空比: %s/%s, '
+                             '多头盈利/亏损: %.2f/%.2f, '
+                             '空头盈利/亏损: %.2f/%.2f, '
+                             '平均盈利: %.2f, 平均亏损: %.2f, 盈亏比: %.2f',
+                             self.data.datetime.datetime(0), win_rate, self.trade_count, self.long_trades, self.short_trades, self.long_profits, self.long_losses, self.short_profits, self.short_losses, avg_profit, avg_loss, profit_factor)
     
     def next(self):
         """主策略逻辑"""
@@ -276,22 +282,23 @@ class MagicNineStrategyWithAdvancedStopLoss(bt.Strategy):
         
         # 记录详细的时间信息用于调试
         if len(self) % 100 == 0 or is_near_close:  # 每100个bar记录一次或接近收盘时记录
-            logger.info(f"时间检查: 原始时间={current_time.isoformat()}, 计算为美东时间:{et_hour}:{et_minute:02d}, "
-                       f"交易时段:{is_trading_time}, 安全交易时段:{is_safe_trading_time}, "
-                       f"开盘后分钟数:{minutes_since_open}, 收盘前分钟数:{minutes_before_close}, "
-                       f"接近收盘:{is_near_close}, 夏令时:{is_dst}")
+            logger.info("时间检查: 原始时间=%s, 计算为美东时间:%s:%02d, "
+                       "交易时段:%s, 安全交易时段:%s, "
+                       "开盘后分钟数:%s, 收盘前分钟数:%s, "
+                       "接近收盘:%s, 夏令时:%s",
+                       current_time, et_hour, et_minute, is_trading_time, is_safe_trading_time, minutes_since_open, minutes_before_close, is_near_close, is_dst)
         
         # 如果接近收盘且有持仓，强制平仓
         if is_near_close and self.position:
             if self.position.size > 0:  # 多头持仓
-                logger.info(f'{current_time.isoformat()} 收盘前强制平仓多头! 价格: {self.data.close[0]:.2f}, ET时间约: {et_hour}:{et_minute}')
+                logger.info('%s 收盘前强制平仓多头! 价格: %.2f, ET时间约: %s:%s', current_time, self.data.close[0], et_hour, et_minute)
                 self.order = self.sell(size=self.position_size)
                 self.position_size = 0
                 self.stop_loss_price = None
                 self.highest_price = None
                 return
             elif self.position.size < 0:  # 空头持仓
-                logger.info(f'{current_time.isoformat()} 收盘前强制平仓空头! 价格: {self.data.close[0]:.2f}, ET时间约: {et_hour}:{et_minute}')
+                logger.info('%s 收盘前强制平仓空头! 价格: %.2f, ET时间约: %s:%s', current_time, self.data.close[0], et_hour, et_minute)
                 self.order = self.buy(size=self.position_size)
                 self.position_size = 0
                 self.stop_loss_price = None
@@ -309,17 +316,18 @@ class MagicNineStrategyWithAdvancedStopLoss(bt.Strategy):
             current_bar = len(self.data)
             holding_periods = current_bar - self.position_entry_bar if self.position else 0
             
-            logger.info(f'{self.data.datetime.datetime(0).isoformat()} 调试信息: '
-                     f'价格: {current_price:.2f}, '
-                     f'买入信号: {self.magic_nine.lines.buy_signal[0]}, '
-                     f'卖出信号: {self.magic_nine.lines.sell_signal[0]}, '
-                     f'买入计数: {self.magic_nine.lines.buy_setup[0]}, '
-                     f'卖出计数: {self.magic_nine.lines.sell_setup[0]}, '
-                     f'趋势: {trend_direction}, '
-                     f'RSI: {self.rsi.lines.rsi6[0]:.2f}, '
-                     f'持仓类型: {position_type}, '
-                     f'持仓大小: {self.position.size if self.position else 0}, '
-                     f'持仓周期: {holding_periods}')
+            logger.info('%s 调试信息: '
+                     '价格: %.2f, '
+                     '买入信号: %s, '
+                     '卖出信号: %s, '
+                     '买入计数: %s, '
+                     '卖出计数: %s, '
+                     '趋势: %s, '
+                     'RSI: %.2f, '
+                     '持仓类型: %s, '
+                     '持仓大小: %s, '
+                     '持仓周期: %s',
+                     self.data.datetime.datetime(0), current_price, self.magic_nine.lines.buy_signal[0], self.magic_nine.lines.sell_signal[0], self.magic_nine.lines.buy_setup[0], self.magic_nine.lines.sell_setup[0], trend_direction, self.rsi.lines.rsi6[0], position_type, self.position.size if self.position else 0, holding_periods)
         
         # 检查是否有仓位 - 使用position.size更准确地判断仓位状态
         if not self.position or self.position.size == 0:
@@ -358,8 +366,9 @@ class MagicNineStrategyWithAdvancedStopLoss(bt.Strategy):
                     size = min(size, max_size)
                     
                     if size > 0:
-                        logger.info(f'{self.data.datetime.datetime(0).isoformat()} 买入信号! 计数: {self.magic_nine.buy_count}, '
-                                  f'价格: {current_price:.2f}, 数量: {size}, ATR止损: {stop_loss:.2f}')
+                        logger.info('%s 买入信号! 计数: %s, '
+                                  '价格: %.2f, 数量: %s, ATR止损: %.2f',
+                                  self.data.datetime.datetime(0), self.magic_nine.buy_count, current_price, size, stop_loss)
                         
                         # 下买入订单
                         self.order = self.buy(size=size)
@@ -402,8 +411,9 @@ class MagicNineStrategyWithAdvancedStopLoss(bt.Strategy):
                     size = min(size, max_size)
                     
                     if size > 0:
-                        logger.info(f'{self.data.datetime.datetime(0).isoformat()} 卖空信号! 计数: {self.magic_nine.sell_count}, '
-                                  f'价格: {current_price:.2f}, 数量: {size}, ATR止损: {stop_loss:.2f}')
+                        logger.info('%s 卖空信号! 计数: %s, '
+                                  '价格: %.2f, 数量: %s, ATR止损: %.2f',
+                                  self.data.datetime.datetime(0), self.magic_nine.sell_count, current_price, size, stop_loss)
                         
                         # 下卖空订单
                         self.order = self.sell(size=size)
@@ -444,16 +454,18 @@ class MagicNineStrategyWithAdvancedStopLoss(bt.Strategy):
                             if new_stop_loss > self.stop_loss_price:
                                 old_stop_loss = self.stop_loss_price
                                 self.stop_loss_price = new_stop_loss
-                                logger.info(f'{self.data.datetime.datetime(0).isoformat()} 更新多头追踪止损: {old_stop_loss:.2f} -> {new_stop_loss:.2f} '
-                                         f'(最高价: {old_highest:.2f} -> {self.highest_price:.2f}, 盈利: {profit_pct:.2f}%)')
+                                logger.info('%s 更新多头追踪止损: %.2f -> %.2f '
+                                         '(最高价: %.2f -> %.2f, 盈利: %.2f%%)',
+                                         self.data.datetime.datetime(0), old_stop_loss, new_stop_loss, old_highest, self.highest_price, profit_pct)
                 
                 # 检查多头止损条件
                 if self.stop_loss_price is not None and current_price <= self.stop_loss_price:
                     # 触发多头止损
                     loss_pct = (self.buy_price - current_price) / self.buy_price * 100.0
-                    logger.info(f'{self.data.datetime.datetime(0).isoformat()} 多头止损触发! 亏损: {loss_pct:.2f}%, '
-                             f'价格: {current_price:.2f}, 止损价: {self.stop_loss_price:.2f}, 数量: {self.position_size}, '
-                             f'持仓周期: {holding_periods}')
+                    logger.info('%s 多头止损触发! 亏损: %.2f%%, '
+                             '价格: %.2f, 止损价: %.2f, 数量: %s, '
+                             '持仓周期: %s',
+                             self.data.datetime.datetime(0), loss_pct, current_price, self.stop_loss_price, self.position_size, holding_periods)
                     
                     # 下卖出订单
                     self.order = self.sell(size=self.position_size)
@@ -470,10 +482,11 @@ class MagicNineStrategyWithAdvancedStopLoss(bt.Strategy):
                     if self.buy_price is not None:
                         # 多头盈利计算: 当前价格/入场价格-1
                         profit_pct = (current_price / self.buy_price - 1) * 100
-                        logger.info(f'{self.data.datetime.datetime(0).isoformat()} 多头最大持仓时间到达! 持仓: {holding_periods}, '
-                                f'当前盈亏: {profit_pct:.2f}%, 强制平仓')
+                        logger.info('%s 多头最大持仓时间到达! 持仓: %s, '
+                                '当前盈亏: %.2f%%, 强制平仓',
+                                self.data.datetime.datetime(0), holding_periods, profit_pct)
                     else:
-                        logger.warning(f'{self.data.datetime.datetime(0).isoformat()} 多头最大持仓时间到达但buy_price为None! 持仓: {holding_periods}, 强制平仓')
+                        logger.warning('%s 多头最大持仓时间到达但buy_price为None! 持仓: %s, 强制平仓', self.data.datetime.datetime(0), holding_periods)
                     
                     # 下卖出订单
                     self.order = self.sell(size=self.position_size)
@@ -486,8 +499,9 @@ class MagicNineStrategyWithAdvancedStopLoss(bt.Strategy):
                 
                 # 检查多头卖出信号
                 elif self.magic_nine.lines.sell_signal[0] >= 1:
-                    logger.info(f'{self.data.datetime.datetime(0).isoformat()} 卖出信号! 神奇九转计数: {self.magic_nine.lines.sell_setup[0]}, '
-                             f'价格: {current_price:.2f}, 数量: {self.position_size}')
+                    logger.info('%s 卖出信号! 神奇九转计数: %s, '
+                             '价格: %.2f, 数量: %s',
+                             self.data.datetime.datetime(0), self.magic_nine.lines.sell_setup[0], current_price, self.position_size)
                     
                     # 下卖出订单
                     self.order = self.sell(size=self.position_size)
@@ -501,7 +515,7 @@ class MagicNineStrategyWithAdvancedStopLoss(bt.Strategy):
             elif self.position.size < 0:  # 空头仓位
                 # 确保空头标志正确设置
                 if not self.is_short:
-                    logger.warning(f'{self.data.datetime.datetime(0).isoformat()} 修正空头状态标志，发现仓位数量为负但标志未设置')
+                    logger.warning('%s 修正空头状态标志，发现仓位数量为负但标志未设置', self.data.datetime.datetime(0))
                     self.is_short = True
                     
                 # 空头仓位的移动止损逻辑 - 强化优化
@@ -525,16 +539,18 @@ class MagicNineStrategyWithAdvancedStopLoss(bt.Strategy):
                             if new_stop_loss < self.stop_loss_price:
                                 old_stop_loss = self.stop_loss_price
                                 self.stop_loss_price = new_stop_loss
-                                logger.info(f'{self.data.datetime.datetime(0).isoformat()} 更新空头追踪止损: {old_stop_loss:.2f} -> {new_stop_loss:.2f} '
-                                         f'(最低价: {old_lowest:.2f} -> {self.lowest_price:.2f}, 盈利: {profit_pct:.2f}%)')
+                                logger.info('%s 更新空头追踪止损: %.2f -> %.2f '
+                                         '(最低价: %.2f -> %.2f, 盈利: %.2f%%)',
+                                         self.data.datetime.datetime(0), old_stop_loss, new_stop_loss, old_lowest, self.lowest_price, profit_pct)
                 
                 # 检查空头止损条件
                 if self.stop_loss_price is not None and current_price >= self.stop_loss_price:
                     # 触发空头止损
                     loss_pct = (current_price - self.buy_price) / self.buy_price * 100.0
-                    logger.info(f'{self.data.datetime.datetime(0).isoformat()} 空头止损触发! 亏损: {loss_pct:.2f}%, '
-                             f'价格: {current_price:.2f}, 止损价: {self.stop_loss_price:.2f}, 数量: {abs(self.position_size)}, '
-                             f'持仓周期: {holding_periods}')
+                    logger.info('%s 空头止损触发! 亏损: %.2f%%, '
+                             '价格: %.2f, 止损价: %.2f, 数量: %s, '
+                             '持仓周期: %s',
+                             self.data.datetime.datetime(0), loss_pct, current_price, self.stop_loss_price, abs(self.position_size), holding_periods)
                     
                     # 下买入订单平空仓
                     self.order = self.buy(size=abs(self.position_size))
@@ -552,10 +568,11 @@ class MagicNineStrategyWithAdvancedStopLoss(bt.Strategy):
                     if self.buy_price is not None:
                         # 空头盈利计算: 入场价格/当前价格-1 (与多头相反)
                         profit_pct = (self.buy_price / current_price - 1) * 100
-                        logger.info(f'{self.data.datetime.datetime(0).isoformat()} 空头最大持仓时间到达! 持仓: {holding_periods}, '
-                                f'当前盈亏: {profit_pct:.2f}%, 强制平仓')
+                        logger.info('%s 空头最大持仓时间到达! 持仓: %s, '
+                                '当前盈亏: %.2f%%, 强制平仓',
+                                self.data.datetime.datetime(0), holding_periods, profit_pct)
                     else:
-                        logger.warning(f'{self.data.datetime.datetime(0).isoformat()} 空头最大持仓时间到达但buy_price为None! 持仓: {holding_periods}, 强制平仓')
+                        logger.warning('%s 空头最大持仓时间到达但buy_price为None! 持仓: %s, 强制平仓', self.data.datetime.datetime(0), holding_periods)
                     
                     # 下买入订单平空仓
                     self.order = self.buy(size=abs(self.position_size))
@@ -569,8 +586,9 @@ class MagicNineStrategyWithAdvancedStopLoss(bt.Strategy):
                 
                 # 检查空头买入信号
                 elif self.magic_nine.lines.buy_signal[0] >= 1:
-                    logger.info(f'{self.data.datetime.datetime(0).isoformat()} 买入信号! 神奇九转计数: {self.magic_nine.lines.buy_setup[0]}, '
-                             f'价格: {current_price:.2f}, 数量: {abs(self.position_size)}')
+                    logger.info('%s 买入信号! 神奇九转计数: %s, '
+                             '价格: %.2f, 数量: %s',
+                             self.data.datetime.datetime(0), self.magic_nine.lines.buy_setup[0], current_price, abs(self.position_size))
                     
                     # 下买入订单平空仓
                     self.order = self.buy(size=abs(self.position_size))
@@ -583,7 +601,7 @@ class MagicNineStrategyWithAdvancedStopLoss(bt.Strategy):
                     self.is_short = False
             else:
                 # 理论上不会到这里，因为我们前面已经检查了position.size，但为了健壮性添加这个分支
-                logger.warning(f'{self.data.datetime.datetime(0).isoformat()} 检测到异常持仓状态: {self.position.size}')
+                logger.warning('%s 检测到异常持仓状态: %s', self.data.datetime.datetime(0), self.position.size)
                 
                 # 重置所有状态变量
                 self.position_size = 0
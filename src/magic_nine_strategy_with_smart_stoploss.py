@@ -79,11 +79,12 @@ class MagicNineStrategyWithSmartStopLoss(bt.Strategy):
                                       period_me2=26, 
                                       period_signal=9)
         
-        logger.info(f"策略初始化完成 - 智能止损神奇九转模式 (比较周期:{self.p.magic_period}, ATR周期:{self.p.atr_period}, "
-                  f"ATR乘数:{self.p.atr_multiplier}, 最大止损:{self.p.max_loss_pct}%, 追踪止损:{self.p.trailing_stop}, "
-                  f"风险规避系数:{self.p.risk_aversion}, 波动性自适应:{self.p.volatility_adjust}, "
-                  f"市场感知:{self.p.market_aware}, 时间衰减:{self.p.time_decay})")
-        logger.info(f"避开开盘后{self.p.avoid_open_minutes}分钟和收盘前{self.p.avoid_close_minutes}分钟的交易")
+        logger.info("策略初始化完成 - 智能止损神奇九转模式 (比较周期:%s, ATR周期:%s, "
+                  "ATR乘数:%s, 最大止损:%s%%, 追踪止损:%s, "
+                  "风险规避系数:%s, 波动性自适应:%s, "
+                  "市场感知:%s, 时间衰减:%s)",
+                  self.p.magic_period, self.p.atr_period, self.p.atr_multiplier, self.p.max_loss_pct, self.p.trailing_stop, self.p.risk_aversion, self.p.volatility_adjust, self.p.market_aware, self.p.time_decay)
+        logger.info("避开开盘后%s分钟和收盘前%s分钟的交易", self.p.avoid_open_minutes, self.p.avoid_close_minutes)
     
     def notify_order(self, order):
         """订单状态通知"""
@@ -95,8 +96,9 @@ class MagicNineStrategyWithSmartStopLoss(bt.Strategy):
             
             if order.isbuy():
                 buy_or_cover = "买入" if not self.is_short else "平空买入"
-                logger.info(f'{self.data.datetime.datetime(0).isoformat()} {buy_or_cover}执行: 价格: {order.executed.price:.2f}, '
-                         f'成本: {order.executed.value:.2f}, 手续费: {order.executed.comm:.2f}, 交易#: {self.trade_count}')
+                logger.info('%s %s执行: 价格: %.2f, '
+                         '成本: %.2f, 手续费: %.2f, 交易#: %s',
+                         self.data.datetime.datetime(0), buy_or_cover, order.executed.price, order.executed.value, order.executed.comm, self.trade_count)
                 self.buy_price = order.executed.price
                 self.buy_comm = order.executed.comm
                 self.entry_time = self.data.datetime.datetime(0)
@@ -112,13 +114,13 @@ class MagicNineStrategyWithSmartStopLoss(bt.Strategy):
                         # 记录交易结果
                         if profit > 0:
                             self.profitable_trades += 1
-                            logger.info(f'{self.data.datetime.datetime(0).isoformat()} 空头交易盈利: {profit:.2f} ({profit_pct:.2f}%)')
+                            logger.info('%s 空头交易盈利: %.2f (%.2f%%)', self.data.datetime.datetime(0), profit, profit_pct)
                         else:
                             self.losing_trades += 1
-                            logger.info(f'{self.data.datetime.datetime(0).isoformat()} 空头交易亏损: {profit:.2f} ({profit_pct:.2f}%)')
+                            logger.info('%s 空头交易亏损: %.2f (%.2f%%)', self.data.datetime.datetime(0), profit, profit_pct)
                     else:
                         # 如果没有记录最低价或买入价，使用当前价格作为参考
-                        logger.warning(f'{self.data.datetime.datetime(0).isoformat()} 空头平仓但无法计算收益: 最低价记录缺失')
+                        logger.warning('%s 空头平仓但无法计算收益: 最低价记录缺失', self.data.datetime.datetime(0))
                     
                     # 平仓后重置标志和止损
                     self.is_short = False
@@ -133,8 +135,9 @@ class MagicNineStrategyWithSmartStopLoss(bt.Strategy):
                 
             elif order.issell():
                 sell_or_short = "卖出" if not self.is_short else "卖空"
-                logger.info(f'{self.data.datetime.datetime(0).isoformat()} {sell_or_short}执行: 价格: {order.executed.price:.2f}, '
-                         f'成本: {order.executed.value:.2f}, 手续费: {order.executed.comm:.2f}, 交易#: {self.trade_count}')
+                logger.info('%s %s执行: 价格: %.2f, '
+                         '成本: %.2f, 手续费: %.2f, 交易#: %s',
+                         self.data.datetime.datetime(0), sell_or_short, order.executed.price, order.executed.value, order.executed.comm, self.trade_count)
                 
                 # 如果是卖出平多仓
                 if not self.is_short and self.buy_price is not None:
@@ -144,10 +147,10 @@ class MagicNineStrategyWithSmartStopLoss(bt.Strategy):
                     # 记录交易结果
                     if profit > 0:
                         self.profitable_trades += 1
-                        logger.info(f'{self.data.datetime.datetime(0).isoformat()} 多头交易盈利: {profit:.2f} ({profit_pct:.2f}%)')
+                        logger.info('%s 多头交易盈利: %.2f (%.2f%%)', self.data.datetime.datetime(0), profit, profit_pct)
                     else:
                         self.losing_trades += 1
-                        logger.info(f'{self.data.datetime.datetime(0).isoformat()} 多头交易亏损: {profit:.2f} ({profit_pct:.2f}%)')
+                        logger.info('%s 多头交易亏损: %.2f (%.2f%%)', self.data.datetime.datetime(0), profit, profit_pct)
                     
                     # 重置止损价格和相关状态
                     self.stop_loss_price = None
@@ -167,21 +170,22 @@ class MagicNineStrategyWithSmartStopLoss(bt.Strategy):
                     self._set_initial_stop_loss_short()
         
         elif order.status in [order.Canceled, order.Margin, order.Rejected]:
-            logger.warning(f'{self.data.datetime.datetime(0).isoformat()} 订单被拒绝/取消/保证金不足: {order.status}')
+            logger.warning('%s 订单被拒绝/取消/保证金不足: %s', self.data.datetime.datetime(0), order.status)
         
         self.order = None
     
     def notify_trade(self, trade):
         """交易结果通知"""
         if trade.isclosed:
-            logger.info(f'{self.data.datetime.datetime(0).isoformat()} 交易利润, 毛利润: {trade.pnl:.2f}, 净利润: {trade.pnlcomm:.2f}')
+            logger.info('%s 交易利润, 毛利润: %.2f, 净利润: %.2f', self.data.datetime.datetime(0), trade.pnl, trade.pnlcomm)
             
             # 统计交易胜率
             if self.trade_count > 0:
                 win_rate = (self.profitable_trades / self.trade_count) * 100
-                logger.info(f'{self.data.datetime.datetime(0).isoformat()} 交易统计 - '
-                         f'胜率: {win_rate:.2f}%, 交易数: {self.trade_count}, '
-                         f'多/空比: {self.long_trades}/{self.short_trades}')
+                logger.info('%s 交易统计 - '
+                         '胜率: %.2f%%, 交易数: %s, '
+                         '多/空比: %s/%s',
+                         self.data.datetime.datetime(0), win_rate, self.trade_count, self.long_trades, self.short_trades)
     
     def _set_initial_stop_loss(self):
         """设置多头初始止损价格，考虑波动性和市场环境"""
@@ -205,8 +209,9 @@ class MagicNineStrategyWithSmartStopLoss(bt.Strategy):
                 # 根据波动率调整乘数，波动大时放宽止损，波动小时收紧止损
                 vol_adjust = np.clip(vol_ratio, 0.8, 1.5)  # 限制调整范围
                 multiplier *= vol_adjust
-                logger.info(f'{self.data.datetime.datetime(0).isoformat()} 波动率调整: 当前:{current_vol:.4f}, '
-                         f'平均:{vol_avg:.4f}, 比率:{vol_ratio:.2f}, 调整因子:{vol_adjust:.2f}')
+                logger.info('%s 波动率调整: 当前:%.4f, '
+                         '平均:%.4f, 比率:%.2f, 调整因子:%.2f',
+                         self.data.datetime.datetime(0), current_vol, vol_avg, vol_ratio, vol_adjust)
         
         # 2. 市场环境感知调整
         if self.p.market_aware and len(self.market_trend) > 20:  # 确保有足够的数据
@@ -219,8 +224,9 @@ class MagicNineStrategyWithSmartStopLoss(bt.Strategy):
                 # 下跌趋势中，放宽止损以避免震荡出局
                 trend_adjust = 1.1  # 增加10%的止损距离
             multiplier *= trend_adjust
-            logger.info(f'{self.data.datetime.datetime(0).isoformat()} 趋势调整: 趋势值:{trend_value:.4f}, '
-                      f'调整因子:{trend_adjust:.2f}')
+            logger.info('%s 趋势调整: 趋势值:%.4f, '
+                      '调整因子:%.2f',
+                      self.data.datetime.datetime(0), trend_value, trend_adjust)
         
         # 3. 应用风险规避系数
         multiplier *= self.p.risk_aversion
@@ -236,8 +242,9 @@ class MagicNineStrategyWithSmartStopLoss(bt.Strategy):
         self.stop_loss_price = self.buy_price - stop_loss_distance
         self.highest_price = self.buy_price
         
-        logger.info(f'{self.data.datetime.datetime(0).isoformat()} 设置多头智能初始止损: {self.stop_loss_price:.2f} '
-                 f'(ATR: {atr_value:.2f}, 调整后乘数: {multiplier:.2f}, 距离: {stop_loss_distance:.2f})')
+        logger.info('%s 设置多头智能初始止损: %.2f '
+                 '(ATR: %.2f, 调整后乘数: %.2f, 距离: %.2f)',
+                 self.data.datetime.datetime(0), self.stop_loss_price, atr_value, multiplier, stop_loss_distance)
     
     def _set_initial_stop_loss_short(self):
         """设置空头初始止损价格，考虑波动性和市场环境"""
@@ -261,8 +268,9 @@ class MagicNineStrategyWithSmartStopLoss(bt.Strategy):
                 # 波动大时稍微放宽止损但幅度小于多头，波动小时大幅收紧止损
                 vol_adjust = np.clip(vol_ratio, 0.85, 1.4)
                 multiplier *= vol_adjust
-                logger.info(f'{self.data.datetime.datetime(0).isoformat()} 空头波动率调整: 当前:{current_vol:.4f}, '
-                         f'平均:{vol_avg:.4f}, 比率:{vol_ratio:.2f}, 调整因子:{vol_adjust:.2f}')
+                logger.info('%s 空头波动率调整: 当前:%.4f, '
+                         '平均:%.4f, 比率:%.2f, 调整因子:%.2f',
+                         self.data.datetime.datetime(0), current_vol, vol_avg, vol_ratio, vol_adjust)
         
         # 2. 市场环境感知调整 - 空头与多头相反
         if self.p.market_aware and len(self.market_trend) > 20:
@@ -274,8 +282,9 @@ class MagicNineStrategyWithSmartStopLoss(bt.Strategy):
                 # 上涨趋势中，放宽止损以避免震荡出局
                 trend_adjust = 1.1
             multiplier *= trend_adjust
-            logger.info(f'{self.data.datetime.datetime(0).isoformat()} 空头趋势调整: 趋势值:{trend_value:.4f}, '
-                      f'调整因子:{trend_adjust:.2f}')
+            logger.info('%s 空头趋势调整: 趋势值:%.4f, '
+                      '调整因子:%.2f',
+                      self.data.datetime.datetime(0), trend_value, trend_adjust)
         
         # 3. 应用风险规避系数
         multiplier *= self.p.risk_aversion
@@ -291,8 +300,9 @@ class MagicNineStrategyWithSmartStopLoss(bt.Strategy):
         self.stop_loss_price = self.buy_price + stop_loss_distance
         self.lowest_price = self.buy_price  # 确保lowest_price有初始值
         
-        logger.info(f'{self.data.datetime.datetime(0).isoformat()} 设置空头智能初始止损: {self.stop_loss_price:.2f} '
-                 f'(ATR: {atr_value:.2f}, 调整后乘数: {multiplier:.2f}, 距离: {stop_loss_distance:.2f})')
+        logger.info('%s 设置空头智能初始止损: %.2f '
+                 '(ATR: %.2f, 调整后乘数: %.2f, 距离: %.2f)',
+                 self.data.datetime.datetime(0), self.stop_loss_price, atr_value, multiplier, stop_loss_distance)
         
     def _update_stop_loss(self):
         """更新多头止损价格，考虑追踪止损和时间衰减"""
@@ -336,9 +346,10 @@ class MagicNineStrategyWithSmartStopLoss(bt.Strategy):
                 if new_stop_loss > self.stop_loss_price:
                     old_stop_loss = self.stop_loss_price
                     self.stop_loss_price = new_stop_loss
-                    logger.info(f'{self.data.datetime.datetime(0).isoformat()} 更新多头智能追踪止损: {old_stop_loss:.2f} -> {new_stop_loss:.2f} '
-                             f'(最高价: {self.highest_price:.2f}, 盈利: {profit_pct:.2f}%, 持仓K线数: {self.bars_since_entry}, '
-                             f'时间因子: {decay_factor:.2f}, 盈利因子: {profit_factor:.2f})')
+                    logger.info('%s 更新多头智能追踪止损: %.2f -> %.2f '
+                             '(最高价: %.2f, 盈利: %.2f%%, 持仓K线数: %s, '
+                             '时间因子: %.2f, 盈利因子: %.2f)',
+                             self.data.datetime.datetime(0), old_stop_loss, new_stop_loss, self.highest_price, profit_pct, self.bars_since_entry, decay_factor, profit_factor)
 
     def _update_stop_loss_short(self):
         """更新空头止损价格，考虑追踪止损和时间衰减"""
@@ -350,7 +361,7 @@ class MagicNineStrategyWithSmartStopLoss(bt.Strategy):
         # 确保最低价已初始化
         if self.lowest_price is None:
             self.lowest_price = current_price
-            logger.warning(f'{self.data.datetime.datetime(0).isoformat()} 初始化空头最低价: {current_price:.2f}')
+            logger.warning('%s 初始化空头最低价: %.2f', self.data.datetime.datetime(0), current_price)
         
         # 只有启用追踪止损且当前价格创新低时才考虑更新止损
         if self.p.trailing_stop and current_price < self.lowest_price:
@@ -386,9 +397,10 @@ class MagicNineStrategyWithSmartStopLoss(bt.Strategy):
                 if new_stop_loss < self.stop_loss_price:
                     old_stop_loss = self.stop_loss_price
                     self.stop_loss_price = new_stop_loss
-                    logger.info(f'{self.data.datetime.datetime(0).isoformat()} 更新空头智能追踪止损: {old_stop_loss:.2f} -> {new_stop_loss:.2f} '
-                             f'(最低价: {self.lowest_price:.2f}, 盈利: {profit_pct:.2f}%, 持仓K线数: {self.bars_since_entry}, '
-                             f'时间因子: {decay_factor:.2f}, 盈利因子: {profit_factor:.2f})')
+                    logger.info('%s 更新空头智能追踪止损: %.2f -> %.2f '
+                             '(最低价: %.2f, 盈利: %.2f%%, 持仓K线数: %s, '
+                             '时间因子: %.2f, 盈利因子: %.2f)',
+                             self.data.datetime.datetime(0), old_stop_loss, new_stop_loss, self.lowest_price, profit_pct, self.bars_since_entry, decay_factor, profit_factor)
     
     def next(self):
         """主策略逻辑"""
@@ -438,22 +450,23 @@ class MagicNineStrategyWithSmartStopLoss(bt.Strategy):
         
         # 记录详细的时间信息用于调试
         if len(self) % 100 == 0 or is_near_close:  # 每100个bar记录一次或接近收盘时记录
-            logger.info(f"时间检查: 原始时间={current_time.isoformat()}, 计算为美东时间:{et_hour}:{et_minute:02d}, "
-                       f"交易时段:{is_trading_time}, 安全交易时段:{is_safe_trading_time}, "
-                       f"开盘后分钟数:{minutes_since_open}, 收盘前分钟数:{minutes_before_close}, "
-                       f"接近收盘:{is_near_close}, 夏令时:{is_dst}")
+            logger.info("时间检查: 原始时间=%s, 计算为美东时间:%s:%02d, "
+                       "交易时段:%s, 安全交易时段:%s, "
+                       "开盘后分钟数:%s, 收盘前分钟数:%s, "
+                       "接近收盘:%s, 夏令时:%s",
+                       current_time, et_hour, et_minute, is_trading_time, is_safe_trading_time, minutes_since_open, minutes_before_close, is_near_close, is_dst)
         
         # 如果接近收盘且有持仓，强制平仓
         if is_near_close and self.position:
             if self.position.size > 0:  # 多头持仓
-                logger.info(f'{current_time.isoformat()} 收盘前强制平仓多头! 价格: {self.data.close[0]:.2f}, ET时间约: {et_hour}:{et_minute}')
+                logger.info('%s 收盘前强制平仓多头! 价格: %.2f, ET时间约: %s:%s', current_time, self.data.close[0], et_hour, et_minute)
                 self.order = self.sell(size=self.position_size)
                 self.position_size = 0
                 self.stop_loss_price = None
                 self.highest_price = None
                 return
             elif self.position.size < 0:  # 空头持仓
-                logger.info(f'{current_time.isoformat()} 收盘前强制平仓空头! 价格: {self.data.close[0]:.2f}, ET时间约: {et_hour}:{et_minute}')
+                logger.info('%s 收盘前强制平仓空头! 价格: %.2f, ET时间约: %s:%s', current_time, self.data.close[0], et_hour, et_minute)
                 self.order = self.buy(size=self.position_size)
                 self.position_size = 0
                 self.stop_loss_price = None
@@ -483,8 +496,9 @@ class MagicNineStrategyWithSmartStopLoss(bt.Strategy):
                     size = int(value * self.p.position_pct / current_price)
                     
                     if size > 0:
-                        logger.info(f'{self.data.datetime.datetime(0).isoformat()} 买入信号! 神奇九转计数: {self.magic_nine.lines.buy_setup[0]}, '
-                                 f'价格: {current_price:.2f}, 数量: {size}')
+                        logger.info('%s 买入信号! 神奇九转计数: %s, '
+                                 '价格: %.2f, 数量: %s',
+                                 self.data.datetime.datetime(0), self.magic_nine.lines.buy_setup[0], current_price, size)
                         
                         # 下买入订单
                         self.order = self.buy(size=size)
@@ -506,8 +520,9 @@ class MagicNineStrategyWithSmartStopLoss(bt.Strategy):
                     size = int(value * self.p.position_pct / current_price)
                     
                     if size > 0:
-                        logger.info(f'{self.data.datetime.datetime(0).isoformat()} 卖空信号! 神奇九转计数: {self.magic_nine.lines.sell_setup[0]}, '
-                                 f'价格: {current_price:.2f}, 数量: {size}')
+                        logger.info('%s 卖空信号! 神奇九转计数: %s, '
+                                 '价格: %.2f, 数量: %s',
+                                 self.data.datetime.datetime(0), self.magic_nine.lines.sell_setup[0], current_price, size)
                         
                         # 下卖空订单
                         self.order = self.sell(size=size)
@@ -528,8 +543,9 @@ class MagicNineStrategyWithSmartStopLoss(bt.Strategy):
                 if self.stop_loss_price is not None and current_price <= self.stop_loss_price:
                     # 触发多头止损
                     loss_pct = (current_price / self.buy_price - 1) * 100
-                    logger.info(f'{self.data.datetime.datetime(0).isoformat()} 多头智能止损触发! 盈亏: {loss_pct:.2f}%, '
-                             f'价格: {current_price:.2f}, 止损价: {self.stop_loss_price:.2f}, 数量: {self.position_size}, 持仓K线数: {self.bars_since_entry}')
+                    logger.info('%s 多头智能止损触发! 盈亏: %.2f%%, '
+                             '价格: %.2f, 止损价: %.2f, 数量: %s, 持仓K线数: %s',
+                             self.data.datetime.datetime(0), loss_pct, current_price, self.stop_loss_price, self.position_size, self.bars_since_entry)
                     
                     # 下卖出订单
                     self.order = self.sell(size=self.position_size)
@@ -542,8 +558,9 @@ class MagicNineStrategyWithSmartStopLoss(bt.Strategy):
                     profit_pct = (current_price / self.buy_price - 1) * 100
                     # 如果持仓7天后盈利低于2%，考虑退出
                     if profit_pct < 2.0:
-                        logger.info(f'{self.data.datetime.datetime(0).isoformat()} 多头时间止损触发! 持仓时间过长且收益低: {profit_pct:.2f}%, '
-                                f'价格: {current_price:.2f}, 持仓K线数: {self.bars_since_entry}')
+                        logger.info('%s 多头时间止损触发! 持仓时间过长且收益低: %.2f%%, '
+                                '价格: %.2f, 持仓K线数: %s',
+                                self.data.datetime.datetime(0), profit_pct, current_price, self.bars_since_entry)
                         # 下卖出订单
                         self.order = self.sell(size=self.position_size)
                         self.position_size = 0
@@ -551,8 +568,9 @@ class MagicNineStrategyWithSmartStopLoss(bt.Strategy):
                 
                 # 检查多头卖出信号
                 if self.magic_nine.lines.sell_setup[0] >= self.p.magic_count:
-                    logger.info(f'{self.data.datetime.datetime(0).isoformat()} 卖出信号! 神奇九转计数: {self.magic_nine.lines.sell_setup[0]}, '
-                             f'价格: {current_price:.2f}, 数量: {self.position_size}')
+                    logger.info('%s 卖出信号! 神奇九转计数: %s, '
+                             '价格: %.2f, 数量: %s',
+                             self.data.datetime.datetime(0), self.magic_nine.lines.sell_setup[0], current_price, self.position_size)
                     
                     # 下卖出订单
                     self.order = self.sell(size=self.position_size)
@@ -567,8 +585,9 @@ class MagicNineStrategyWithSmartStopLoss(bt.Strategy):
                 if self.stop_loss_price is not None and current_price >= self.stop_loss_price:
                     # 触发空头止损
                     loss_pct = (self.buy_price / current_price - 1) * 100
-                    logger.info(f'{self.data.datetime.datetime(0).isoformat()} 空头智能止损触发! 盈亏: {loss_pct:.2f}%, '
-                             f'价格: {current_price:.2f}, 止损价: {self.stop_loss_price:.2f}, 数量: {self.position_size}, 持仓K线数: {self.bars_since_entry}')
+                    logger.info('%s 空头智能止损触发! 盈亏: %.2f%%, '
+                             '价格: %.2f, 止损价: %.2f, 数量: %s, 持仓K线数: %s',
+                             self.data.datetime.datetime(0), loss_pct, current_price, self.stop_loss_price, self.position_size, self.bars_since_entry)
                     
                     # 下买入订单平空仓
                     self.order = self.buy(size=self.position_size)
@@ -580,8 +599,9 @@ class MagicNineStrategyWithSmartStopLoss(bt.Strategy):
                     # 计算当前空头盈利百分比（与多头相反）
                     profit_pct = (self.buy_price / current_price - 1) * 100
                     if profit_pct < 2.0:
-                        logger.info(f'{self.data.datetime.datetime(0).isoformat()} 空头时间止损触发! 持仓时间过长且收益低: {profit_pct:.2f}%, '
-                                f'价格: {current_price:.2f}, 持仓K线数: {self.bars_since_entry}')
+                        logger.info('%s 空头时间止损触发! 持仓时间过长且收益低: %.2f%%, '
+                                '价格: %.2f, 持仓K线数: %s',
+                                self.data.datetime.datetime(0), profit_pct, current_price, self.bars_since_entry)
                         # 下买入订单平空仓
                         self.order = self.buy(size=self.position_size)
                         self.position_size = 0
@@ -589,8 +609,9 @@ class MagicNineStrategyWithSmartStopLoss(bt.Strategy):
                 
                 # 检查空头平仓信号
                 if self.magic_nine.lines.buy_setup[0] >= self.p.magic_count:
-                    logger.info(f'{self.data.datetime.datetime(0).isoformat()} 买入信号! 神奇九转计数: {self.magic_nine.lines.buy_setup[0]}, '
-                             f'价格: {current_price:.2f}, 数量: {self.position_size}')
+                    logger.info('%s 买入信号! 神奇九转计数: %s, '
+                             '价格: %.2f, 数量: %s',
+                             self.data.datetime.datetime(0), self.magic_nine.lines.buy_setup[0], current_price, self.position_size)
                     
                     # 下买入订单平空仓
                     self.order = self.buy(size=self.position_size)
@@ -1,8 +1,8 @@
 import backtrader as bt
 import logging
-import pytz
-from datetime import datetime, timedelta
+from datetime import timedelta, timezone
 from src.indicators import MagicNine, RSIBundle, KDJBundle
+from src.utils import EASTERN_TZ
 
 logger = logging.getLogger(__name__)
 
@@ -47,8 +47,8 @@ class MagicNineStrategyWithStopLoss(bt.Strategy):
                                       period_me2=26, 
                                       period_signal=9)
         
-        logger.info(f"策略初始化完成 - 带止损的双向神奇九转模式 (比较周期:{self.p.magic_period}, 信号触发计数:{self.p.magic_count}, 止损比例:{self.p.stop_loss_pct}%)")
-        logger.info(f"避开开盘后{self.p.avoid_open_minutes}分钟和收盘前{self.p.avoid_close_minutes}分钟的交易")
+        logger.info("策略初始化完成 - 带止损的双向神奇九转模式 (比较周期:%s, 信号触发计数:%s, 止损比例:%s%%)", self.p.magic_period, self.p.magic_count, self.p.stop_loss_pct)
+        logger.info("避开开盘后%s分钟和收盘前%s分钟的交易", self.p.avoid_open_minutes, self.p.avoid_close_minutes)
     
     def notify_order(self, order):
         """订单状态通知"""
@@ -59,19 +59,22 @@ class MagicNineStrategyWithStopLoss(bt.Strategy):
         # 检查订单是否已完成
         if order.status in [order.Completed]:
             if order.isbuy():
-                logger.info(f'{self.data.datetime.datetime(0).isoformat()} 买入执行，价格: {order.executed.price:.2f}, '
-                         f'成本: {order.executed.value:.2f}, 手续费: {order.executed.comm:.2f}')
+                logger.info('%s 买入执行，价格: %.2f, '
+                         '成本: %.2f, 手续费: %.2f',
+                         self.data.datetime.datetime(0), order.executed.price, order.executed.value, order.executed.comm)
                 self.buy_price = order.executed.price
                 self.buy_comm = order.executed.comm
             else:  # 卖出
                 if self.is_short:
-                    logger.info(f'{self.data.datetime.datetime(0).isoformat()} 卖空执行，价格: {order.executed.price:.2f}, '
-                             f'成本: {order.executed.value:.2f}, 手续费: {order.executed.comm:.2f}')
+                    logger.info('%s 卖空执行，价格: %.2f, '
+                             '成本: %.2f, 手续费: %.2f',
+                             self.data.datetime.datetime(0), order.executed.price, order.executed.value, order.executed.comm)
                 else:
-                    logger.info(f'{self.data.datetime.datetime(0).isoformat()} 卖出执行，价格: {order.executed.price:.2f}, '
-                             f'成本: {order.executed.value:.2f}, 手续费: {order.executed.comm:.2f}')
+                    logger.info('%s 卖出执行，价格: %.2f, '
+                             '成本: %.2f, 手续费: %.2f',
+                             self.data.datetime.datetime(0), order.executed.price, order.executed.value, order.executed.comm)
         elif order.status in [order.Canceled, order.Margin, order.Rejected]:
-            logger.warning(f'{self.data.datetime.datetime(0).isoformat()} 订单取消/保证金不足/拒绝')
+            logger.warning('%s 订单取消/保证金不足/拒绝', self.data.datetime.datetime(0))
 
         # 重置订单引用
         self.order = None
@@ -83,9 +86,9 @@ class MagicNineStrategyWithStopLoss(bt.Strategy):
                 # 计算空头交易利润
                 profit = (self.buy_price - trade.price) * trade.size
                 profit_pct = (self.buy_price / trade.price - 1) * 100
-                logger.info(f'{self.data.datetime.datetime(0).isoformat()} 空头交易利润: {profit:.2f}, 收益率: {profit_pct:.2f}%')
+                logger.info('%s 空头交易利润: %.2f, 收益率: %.2f%%', self.data.datetime.datetime(0), profit, profit_pct)
                 
-            logger.info(f'{self.data.datetime.datetime(0).isoformat()} 交易利润, 毛利润: {trade.pnl:.2f}, 净利润: {trade.pnlcomm:.2f}')
+            logger.info('%s 交易利润, 毛利润: %.2f, 净利润: %.2f', self.data.datetime.datetime(0), trade.pnl, trade.pnlcomm)
     
     def next(self):
         """主策略逻辑"""
@@ -99,16 +102,11 @@ class MagicNineStrategyWithStopLoss(bt.Strategy):
         # 时区判断与转换 - 证券交易时间处理
         # 美股正常交易时间是美东时间(ET)的9:30-16:00
         
-        # 使用pytz准确判断是否是夏令时
-        eastern = pytz.timezone('US/Eastern')
-        # 使用当前日期构建一个aware datetime对象
+        # 准确判断是否是夏令时
         # backtrader提供的datetime对象是naive的，我们需要假设它是UTC时间
         # 然后验证当前时间对应的美东时间是否在夏令时
-        utc_time = pytz.utc.localize(datetime(
-            current_time.year, current_time.month, current_time.day,
-            current_time.hour, current_time.minute, current_time.second
-        ))
-        et_time = utc_time.astimezone(eastern)
+        utc_time = current_time.replace(microsecond=0, tzinfo=timezone.utc)
+        et_time = utc_time.astimezone(EASTERN_TZ)
         is_dst = et_time.dst() != timedelta(0)
         
         # 初始假设时间是美东时间
@@ -151,21 +149,22 @@ class MagicNineStrategyWithStopLoss(bt.Strategy):
         # 记录详细的时间信息用于调试
         if len(self) % 100 == 0 or is_near_close:  # 每100个bar记录一次或接近收盘时记录
             time_format = "UTC" if is_utc_time else "ET"
-            logger.info(f"时间检查: 原始时间={current_time.isoformat()}, 计算为美东时间:{et_hour}:{et_minute:02d}, "
-                       f"时间格式:{time_format}, 交易时段:{is_trading_time}, 安全交易时段:{is_safe_trading_time}, "
-                       f"开盘后分钟数:{minutes_since_open}, 收盘前分钟数:{minutes_before_close}, "
-                       f"接近收盘:{is_near_close}, 夏令时:{is_dst}")
+            logger.info("时间检查: 原始时间=%s, 计算为美东时间:%s:%02d, "
+                       "时间格式:%s, 交易时段:%s, 安全交易时段:%s, "
+                       "开盘后分钟数:%s, 收盘前分钟数:%s, "
+                       "接近收盘:%s, 夏令时:%s",
+                       current_time, et_hour, et_minute, time_format, is_trading_time, is_safe_trading_time, minutes_since_open, minutes_before_close, is_near_close, is_dst)
         
         # 如果接近收盘且有持仓，强制平仓
         if is_near_close and self.position:
             if self.position.size > 0:  # 多头持仓
-                logger.info(f'{current_time.isoformat()} 收盘前强制平仓多头! 价格: {self.data.close[0]:.2f}, ET时间约: {et_hour}:{et_minute:02d}')
+                logger.info('%s 收盘前强制平仓多头! 价格: %.2f, ET时间约: %s:%02d', current_time, self.data.close[0], et_hour, et_minute)
                 self.order = self.sell(size=self.position_size)
                 self.position_size = 0
                 self.stop_loss = None
                 return
             elif self.position.size < 0:  # 空头持仓
-                logger.info(f'{current_time.isoformat()} 收盘前强制平仓空头! 价格: {self.data.close[0]:.2f}, ET时间约: {et_hour}:{et_minute:02d}')
+                logger.info('%s 收盘前强制平仓空头! 价格: %.2f, ET时间约: %s:%02d', current_time, self.data.close[0], et_hour, et_minute)
                 self.order = self.buy(size=self.position_size)
                 self.position_size = 0
                 self.stop_loss = None
@@ -199,8 +198,9 @@ class MagicNineStrategyWithStopLoss(bt.Strategy):
                     size = int(value * 0.95 / current_price)  # 使用95%资金
                     
                     if size > 0:
-                        logger.info(f'{self.data.datetime.datetime(0).isoformat()} 买入信号! 神奇九转计数: {self.magic_nine.buy_count}, '
-                                 f'价格: {current_price:.2f}, 数量: {size}, ET时间: {et_hour}:{et_minute:02d}')
+                        logger.info('%s 买入信号! 神奇九转计数: %s, '
+                                 '价格: %.2f, 数量: %s, ET时间: %s:%02d',
+                                 self.data.datetime.datetime(0), self.magic_nine.buy_count, current_price, size, et_hour, et_minute)
                         
                         # 下买入订单
                         self.order = self.buy(size=size)
@@ -229,8 +229,9 @@ class MagicNineStrategyWithStopLoss(bt.Strategy):
                     size = int(value * 0.95 / current_price)  # 使用95%资金
                     
                     if size > 0:
-                        logger.info(f'{self.data.datetime.datetime(0).isoformat()} 卖空信号! 神奇九转计数: {self.magic_nine.sell_count}, '
-                                 f'价格: {current_price:.2f}, 数量: {size}, ET时间: {et_hour}:{et_minute:02d}')
+                        logger.info('%s 卖空信号! 神奇九转计数: %s, '
+                                 '价格: %.2f, 数量: %s, ET时间: %s:%02d',
+                                 self.data.datetime.datetime(0), self.magic_nine.sell_count, current_price, size, et_hour, et_minute)
                         
                         # 下卖空订单
                         self.order = self.sell(size=size)
@@ -246,7 +247,7 @@ class MagicNineStrategyWithStopLoss(bt.Strategy):
             # 检查止损条件
             if self.stop_loss is not None:
                 if not self.is_short and current_price < self.stop_loss:  # 多头止损
-                    logger.info(f'{self.data.datetime.datetime(0).isoformat()} 多头止损触发! 价格: {current_price:.2f}, 止损价: {self.stop_loss:.2f}')
+                    logger.info('%s 多头止损触发! 价格: %.2f, 止损价: %.2f', self.data.datetime.datetime(0), current_price, self.stop_loss)
                     # 下卖出订单
                     self.order = self.sell(size=self.position_size)
                     self.position_size = 0
@@ -254,7 +255,7 @@ class MagicNineStrategyWithStopLoss(bt.Strategy):
                     return
                 
                 elif self.is_short and current_price > self.stop_loss:  # 空头止损
-                    logger.info(f'{self.data.datetime.datetime(0).isoformat()} 空头止损触发! 价格: {current_price:.2f}, 止损价: {self.stop_loss:.2f}')
+                    logger.info('%s 空头止损触发! 价格: %.2f, 止损价: %.2f', self.data.datetime.datetime(0), current_price, self.stop_loss)
                     # 下买入订单平空仓
                     self.order = self.buy(size=self.position_size)
                     self.position_size = 0
@@ -265,8 +266,9 @@ class MagicNineStrategyWithStopLoss(bt.Strategy):
             # 检查常规平仓信号
             if not self.is_short and self.magic_nine.sell_count >= self.p.magic_count:
                 # 多头仓位，检查卖出信号
-                logger.info(f'{self.data.datetime.datetime(0).isoformat()} 卖出信号! 神奇九转计数: {self.magic_nine.sell_count}, '
-                         f'价格: {current_price:.2f}, 数量: {self.position_size}')
+                logger.info('%s 卖出信号! 神奇九转计数: %s, '
+                         '价格: %.2f, 数量: %s',
+                         self.data.datetime.datetime(0), self.magic_nine.sell_count, current_price, self.position_size)
                 
                 # 下卖出订单
                 self.order = self.sell(size=self.position_size)
@@ -275,8 +277,9 @@ class MagicNineStrategyWithStopLoss(bt.Strategy):
             
             elif self.is_short and self.magic_nine.buy_count >= self.p.magic_count:
                 # 空头仓位，检查买入信号
-                logger.info(f'{self.data.datetime.datetime(0).isoformat()} 买入信号! 神奇九转计数: {self.magic_nine.buy_count}, '
-                         f'价格: {current_price:.2f}, 数量: {self.position_size}')
+                logger.info('%s 买入信号! 神奇九转计数: %s, '
+                         '价格: %.2f, 数量: %s',
+                         self.data.datetime.datetime(0), self.magic_nine.buy_count, current_price, self.position_size)
                 
                 # 下买入订单平空仓
                 self.order = self.buy(size=self.position_size)
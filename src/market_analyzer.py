@@ -4,6 +4,8 @@ from datetime import datetime, timedelta
 import talib
 from sklearn.linear_model import LinearRegression
 
+from .strategy_selector import StrategyType
+
 class MarketAnalyzer:
     """
     市场分析器：分析市场状态、波动性和趋势，为策略选择提供依据
@@ -172,8 +174,6 @@ class MarketAnalyzer:
         返回:
             str: 推荐的策略类型
         """
-        from .strategy_selector import StrategyType
-        
         regime = market_regime.get("regime", "normal")
         confidence = market_regime.get("confidence", 0)
         
@@ -203,8 +203,6 @@ class MarketAnalyzer:
         返回:
             dict: 推荐的策略参数
         """
-        from .strategy_selector import StrategyType
-        
         regime = market_regime.get("regime", "normal")
         volatility = market_regime.get("volatility", 0)
         trend_strength = market_regime.get("trend_strength", 0)
@@ -55,9 +55,12 @@ class MultiAssetStrategy(bt.Strategy):
             # 分配资金给该标的
             self.asset_values[symbol] = self.broker.get_value() * (1 - self.p.reserve_pct) * self.weights[symbol]
             
-        logger.info(f"多资产策略初始化完成 - 共{len(self.datas)}个标的，资金分配如下:")
-        for symbol, value in self.asset_values.items():
-            logger.info(f"  - {symbol}: {value:.2f} ({self.weights[symbol] * 100:.2f}%)")
+        # 资金分配明细合并为一条日志输出，只经过一次日志处理器
+        if logger.isEnabledFor(logging.INFO):
+            lines = [f"多资产策略初始化完成 - 共{len(self.datas)}个标的，资金分配如下:"]
+            for symbol, value in self.asset_values.items():
+                lines.append(f"  - {symbol}: {value:.2f} ({self.weights[symbol] * 100:.2f}%)")
+            logger.info("\n".join(lines))
         
     def calculate_weights(self):
         """计算每个资产的权重"""
@@ -90,17 +93,19 @@ class MultiAssetStrategy(bt.Strategy):
         
         if order.status in [order.Completed]:
             if order.isbuy():
-                logger.info(f'{order.data.datetime.datetime(0).isoformat()} {symbol} 买入执行: 价格: {order.executed.price:.2f}, '
-                         f'成本: {order.executed.value:.2f}, 手续费: {order.executed.comm:.2f}')
+                logger.info('%s %s 买入执行: 价格: %.2f, '
+                         '成本: %.2f, 手续费: %.2f',
+                         order.data.datetime.datetime(0), symbol, order.executed.price, order.executed.value, order.executed.comm)
                 self.buy_prices[symbol] = order.executed.price
                 self.buy_comms[symbol] = order.executed.comm
             elif order.issell():
-                logger.info(f'{order.data.datetime.datetime(0).isoformat()} {symbol} 卖出执行: 价格: {order.executed.price:.2f}, '
-                         f'成本: {order.executed.value:.2f}, 手续费: {order.executed.comm:.2f}')
+                logger.info('%s %s 卖出执行: 价格: %.2f, '
+                         '成本: %.2f, 手续费: %.2f',
+                         order.data.datetime.datetime(0), symbol, order.executed.price, order.executed.value, order.executed.comm)
                 
                 if self.buy_prices[symbol] is not None:
                     profit = (order.executed.price - self.buy_prices[symbol]) * order.executed.size
-                    logger.info(f'{order.data.datetime.datetime(0).isoformat()} {symbol} 交易利润: {profit:.2f}')
+                    logger.info('%s %s 交易利润: %.2f', order.data.datetime.datetime(0), symbol, profit)
         
         # 清除该标的的订单
         self.orders[symbol] = None
@@ -109,7 +114,7 @@ class MultiAssetStrategy(bt.Strategy):
         """交易结果通知"""
         if trade.isclosed:
             symbol = trade.data._name
-            logger.info(f'{trade.data.datetime.datetime(0).isoformat()} {symbol} 交易利润, 毛利润: {trade.pnl:.2f}, 净利润: {trade.pnlcomm:.2f}')
+            logger.info('%s %s 交易利润, 毛利润: %.2f, 净利润: %.2f', trade.data.datetime.datetime(0), symbol, trade.pnl, trade.pnlcomm)
     
     def next(self):
         """主策略逻辑 - 每个标的独立处理"""
@@ -134,8 +139,9 @@ class MultiAssetStrategy(bt.Strategy):
                     size = int(available_cash * 0.95 / current_price)  # 使用95%的分配资金
                     
                     if size > 0:
-                        logger.info(f'{data.datetime.datetime(0).isoformat()} {symbol} 买入信号! 神奇九转计数: {magic_nine.buy_count}, '
-                                 f'价格: {current_price:.2f}, 数量: {size}')
+                        logger.info('%s %s 买入信号! 神奇九转计数: %s, '
+                                 '价格: %.2f, 数量: %s',
+                                 data.datetime.datetime(0), symbol, magic_nine.buy_count, current_price, size)
                         
                         # 下买入订单
                         self.orders[symbol] = self.buy(data=data, size=size)
@@ -145,8 +151,9 @@ class MultiAssetStrategy(bt.Strategy):
                 # 已有仓位，检查卖出信号
                 if magic_nine.lines.sell_signal[0]:
                     position_size = self.getposition(data).size
-                    logger.info(f'{data.datetime.datetime(0).isoformat()} {symbol} 卖出信号! 神奇九转计数: {magic_nine.sell_count}, '
-                             f'价格: {current_price:.2f}, 数量: {position_size}')
+                    logger.info('%s %s 卖出信号! 神奇九转计数: %s, '
+                             '价格: %.2f, 数量: %s',
+                             data.datetime.datetime(0), symbol, magic_nine.sell_count, current_price, position_size)
                     
                     # 下卖出订单
                     self.orders[symbol] = self.sell(data=data, size=position_size)
@@ -154,6 +161,10 @@ class MultiAssetStrategy(bt.Strategy):
                     
     def stop(self):
         """策略结束时执行"""
+        # 以下统计仅用于日志输出，INFO级别被过滤时（如参数优化）直接跳过
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        
         # 计算每个标的的表现
         returns = {}
         for i, data in enumerate(self.datas):
@@ -171,7 +182,8 @@ class MultiAssetStrategy(bt.Strategy):
                 initial_value = self.asset_values[symbol]
                 returns[symbol] = (current_value / initial_value - 1) * 100
         
-        # 输出每个标的的表现
-        logger.info("各标的表现:")
+        # 输出每个标的的表现（合并为一条日志）
+        lines = ["各标的表现:"]
         for symbol, ret in returns.items():
-            logger.info(f"  - {symbol}: {ret:.2f}%") 
\ No newline at end of file
+            lines.append(f"  - {symbol}: {ret:.2f}%")
+        logger.info("\n".join(lines)) 
\ No newline at end of file
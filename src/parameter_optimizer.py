@@ -1,10 +1,21 @@
 import backtrader as bt
-import pandas as pd
 import logging
+import math
 import numpy as np
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Dict, Any, List, Tuple, Optional, Callable, Iterator
 import os
 import itertools
+import functools
+import atexit
+import csv
+import hashlib
+import importlib
+import inspect
+import json
+import pickle
+import multiprocessing
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from datetime import datetime, timedelta
 
 from src.config_system import SymbolConfig
@@ -12,45 +23,123 @@ from src.magic_nine_strategy import MagicNineStrategy
 from src.magic_nine_strategy_with_advanced_stoploss import MagicNineStrategyWithAdvancedStopLoss
 from src.magic_nine_strategy_with_smart_stoploss import MagicNineStrategyWithSmartStopLoss
 from src.data_fetcher import DataFetcher
+from src.bar_feed import PreloadedBarsData, frame_to_bar_columns
+from src.utils import get_nested
 from src.analyzers.sortino_ratio import SortinoRatio
-
-# 自定义回撤分析器
-class CustomDrawDown(bt.Analyzer):
-    """自定义回撤分析器，确保计算正确的回撤值"""
-    
-    def __init__(self):
-        self.peak = 0.0
-        self.valley = float('inf')
-        self.max_dd = 0.0
-        self.max_dd_len = 0
-        self.dd_len = 0
-        
-    def next(self):
-        # 获取当前资金曲线值
-        value = self.strategy.broker.getvalue()
-        
-        # 更新峰值
-        if value > self.peak:
-            self.peak = value
-            self.dd_len = 0
-        else:
-            self.dd_len += 1
-            
-        # 计算回撤
-        if self.peak > 0:
-            dd = (self.peak - value) / self.peak
-            if dd > self.max_dd:
-                self.max_dd = dd
-                self.max_dd_len = self.dd_len
-        
-    def get_analysis(self):
-        return {'max': {'drawdown': self.max_dd, 'len': self.max_dd_len}}
+from src.analyzers.custom_drawdown import CustomDrawDown
 
 logger = logging.getLogger(__name__)
 
+# 策略类型到策略类的分派表
+_STRATEGY_CLASSES = {
+    'original': MagicNineStrategy,
+    'advanced_stoploss': MagicNineStrategyWithAdvancedStopLoss,
+    'smart_stoploss': MagicNineStrategyWithSmartStopLoss,
+}
+
+# 每次回测使用的分析器及其参数，模块加载时构建一次
+_ANALYZER_SPECS = (
+    (bt.analyzers.SharpeRatio, dict(_name='sharpe', riskfreerate=0.0, annualize=True,
+                                    timeframe=bt.TimeFrame.Days, compression=1440)),
+    (CustomDrawDown, dict(_name='drawdown')),  # 使用自定义回撤分析器
+    (bt.analyzers.Returns, dict(_name='returns')),
+    (bt.analyzers.TradeAnalyzer, dict(_name='trades')),
+    (bt.analyzers.SQN, dict(_name='sqn')),
+    (SortinoRatio, dict(_name='sortino', riskfreerate=0.0, annualize=True,
+                        timeframe=bt.TimeFrame.Days)),
+)
+
+# 优化结果CSV中的指标列
+_RESULT_METRIC_KEYS = ('total_return', 'sharpe_ratio', 'sortino_ratio', 'max_drawdown', 'trade_count', 'win_rate', 'sqn')
+
+# 各优化指标对应的排序键（主指标, 次指标），未列出的指标默认使用夏普比率
+# 使用operator.itemgetter，避免每次比较都调用Python层的lambda
+_RANK_KEYS = {
+    'return': itemgetter('total_return', 'sharpe_ratio'),
+    'sharpe_ratio': itemgetter('sharpe_ratio', 'total_return'),
+    'sortino_ratio': itemgetter('sortino_ratio', 'total_return'),
+}
+
+# 回测结果缓存格式版本，指标的计算方式变化（而代码摘要覆盖不到）时递增，使旧缓存失效
+_RESULT_CACHE_VERSION = 1
+
+# 除策略模块外影响回测指标的模块：数据源构建、指标、分析器、指标提取，以及本模块（分析器配置和指标计算）
+_RESULT_CODE_MODULES = (
+    'src.bar_feed',
+    'src.utils',
+    'src.indicators',
+    'src.indicators.magic_nine',
+    'src.indicators.rsi_bundle',
+    'src.indicators.kdj_bundle',
+    'src.analyzers.sortino_ratio',
+    'src.analyzers.custom_drawdown',
+    __name__,
+)
+
+# 并行优化时子进程使用的上下文 (优化器, 标的, 策略类型, 策略类)
+# 通过fork继承，子进程无需重新导入模块或pickle优化器实例
+_WORKER_CONTEXT: Optional[Tuple[Any, str, str, type]] = None
+
+
+@functools.lru_cache(maxsize=None)
+def _strategy_code_digest(strategy_class: type) -> str:
+    """计算影响回测指标的代码摘要，用作回测结果缓存键的一部分
+
+    包括策略类及其基类所在模块和_RESULT_CODE_MODULES中的模块，
+    这些代码修改后旧的缓存结果自动失效。
+
+    Args:
+        strategy_class: 策略类
+
+    Returns:
+        源代码的SHA1摘要
+    """
+    module_names = {cls.__module__ for cls in strategy_class.__mro__ if cls.__module__.startswith('src.')}
+    module_names.update(_RESULT_CODE_MODULES)
+    digest = hashlib.sha1()
+    for name in sorted(module_names):
+        try:
+            source = inspect.getsource(importlib.import_module(name))
+        except (ImportError, OSError, TypeError):
+            source = ''
+        digest.update(name.encode('utf-8'))
+        digest.update(source.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _params_cache_key(params: Dict[str, Any]) -> str:
+    """生成策略参数在结果缓存中的键
+
+    Args:
+        params: 策略参数
+
+    Returns:
+        按参数名排序的JSON字符串
+    """
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+def _run_backtest_in_worker(params: Dict[str, Any]) -> Dict[str, float]:
+    """子进程中执行单组参数的回测
+
+    Args:
+        params: 策略参数
+
+    Returns:
+        性能指标字典
+    """
+    optimizer, symbol, strategy_type, strategy_class = _WORKER_CONTEXT
+    data = optimizer._prepare_data(symbol)
+    return optimizer._run_backtest(symbol, strategy_type, strategy_class, data, params)
+
+
 class ParameterOptimizer:
     """参数优化器，用于优化策略参数"""
     
+    # 优化结果保存使用单线程后台执行器，进程退出前等待写盘完成
+    _save_executor = ThreadPoolExecutor(max_workers=1)
+    atexit.register(_save_executor.shutdown, wait=True)
+    
     def __init__(self, 
                  days: int = 30, 
                  cash: float = 10000.0,
@@ -60,7 +149,8 @@ class ParameterOptimizer:
                  optimize_metrics: str = 'sharpe_ratio',
                  output_dir: str = 'logs/optimization',
                  api_config_path: str = 'config',
-                 api_key_path: str = 'config/private_key.pem'):
+                 api_key_path: str = 'config/private_key.pem',
+                 max_workers: int = 1):
         """初始化参数优化器
         
         Args:
@@ -73,6 +163,7 @@ class ParameterOptimizer:
             output_dir: 优化结果输出目录
             api_config_path: Tiger API 配置文件路径
             api_key_path: Tiger API 私钥路径
+            max_workers: 参数组合并行回测的进程数，1为串行，0为使用全部CPU核数；仅在支持fork的平台上生效
         """
         self.days = days
         self.cash = cash
@@ -83,6 +174,7 @@ class ParameterOptimizer:
         self.output_dir = output_dir
         self.api_config_path = api_config_path
         self.api_key_path = api_key_path
+        self.max_workers = max_workers if max_workers > 0 else (os.cpu_count() or 1)
         
         # 确保输出目录存在
         os.makedirs(output_dir, exist_ok=True)
@@ -90,14 +182,26 @@ class ParameterOptimizer:
         # 加载配置
         self.symbol_config = SymbolConfig.load_config(config_path)
         
-        # 创建数据获取器
-        cache_dir = 'data/cache'
-        os.makedirs(cache_dir, exist_ok=True)
-        self.data_fetcher = DataFetcher(config_path=api_config_path, 
-                                      private_key_path=api_key_path, 
-                                      cache_dir=cache_dir)
+        # 已解析的K线数据，键为标的代码，同一标的多轮优化和多次回测时复用
+        self._data_bars: Dict[str, Tuple[Any, ...]] = {}
+        # 数据文件内容摘要，用作回测结果缓存键的一部分
+        self._data_digests: Dict[str, str] = {}
+        # 各(标的, 策略类型)最近一次优化的最优指标
+        self._best_metrics: Dict[Tuple[str, str], Dict[str, Any]] = {}
         
-        logger.info(f"参数优化器初始化完成，优化指标: {optimize_metrics}")
+        logger.info("参数优化器初始化完成，优化指标: %s", optimize_metrics)
+
+    @functools.cached_property
+    def data_fetcher(self) -> DataFetcher:
+        """数据获取器，首次使用时才创建（初始化API客户端开销较大）
+
+        Returns:
+            DataFetcher实例
+        """
+        # 缓存目录由DataFetcher创建
+        return DataFetcher(config_path=self.api_config_path,
+                           private_key_path=self.api_key_path,
+                           cache_dir='data/cache')
 
     def optimize_strategy_params(self, 
                                symbol: str, 
@@ -113,7 +217,7 @@ class ParameterOptimizer:
         Returns:
             最优参数字典
         """
-        logger.info(f"开始优化 {symbol} 的策略参数")
+        logger.info("开始优化 %s 的策略参数", symbol)
         
         # 获取当前标的配置
         current_params = self.symbol_config.get_params(symbol)
@@ -123,13 +227,8 @@ class ParameterOptimizer:
             strategy_type = current_params.get('strategy_type', 'smart_stoploss')
         
         # 选择策略类
-        if strategy_type == 'original':
-            strategy_class = MagicNineStrategy
-        elif strategy_type == 'advanced_stoploss':
-            strategy_class = MagicNineStrategyWithAdvancedStopLoss
-        elif strategy_type == 'smart_stoploss':
-            strategy_class = MagicNineStrategyWithSmartStopLoss
-        else:
+        strategy_class = _STRATEGY_CLASSES.get(strategy_type)
+        if strategy_class is None:
             raise ValueError(f"不支持的策略类型: {strategy_type}")
         
         # 如果未指定参数范围，使用默认范围
@@ -137,138 +236,57 @@ class ParameterOptimizer:
             param_ranges = self._get_default_param_ranges(strategy_type)
         
         # 数据准备
-        logger.info(f"正在准备 {symbol} 的数据...")
+        logger.info("正在准备 %s 的数据...", symbol)
         data = self._prepare_data(symbol)
         
-        # 创建Cerebro引擎用于优化
-        cerebro = bt.Cerebro(stdstats=False, maxcpus=None)
-        
-        # 添加数据
-        cerebro.adddata(data)
-        
-        # 设置初始资金
-        cerebro.broker.setcash(self.cash)
-        
-        # 设置佣金
-        cerebro.broker.setcommission(commission=self.commission)
-        
-        # 添加分析器
-        cerebro.addanalyzer(bt.analyzers.SharpeRatio, _name='sharpe', riskfreerate=0.0, annualize=True,
-                           timeframe=bt.TimeFrame.Days, compression=1440)
-        cerebro.addanalyzer(CustomDrawDown, _name='drawdown')  # 使用自定义回撤分析器
-        cerebro.addanalyzer(bt.analyzers.Returns, _name='returns')
-        cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name='trades')
-        cerebro.addanalyzer(bt.analyzers.SQN, _name='sqn')
-        cerebro.addanalyzer(SortinoRatio, _name='sortino', riskfreerate=0.0, annualize=True,
-                          timeframe=bt.TimeFrame.Days)
-        
         # 创建参数组合
         param_combinations = self._generate_param_combinations(param_ranges)
-        logger.info(f"共生成 {len(param_combinations)} 种参数组合进行测试")
+        logger.info("共生成 %s 种参数组合进行测试", len(param_combinations))
         
         # 保存优化结果
         optimization_results = []
         
+        # 运行回测（命中结果缓存时直接复用）；多进程时按原顺序逐个产出结果，保证并列时的选择与串行一致
+        result_cache = self._load_result_cache(symbol, strategy_type)
+        if self._use_process_pool(len(param_combinations)):
+            all_metrics = self._run_backtests_parallel(symbol, strategy_type, strategy_class,
+                                                       param_combinations, result_cache)
+        else:
+            all_metrics = (self._run_backtest(symbol, strategy_type, strategy_class, data, params, result_cache)
+                           for params in param_combinations)
+        
         # 遍历参数组合
-        for param_idx, params in enumerate(param_combinations):
-            # 重置Cerebro引擎
-            cerebro = bt.Cerebro(stdstats=False, maxcpus=None)
-            cerebro.adddata(data)
-            cerebro.broker.setcash(self.cash)
-            cerebro.broker.setcommission(commission=self.commission)
-            
-            # 添加分析器
-            cerebro.addanalyzer(bt.analyzers.SharpeRatio, _name='sharpe', riskfreerate=0.0, annualize=True,
-                               timeframe=bt.TimeFrame.Days, compression=1440)
-            cerebro.addanalyzer(CustomDrawDown, _name='drawdown')  # 使用自定义回撤分析器
-            cerebro.addanalyzer(bt.analyzers.Returns, _name='returns')
-            cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name='trades')
-            cerebro.addanalyzer(bt.analyzers.SQN, _name='sqn')
-            cerebro.addanalyzer(SortinoRatio, _name='sortino', riskfreerate=0.0, annualize=True,
-                              timeframe=bt.TimeFrame.Days)
-            
-            # 添加策略，设置参数
-            cerebro.addstrategy(strategy_class, **params)
-            
-            # 运行回测
-            logger.debug(f"测试参数组合 {param_idx+1}/{len(param_combinations)}: {params}")
-            results = cerebro.run()
-            strat = results[0]
-            
-            # 收集分析结果
-            sharpe = strat.analyzers.sharpe.get_analysis()
-            drawdown = strat.analyzers.drawdown.get_analysis()
-            returns = strat.analyzers.returns.get_analysis()
-            trades = strat.analyzers.trades.get_analysis()
-            sqn = strat.analyzers.sqn.get_analysis()
-            sortino = strat.analyzers.sortino.get_analysis()
-            
-            # 计算指标
-            total_return = returns.get('rtot', 0.0) * 100.0
-            sharpe_ratio = sharpe.get('sharperatio', 0.0)
-            if not sharpe_ratio or not np.isfinite(sharpe_ratio):
-                sharpe_ratio = 0.0
-                
-            sortino_ratio = sortino.get('sortinoratio', 0.0)
-            if not sortino_ratio or not np.isfinite(sortino_ratio):
-                sortino_ratio = 0.0
-            
-            # 修复：确保drawdown值只乘以100一次
-            max_drawdown = drawdown.get('max', {}).get('drawdown', 0.0) * 100.0
-            # 添加安全检查，确保max_drawdown在合理范围内
-            if max_drawdown > 100.0:
-                logger.warning(f"检测到异常大的回撤值: {max_drawdown}%，可能是计算错误")
-                # 如果值异常大，尝试修正
-                if max_drawdown > 100.0 and max_drawdown <= 10000.0:
-                    # 可能是被错误地乘以了100，将其除以100
-                    max_drawdown = max_drawdown / 100.0
-                    logger.info(f"已修正回撤值为: {max_drawdown}%")
-            
-            trade_count = trades.get('total', {}).get('total', 0)
-            win_rate = 0.0
-            if trade_count > 0:
-                won = trades.get('won', {}).get('total', 0)
-                win_rate = (won / trade_count) * 100.0
+        for param_idx, (params, metrics) in enumerate(zip(param_combinations, all_metrics)):
+            logger.debug("测试参数组合 %s/%s: %s", param_idx+1, len(param_combinations), params)
             
             # 保存结果
-            result = {
-                'params': params,
-                'total_return': total_return,
-                'sharpe_ratio': sharpe_ratio,
-                'sortino_ratio': sortino_ratio,
-                'max_drawdown': max_drawdown,
-                'trade_count': trade_count,
-                'win_rate': win_rate,
-                'sqn': sqn.get('sqn', 0.0)
-            }
+            result = {'params': params, **metrics}
             optimization_results.append(result)
             
             # 进度报告
             if (param_idx + 1) % 10 == 0 or param_idx == len(param_combinations) - 1:
-                logger.info(f"已完成 {param_idx+1}/{len(param_combinations)} 组参数测试")
-        
-        # 根据优化指标排序
-        if self.optimize_metrics == 'return':
-            sorted_results = sorted(optimization_results, key=lambda x: (x['total_return'], x['sharpe_ratio']), reverse=True)
-        elif self.optimize_metrics == 'sharpe_ratio':
-            sorted_results = sorted(optimization_results, key=lambda x: (x['sharpe_ratio'], x['total_return']), reverse=True)
-        elif self.optimize_metrics == 'sortino_ratio':
-            sorted_results = sorted(optimization_results, key=lambda x: (x['sortino_ratio'], x['total_return']), reverse=True)
-        else:
-            # 默认使用夏普比率
-            sorted_results = sorted(optimization_results, key=lambda x: (x['sharpe_ratio'], x['total_return']), reverse=True)
+                logger.info("已完成 %s/%s 组参数测试", param_idx+1, len(param_combinations))
+        
+        # 本轮新增的回测结果一次性写回缓存
+        self._save_result_cache(symbol, strategy_type, result_cache)
         
-        # 获取最优参数
-        best_result = sorted_results[0]
+        # 主线程只需要最优结果，用max线性选出；完整排序放到后台保存线程中进行
+        # 排序稳定且max在并列时返回首个元素，选出的最优结果与完整排序后的首项一致
+        rank_key = _RANK_KEYS.get(self.optimize_metrics, _RANK_KEYS['sharpe_ratio'])
+        best_result = max(optimization_results, key=rank_key)
         best_params = best_result['params']
+        self._best_metrics[(symbol, strategy_type)] = {k: v for k, v in best_result.items() if k != 'params'}
         
-        # 保存完整优化结果
-        self._save_optimization_results(symbol, strategy_type, sorted_results)
+        # 保存完整优化结果（后台线程排序并写盘，不阻塞后续优化）
+        save_future = self._save_executor.submit(self._save_optimization_results, symbol, strategy_type,
+                                                 optimization_results, rank_key)
+        save_future.add_done_callback(self._on_save_done)
         
         # 显示最优结果
-        logger.info(f"优化完成! 最优参数: {best_params}")
-        logger.info(f"最优指标: 收益率 = {best_result['total_return']:.2f}%, 夏普比率 = {best_result['sharpe_ratio']:.4f}, "
-                  f"最大回撤 = {best_result['max_drawdown']:.2f}%, 交易次数 = {best_result['trade_count']}, 胜率 = {best_result['win_rate']:.2f}%")
+        logger.info("优化完成! 最优参数: %s", best_params)
+        logger.info("最优指标: 收益率 = %.2f%%, 夏普比率 = %.4f, "
+                  "最大回撤 = %.2f%%, 交易次数 = %s, 胜率 = %.2f%%",
+                  best_result['total_return'], best_result['sharpe_ratio'], best_result['max_drawdown'], best_result['trade_count'], best_result['win_rate'])
         
         # 更新配置
         best_params_with_strategy = {**best_params, 'strategy_type': strategy_type}
@@ -301,7 +319,8 @@ class ParameterOptimizer:
                 best_params = self.optimize_strategy_params(symbol, strategy_type)
                 results[symbol] = best_params
             except Exception as e:
-                logger.error(f"优化 {symbol} 的参数时出错: {e}")
+                # 批量优化中单个标的失败很常见（如缺少数据），堆栈只在DEBUG级别附带
+                logger.error("优化 %s 的参数时出错: %s", symbol, e, exc_info=logger.isEnabledFor(logging.DEBUG))
         
         return results
     
@@ -314,25 +333,30 @@ class ParameterOptimizer:
         Returns:
             最优策略类型和参数
         """
-        logger.info(f"开始优化 {symbol} 的策略类型和参数")
+        logger.info("开始优化 %s 的策略类型和参数", symbol)
         
         # 存储各策略类型的最优结果
         strategy_results = {}
         
         # 测试所有策略类型
-        for strategy_type in ['original', 'advanced_stoploss', 'smart_stoploss']:
+        for strategy_type in _STRATEGY_CLASSES:
             try:
-                logger.info(f"测试策略类型: {strategy_type}")
+                logger.info("测试策略类型: %s", strategy_type)
                 best_params = self.optimize_strategy_params(symbol, strategy_type)
                 
                 # 获取最优参数的性能指标
-                metrics = self._evaluate_strategy(symbol, strategy_type, best_params)
+                # 优先复用优化过程中已得到的最优指标，避免重复回测
+                metrics = self._best_metrics.get((symbol, strategy_type))
+                if metrics is None:
+                    strategy_params = {k: v for k, v in best_params.items() if k != 'strategy_type'}
+                    metrics = self._evaluate_strategy(symbol, strategy_type, strategy_params)
                 strategy_results[strategy_type] = {
                     'params': best_params,
                     'metrics': metrics
                 }
             except Exception as e:
-                logger.error(f"优化 {symbol} 的 {strategy_type} 策略时出错: {e}")
+                logger.error("优化 %s 的 %s 策略时出错: %s", symbol, strategy_type, e,
+                             exc_info=logger.isEnabledFor(logging.DEBUG))
         
         # 根据优化指标选择最佳策略类型
         best_strategy_type = None
@@ -369,52 +393,122 @@ class ParameterOptimizer:
             self.symbol_config.update_params(symbol, best_params_with_strategy)
             self.symbol_config.save_config(self.config_path)
             
-            logger.info(f"最优策略类型: {best_strategy_type}, 参数: {best_params}")
-            logger.info(f"最优指标: 收益率 = {best_metrics['total_return']:.2f}%, 夏普比率 = {best_metrics['sharpe_ratio']:.4f}, "
-                      f"最大回撤 = {best_metrics['max_drawdown']:.2f}%, 交易次数 = {best_metrics['trade_count']}, 胜率 = {best_metrics['win_rate']:.2f}%")
+            logger.info("最优策略类型: %s, 参数: %s", best_strategy_type, best_params)
+            logger.info("最优指标: 收益率 = %.2f%%, 夏普比率 = %.4f, "
+                      "最大回撤 = %.2f%%, 交易次数 = %s, 胜率 = %.2f%%",
+                      best_metrics['total_return'], best_metrics['sharpe_ratio'], best_metrics['max_drawdown'], best_metrics['trade_count'], best_metrics['win_rate'])
             
             return best_params_with_strategy
         else:
-            logger.warning(f"未找到 {symbol} 的最优策略")
+            logger.warning("未找到 %s 的最优策略", symbol)
             return None
     
-    def _prepare_data(self, symbol: str) -> bt.feeds.PandasData:
+    def _prepare_data(self, symbol: str) -> bt.feed.DataBase:
         """准备回测数据
         
         Args:
             symbol: 标的代码
             
         Returns:
-            bt.feeds.PandasData实例
+            回放已解析K线的数据源实例
         """
-        # 获取数据
-        logger.info(f"获取 {symbol} 的历史数据，天数: {self.days}, 使用缓存: {self.use_cache}")
-        
-        # 计算时间范围
-        end_date = datetime.now()
-        begin_date = end_date - timedelta(days=self.days)
-        
-        # 获取数据并准备backtrader文件
-        df = self.data_fetcher.get_bar_data(symbol, begin_time=begin_date, end_time=end_date, use_cache=self.use_cache)
-        data_file = self.data_fetcher.prepare_backtrader_data(symbol, df)
-        
-        if data_file is None:
-            raise ValueError(f"无法获取或准备 {symbol} 的数据")
-        
-        data = bt.feeds.GenericCSVData(
-            dataname=data_file,
-            datetime=0,
-            open=1,
-            high=2,
-            low=3,
-            close=4,
-            volume=5,
-            openinterest=-1,
-            dtformat='%Y-%m-%d %H:%M:%S',
-            timeframe=bt.TimeFrame.Minutes
-        )
-        return data
+        bars = self._data_bars.get(symbol)
+        if bars is None:
+            # 获取数据
+            logger.info("获取 %s 的历史数据，天数: %s, 使用缓存: %s", symbol, self.days, self.use_cache)
+            
+            # 计算时间范围
+            end_date = datetime.now()
+            begin_date = end_date - timedelta(days=self.days)
+            
+            # 获取数据，数据源直接由DataFrame构建，不再写出backtrader数据文件
+            df = self.data_fetcher.get_bar_data(symbol, begin_time=begin_date, end_time=end_date, use_cache=self.use_cache)
+            
+            if df is None or df.empty:
+                raise ValueError(f"无法获取或准备 {symbol} 的数据")
+            
+            # 只转换一次K线数据，后续回测直接回放，不再重复解析数据
+            bars = self._data_bars[symbol] = frame_to_bar_columns(df)
+            
+            # 用K线内容摘要标识数据版本
+            self._data_digests[symbol] = hashlib.sha1(b''.join(column.tobytes() for column in bars)).hexdigest()
+        
+        # 数据源对象带有运行状态，每次回测都创建新的实例
+        return PreloadedBarsData(columns=bars, timeframe=bt.TimeFrame.Minutes)
     
+    def _use_process_pool(self, task_count: int) -> bool:
+        """判断是否使用多进程并行回测
+
+        Args:
+            task_count: 待回测的参数组合数量
+
+        Returns:
+            是否使用多进程
+        """
+        if self.max_workers <= 1 or task_count <= 1:
+            return False
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            logger.warning("当前平台不支持fork，参数优化将串行执行")
+            return False
+        return True
+
+    def _run_backtests_parallel(self,
+                                symbol: str,
+                                strategy_type: str,
+                                strategy_class: type,
+                                param_combinations: List[Dict[str, Any]],
+                                result_cache: Optional[Dict[str, Dict[str, float]]] = None) -> Iterator[Dict[str, float]]:
+        """使用fork进程池并行回测多组参数
+
+        父进程已导入backtrader/pandas等模块并准备好数据文件，fork出的子进程
+        通过写时复制共享这些内存，省去每个进程重新导入和加载数据的开销。
+        命中结果缓存的参数组合不再提交给子进程，新结果由父进程写入缓存。
+        结果按参数顺序逐个产出，调用方的进度日志随子进程完成情况实时推进。
+
+        Args:
+            symbol: 标的代码
+            strategy_type: 策略类型
+            strategy_class: 策略类
+            param_combinations: 参数组合列表
+            result_cache: 参数键 -> 性能指标 的结果缓存，为None时不使用缓存
+
+        Yields:
+            与param_combinations顺序一致的性能指标
+        """
+        cache_keys = [_params_cache_key(params) for params in param_combinations] if result_cache is not None else None
+        # 先确定待回测的组合，避免重复参数在迭代中命中刚写入的缓存而错位
+        if result_cache is None:
+            is_pending = [True] * len(param_combinations)
+        else:
+            is_pending = [key not in result_cache for key in cache_keys]
+        pending = [params for params, flag in zip(param_combinations, is_pending) if flag]
+        if not pending:
+            for key in cache_keys:
+                yield result_cache[key]
+            return
+        
+        # fork时其他线程若正持有锁（如后台保存线程写日志），子进程中的锁将永远无法释放，
+        # 创建进程池前先等后台保存任务全部结束
+        self._wait_for_pending_saves()
+        
+        global _WORKER_CONTEXT
+        _WORKER_CONTEXT = (self, symbol, strategy_type, strategy_class)
+        try:
+            workers = min(self.max_workers, len(pending))
+            with ProcessPoolExecutor(max_workers=workers,
+                                     mp_context=multiprocessing.get_context('fork')) as executor:
+                new_metrics = executor.map(_run_backtest_in_worker, pending)
+                for idx, flag in enumerate(is_pending):
+                    if not flag:
+                        yield result_cache[cache_keys[idx]]
+                        continue
+                    metrics = next(new_metrics)
+                    if result_cache is not None:
+                        result_cache[cache_keys[idx]] = metrics
+                    yield metrics
+        finally:
+            _WORKER_CONTEXT = None
+
     def _evaluate_strategy(self, 
                          symbol: str, 
                          strategy_type: str, 
@@ -430,18 +524,47 @@ class ParameterOptimizer:
             性能指标字典
         """
         # 选择策略类
-        if strategy_type == 'original':
-            strategy_class = MagicNineStrategy
-        elif strategy_type == 'advanced_stoploss':
-            strategy_class = MagicNineStrategyWithAdvancedStopLoss
-        elif strategy_type == 'smart_stoploss':
-            strategy_class = MagicNineStrategyWithSmartStopLoss
-        else:
+        strategy_class = _STRATEGY_CLASSES.get(strategy_type)
+        if strategy_class is None:
             raise ValueError(f"不支持的策略类型: {strategy_type}")
         
         # 数据准备
         data = self._prepare_data(symbol)
         
+        result_cache = self._load_result_cache(symbol, strategy_type)
+        metrics = self._run_backtest(symbol, strategy_type, strategy_class, data, params, result_cache)
+        self._save_result_cache(symbol, strategy_type, result_cache)
+        return metrics
+    
+    def _run_backtest(self,
+                      symbol: str,
+                      strategy_type: str,
+                      strategy_class: type,
+                      data: bt.feed.DataBase,
+                      params: Dict[str, Any],
+                      result_cache: Optional[Dict[str, Dict[str, float]]] = None) -> Dict[str, float]:
+        """运行单次回测并提取性能指标
+        
+        传入结果缓存时，相同策略参数的回测直接返回缓存结果，新结果写入缓存字典，
+        由调用方在整轮优化结束后统一落盘（见_load_result_cache/_save_result_cache）。
+        
+        Args:
+            symbol: 标的代码
+            strategy_type: 策略类型
+            strategy_class: 策略类
+            data: 回测数据源
+            params: 策略参数
+            result_cache: 参数键 -> 性能指标 的结果缓存，为None时不使用缓存
+            
+        Returns:
+            性能指标字典
+        """
+        if result_cache is not None:
+            cache_key = _params_cache_key(params)
+            cached = result_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         # 创建Cerebro引擎
         cerebro = bt.Cerebro(stdstats=False)
         cerebro.adddata(data)
@@ -449,14 +572,8 @@ class ParameterOptimizer:
         cerebro.broker.setcommission(commission=self.commission)
         
         # 添加分析器
-        cerebro.addanalyzer(bt.analyzers.SharpeRatio, _name='sharpe', riskfreerate=0.0, annualize=True,
-                           timeframe=bt.TimeFrame.Days, compression=1440)
-        cerebro.addanalyzer(CustomDrawDown, _name='drawdown')  # 使用自定义回撤分析器
-        cerebro.addanalyzer(bt.analyzers.Returns, _name='returns')
-        cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name='trades')
-        cerebro.addanalyzer(bt.analyzers.SQN, _name='sqn')
-        cerebro.addanalyzer(SortinoRatio, _name='sortino', riskfreerate=0.0, annualize=True,
-                          timeframe=bt.TimeFrame.Days)
+        for analyzer_class, analyzer_kwargs in _ANALYZER_SPECS:
+            cerebro.addanalyzer(analyzer_class, **analyzer_kwargs)
         
         # 添加策略
         cerebro.addstrategy(strategy_class, **params)
@@ -466,41 +583,43 @@ class ParameterOptimizer:
         strat = results[0]
         
         # 收集分析结果
-        sharpe = strat.analyzers.sharpe.get_analysis()
-        drawdown = strat.analyzers.drawdown.get_analysis()
-        returns = strat.analyzers.returns.get_analysis()
-        trades = strat.analyzers.trades.get_analysis()
-        sqn = strat.analyzers.sqn.get_analysis()
-        sortino = strat.analyzers.sortino.get_analysis()
-        
-        # 计算指标
+        # 按_ANALYZER_SPECS中的_name取分析器，不依赖分析器的添加顺序
+        analyzers = strat.analyzers
+        sharpe = analyzers.sharpe.get_analysis()
+        drawdown = analyzers.drawdown.get_analysis()
+        returns = analyzers.returns.get_analysis()
+        trades = analyzers.trades.get_analysis()
+        sqn = analyzers.sqn.get_analysis()
+        sortino = analyzers.sortino.get_analysis()
+        
+        # 计算指标（均为标量，用math.isfinite判断，避免numpy对标量的ufunc调用开销）
         total_return = returns.get('rtot', 0.0) * 100.0
         sharpe_ratio = sharpe.get('sharperatio', 0.0)
-        if not sharpe_ratio or not np.isfinite(sharpe_ratio):
+        if not sharpe_ratio or not math.isfinite(sharpe_ratio):
             sharpe_ratio = 0.0
             
         sortino_ratio = sortino.get('sortinoratio', 0.0)
-        if not sortino_ratio or not np.isfinite(sortino_ratio):
+        if not sortino_ratio or not math.isfinite(sortino_ratio):
             sortino_ratio = 0.0
         
         # 修复：确保drawdown值只乘以100一次
-        max_drawdown = drawdown.get('max', {}).get('drawdown', 0.0) * 100.0
+        max_drawdown = get_nested(drawdown, 'max', 'drawdown', default=0.0) * 100.0
         # 添加安全检查，确保max_drawdown在合理范围内
         if max_drawdown > 100.0:
-            logger.warning(f"检测到异常大的回撤值: {max_drawdown}%，可能是计算错误")
+            logger.warning("检测到异常大的回撤值: %s%%，可能是计算错误", max_drawdown)
             # 如果值异常大，尝试修正
             if max_drawdown > 100.0 and max_drawdown <= 10000.0:
                 # 可能是被错误地乘以了100，将其除以100
                 max_drawdown = max_drawdown / 100.0
-                logger.info(f"已修正回撤值为: {max_drawdown}%")
+                logger.info("已修正回撤值为: %s%%", max_drawdown)
         
-        trade_count = trades.get('total', {}).get('total', 0)
+        trade_count = get_nested(trades, 'total', 'total')
         win_rate = 0.0
         if trade_count > 0:
-            won = trades.get('won', {}).get('total', 0)
+            won = get_nested(trades, 'won', 'total')
             win_rate = (won / trade_count) * 100.0
         
-        return {
+        metrics = {
             'total_return': total_return,
             'sharpe_ratio': sharpe_ratio,
             'sortino_ratio': sortino_ratio,
@@ -509,6 +628,90 @@ class ParameterOptimizer:
             'win_rate': win_rate,
             'sqn': sqn.get('sqn', 0.0)
         }
+        
+        if result_cache is not None:
+            result_cache[cache_key] = metrics
+        
+        return metrics
+    
+    def _result_cache_path(self, symbol: str, strategy_type: str) -> Optional[str]:
+        """计算回测结果缓存文件路径
+        
+        同一标的、策略类型、数据、资金和佣金下所有参数组合的结果保存在同一个文件中，
+        一次优化只需读写一次，不再为每组参数单独创建小文件。
+        缓存键包含数据文件内容的摘要及策略、指标和分析器代码的摘要，
+        数据或代码更新后旧缓存自动失效。
+        
+        Args:
+            symbol: 标的代码
+            strategy_type: 策略类型
+            
+        Returns:
+            缓存文件路径，缓存被禁用或数据文件未知时返回None
+        """
+        if os.environ.get('BACKTEST_CACHE_DISABLED') == '1':
+            return None
+        
+        data_digest = self._data_digests.get(symbol)
+        if data_digest is None:
+            return None
+        
+        key_data = {
+            'version': _RESULT_CACHE_VERSION,
+            'code': _strategy_code_digest(_STRATEGY_CLASSES[strategy_type]),
+            'symbol': symbol,
+            'strategy_type': strategy_type,
+            'data': data_digest,
+            'cash': self.cash,
+            'commission': self.commission
+        }
+        key = hashlib.sha1(json.dumps(key_data, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        
+        return os.path.join(self.output_dir, 'cache', f"{key}.pkl")
+    
+    def _load_result_cache(self, symbol: str, strategy_type: str) -> Optional[Dict[str, Dict[str, float]]]:
+        """读取回测结果缓存
+        
+        设置环境变量 BACKTEST_CACHE_DISABLED=1 可禁用缓存。
+        
+        Args:
+            symbol: 标的代码
+            strategy_type: 策略类型
+            
+        Returns:
+            参数键 -> 性能指标 的字典，缓存被禁用时返回None
+        """
+        cache_path = self._result_cache_path(symbol, strategy_type)
+        if cache_path is None:
+            return None
+        if os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'rb') as f:
+                    return pickle.load(f)
+            except Exception as e:
+                logger.warning("读取回测结果缓存失败: %s, 错误: %s", cache_path, e)
+        return {}
+    
+    def _save_result_cache(self, symbol: str, strategy_type: str,
+                           result_cache: Optional[Dict[str, Dict[str, float]]]) -> None:
+        """将回测结果缓存写回磁盘
+        
+        Args:
+            symbol: 标的代码
+            strategy_type: 策略类型
+            result_cache: _load_result_cache返回并在回测中更新过的缓存
+        """
+        if not result_cache:
+            return
+        
+        cache_path = self._result_cache_path(symbol, strategy_type)
+        try:
+            # 缓存目录只在真正写入时创建，读取和禁用缓存时不做多余的文件系统调用
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path, 'wb') as f:
+                pickle.dump(result_cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.warning("写入回测结果缓存失败: %s, 错误: %s", cache_path, e)
     
     def _get_default_param_ranges(self, strategy_type: str) -> Dict[str, List[Any]]:
         """获取默认参数范围
@@ -600,7 +803,7 @@ class ParameterOptimizer:
         total_combinations = np.prod([len(values) for values in param_values])
         
         if total_combinations > 100:
-            logger.warning(f"参数组合总数 {total_combinations} 过多，将随机采样最多100组")
+            logger.warning("参数组合总数 %s 过多，将随机采样最多100组", total_combinations)
             combinations = []
             for _ in range(min(100, total_combinations)):
                 params = {}
@@ -617,46 +820,56 @@ class ParameterOptimizer:
         
         return combinations
     
+    @classmethod
+    def _wait_for_pending_saves(cls) -> None:
+        """等待已提交的后台保存任务（包括其完成回调）全部执行完毕"""
+        # 保存执行器只有一个线程、按提交顺序执行，空任务完成时之前的任务和回调都已结束
+        cls._save_executor.submit(lambda: None).result()
+    
+    @staticmethod
+    def _on_save_done(future) -> None:
+        """后台保存完成回调，记录保存过程中出现的异常
+        
+        Args:
+            future: 保存任务的Future对象
+        """
+        error = future.exception()
+        if error is not None:
+            logger.error("保存优化结果失败: %s", error)
+    
     def _save_optimization_results(self, 
                                 symbol: str, 
                                 strategy_type: str, 
-                                results: List[Dict[str, Any]]) -> str:
+                                results: List[Dict[str, Any]],
+                                rank_key: Optional[Callable[[Dict[str, Any]], Any]] = None) -> str:
         """保存优化结果
         
         Args:
             symbol: 标的代码
             strategy_type: 策略类型
             results: 优化结果列表
+            rank_key: 排序键，指定时按其降序排列后再保存
             
         Returns:
             保存的文件路径
         """
+        if rank_key is not None:
+            results = sorted(results, key=rank_key, reverse=True)
+        
         # 生成文件名
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         file_path = os.path.join(self.output_dir, f"{symbol}_{strategy_type}_optimization_{timestamp}.csv")
         
-        # 将结果转换为DataFrame
-        rows = []
-        for result in results:
-            row = {
-                'total_return': result['total_return'],
-                'sharpe_ratio': result['sharpe_ratio'],
-                'sortino_ratio': result['sortino_ratio'],
-                'max_drawdown': result['max_drawdown'],
-                'trade_count': result['trade_count'],
-                'win_rate': result['win_rate'],
-                'sqn': result['sqn']
-            }
-            # 添加参数
-            for param_name, param_value in result['params'].items():
-                row[param_name] = param_value
-            
-            rows.append(row)
-        
-        df = pd.DataFrame(rows)
-        
-        # 保存为CSV
-        df.to_csv(file_path, index=False)
-        logger.info(f"优化结果已保存到: {file_path}")
+        # 逐行写出CSV，不再先构建完整的行列表和DataFrame；列为指标列加上按出现顺序合并的参数名
+        param_names = list(dict.fromkeys(name for result in results for name in result['params']))
+        with open(file_path, 'w', newline='', buffering=1 << 20) as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(_RESULT_METRIC_KEYS + tuple(param_names))
+            for result in results:
+                params = result['params']
+                writer.writerow([*(result[key] for key in _RESULT_METRIC_KEYS),
+                                 *(params.get(name, '') for name in param_names)])
+        
+        logger.info("优化结果已保存到: %s", file_path)
         
         return file_path 
\ No newline at end of file
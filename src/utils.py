@@ -3,6 +3,20 @@ import logging
 import csv
 from datetime import datetime
 
+import pytz
+
+# 美东时区只构建一次；优先使用标准库zoneinfo（转换由C实现并缓存），
+# 低版本Python或系统缺少时区数据库时回退到pytz
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:
+    EASTERN_TZ = pytz.timezone('US/Eastern')
+else:
+    try:
+        EASTERN_TZ = ZoneInfo('America/New_York')
+    except ZoneInfoNotFoundError:
+        EASTERN_TZ = pytz.timezone('US/Eastern')
+
 def setup_logging(log_dir='logs', log_level=logging.INFO):
     """
     配置日志
@@ -31,6 +45,28 @@ def setup_logging(log_dir='logs', log_level=logging.INFO):
     return logging.getLogger()
 
 
+def get_nested(mapping, *keys, default=0):
+    """
+    按键路径逐层读取嵌套字典（如分析器结果）中的值
+    
+    任一层缺失或为None时返回默认值，不需要为每层准备空字典作为缺省值。
+    
+    Args:
+        mapping: 嵌套字典，可以为None
+        *keys: 逐层的键
+        default: 路径不存在时的返回值
+        
+    Returns:
+        路径上的值，不存在或为None时返回default
+    """
+    value = mapping
+    for key in keys:
+        if not value:
+            return default
+        value = value.get(key)
+    return default if value is None else value
+
+
 def log_trade(symbol, timestamp, action, price, quantity, value, commission, profit=None):
     """
     记录交易信息到CSV文件
@@ -49,8 +85,9 @@ def log_trade(symbol, timestamp, action, price, quantity, value, commission, pro
     trade_log_dir = 'logs/trades'
     os.makedirs(trade_log_dir, exist_ok=True)
     
-    # 交易记录文件
-    trade_log_file = os.path.join(trade_log_dir, f"trades_{datetime.now().strftime('%Y%m%d')}.csv")
+    # 交易记录文件（按日期分文件，直接拼接年月日，避免每笔交易都解析strftime格式串）
+    today = datetime.now()
+    trade_log_file = os.path.join(trade_log_dir, f"trades_{today.year:04d}{today.month:02d}{today.day:02d}.csv")
     
     # 检查文件是否存在，不存在则创建并写入表头
     file_exists = os.path.isfile(trade_log_file)
@@ -1,4 +1,5 @@
 import backtrader as bt
+import math
 import matplotlib.pyplot as plt
 plt.rcParams['font.sans-serif'] = ['SimHei']  # 用来正常显示中文标签
 plt.rcParams['axes.unicode_minus'] = False    # 用来正常显示负号
@@ -26,16 +27,16 @@ class MagicNineObserver(bt.Observer):
             # 获取buy_setup值
             if hasattr(self._owner.magic_nine, 'buy_count'):
                 buy_count = self._owner.magic_nine.buy_count
-                self.lines.buy_setup[0] = buy_count if buy_count > 0 else float('nan')
+                self.lines.buy_setup[0] = buy_count if buy_count > 0 else math.nan
             else:
-                self.lines.buy_setup[0] = float('nan')
+                self.lines.buy_setup[0] = math.nan
                 
             # 获取sell_setup值
             if hasattr(self._owner.magic_nine, 'sell_count'):
                 sell_count = self._owner.magic_nine.sell_count
-                self.lines.sell_setup[0] = sell_count if sell_count > 0 else float('nan')
+                self.lines.sell_setup[0] = sell_count if sell_count > 0 else math.nan
             else:
-                self.lines.sell_setup[0] = float('nan')
+                self.lines.sell_setup[0] = math.nan
                 
             # 获取信号值
             if hasattr(self._owner.magic_nine.lines, 'buy_signal'):
@@ -49,7 +50,7 @@ class MagicNineObserver(bt.Observer):
                 self.lines.sell_signal[0] = 0
         else:
             # 如果没有magic_nine属性，则所有值设为NaN或0
-            self.lines.buy_setup[0] = float('nan')
-            self.lines.sell_setup[0] = float('nan')
+            self.lines.buy_setup[0] = math.nan
+            self.lines.sell_setup[0] = math.nan
             self.lines.buy_signal[0] = 0
             self.lines.sell_signal[0] = 0 
\ No newline at end of file
@@ -0,0 +1,51 @@
+"""
+神奇九转指标向量化计算(once)与逐根计算(next)的一致性测试
+"""
+
+import backtrader as bt
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.indicators import MagicNine
+
+LINES = ('buy_setup', 'sell_setup', 'buy_signal', 'sell_signal')
+
+
+def make_closes(count=2000, seed=11):
+    """生成收盘价，按0.05取整以制造相等价格"""
+    rng = np.random.default_rng(seed)
+    close = np.round((50 + np.cumsum(rng.normal(0, 0.1, count))) * 20) / 20
+    index = pd.date_range('2024-03-04 09:30', periods=count, freq='min')
+    return pd.DataFrame({'open': close, 'high': close, 'low': close, 'close': close, 'volume': 1000.0},
+                        index=index)
+
+
+class RecordMagicNine(bt.Strategy):
+    params = (('period', 2), ('signal_threshold', 5))
+
+    def __init__(self):
+        self.magic_nine = MagicNine(self.data, period=self.p.period,
+                                    signal_threshold=self.p.signal_threshold)
+
+    def stop(self):
+        self.values = {name: np.array(getattr(self.magic_nine.lines, name).array) for name in LINES}
+
+
+def run_indicator(df, runonce, **params):
+    cerebro = bt.Cerebro(stdstats=False, runonce=runonce)
+    cerebro.adddata(bt.feeds.PandasData(dataname=df))
+    cerebro.addstrategy(RecordMagicNine, **params)
+    return cerebro.run()[0].values
+
+
+@pytest.mark.parametrize('period,signal_threshold', [(1, 5), (2, 5), (3, 9), (4, 2)])
+def test_once_matches_next(period, signal_threshold):
+    df = make_closes()
+    vectorized = run_indicator(df, runonce=True, period=period, signal_threshold=signal_threshold)
+    stepwise = run_indicator(df, runonce=False, period=period, signal_threshold=signal_threshold)
+    for name in LINES:
+        assert len(vectorized[name]) == len(stepwise[name]) == len(df)
+        np.testing.assert_array_equal(vectorized[name], stepwise[name], err_msg=name)
+    assert np.nanmax(vectorized['buy_setup']) >= signal_threshold
+    assert np.nansum(vectorized['buy_signal']) > 0
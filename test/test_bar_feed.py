@@ -0,0 +1,134 @@
+"""
+内存K线数据源与CSV数据源的一致性测试
+
+PreloadedBarsData/frame_to_bar_columns替代了prepare_backtrader_data写出CSV
+再由GenericCSVData读入的流程，两者回放的K线和回测结果必须完全一致。
+"""
+
+import math
+from datetime import datetime
+
+import backtrader as bt
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.bar_feed import BAR_FIELDS, PreloadedBarsData, frame_to_bar_columns
+from src.data_fetcher import DataFetcher
+from src.magic_nine_strategy import MagicNineStrategy
+
+SYMBOL = 'TEST'
+
+
+def make_bars(days=3, seed=7):
+    """生成带时区的美股交易时段分钟K线，部分时间带毫秒以覆盖取整逻辑"""
+    rng = np.random.default_rng(seed)
+    index = pd.DatetimeIndex([])
+    for day in pd.bdate_range('2024-03-04', periods=days):
+        session = pd.date_range(day + pd.Timedelta(hours=9, minutes=30), periods=390, freq='min')
+        index = index.append(session)
+    index = index.tz_localize('America/New_York')
+    index = index + pd.to_timedelta(rng.integers(0, 1000, len(index)) * (rng.random(len(index)) < 0.2), unit='ms')
+
+    close = np.round(100 + np.cumsum(rng.normal(0, 0.2, len(index))), 2)
+    open_ = np.round(np.r_[close[0], close[:-1]], 2)
+    high = np.round(np.maximum(open_, close) + rng.random(len(index)) * 0.1, 2)
+    low = np.round(np.minimum(open_, close) - rng.random(len(index)) * 0.1, 2)
+    volume = rng.integers(100, 10000, len(index)).astype(float)
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume},
+                        index=pd.Index(index, name='time'))
+
+
+@pytest.fixture(scope='module')
+def bars():
+    return make_bars()
+
+
+@pytest.fixture(scope='module')
+def csv_file(bars, tmp_path_factory):
+    cache_dir = tmp_path_factory.mktemp('data_cache')
+    fetcher = DataFetcher(None, None, str(cache_dir))
+    return fetcher.prepare_backtrader_data(SYMBOL, df=bars)
+
+
+def csv_feed(csv_file, **kwargs):
+    # 与main.py原先读取CSV的参数一致
+    return bt.feeds.GenericCSVData(
+        dataname=csv_file, datetime=0, open=1, high=2, low=3, close=4, volume=5, openinterest=-1,
+        dtformat='%Y-%m-%d %H:%M:%S', timeframe=bt.TimeFrame.Minutes, **kwargs)
+
+
+def preloaded_feed(bars, **kwargs):
+    return PreloadedBarsData(columns=frame_to_bar_columns(bars), timeframe=bt.TimeFrame.Minutes, **kwargs)
+
+
+class RecordBars(bt.Strategy):
+    """逐根K线记录数据源所有line的值"""
+
+    def start(self):
+        self.records = []
+
+    def next(self):
+        self.records.append(tuple(getattr(self.data.lines, field)[0] for field in BAR_FIELDS))
+
+
+def replay(data, **cerebro_kwargs):
+    cerebro = bt.Cerebro(stdstats=False, **cerebro_kwargs)
+    cerebro.adddata(data)
+    cerebro.addstrategy(RecordBars)
+    return cerebro.run()[0].records
+
+
+def assert_same_bars(expected, actual):
+    assert len(expected) == len(actual)
+    for expected_bar, actual_bar in zip(expected, actual):
+        for expected_value, actual_value in zip(expected_bar, actual_bar):
+            assert expected_value == actual_value or (math.isnan(expected_value) and math.isnan(actual_value))
+
+
+@pytest.mark.parametrize('preload', [True, False])
+def test_bars_match_csv_feed(bars, csv_file, preload):
+    cerebro_kwargs = dict(preload=preload, runonce=preload)
+    expected = replay(csv_feed(csv_file), **cerebro_kwargs)
+    actual = replay(preloaded_feed(bars), **cerebro_kwargs)
+    assert len(actual) == len(bars)
+    assert_same_bars(expected, actual)
+
+
+@pytest.mark.parametrize('preload', [True, False])
+def test_bars_match_csv_feed_with_date_range(bars, csv_file, preload):
+    # 设置日期区间时预加载回退到逐根load，需与CSV数据源的区间过滤一致
+    date_range = dict(fromdate=datetime(2024, 3, 5, 10, 0), todate=datetime(2024, 3, 6, 12, 0))
+    cerebro_kwargs = dict(preload=preload, runonce=preload)
+    expected = replay(csv_feed(csv_file, **date_range), **cerebro_kwargs)
+    actual = replay(preloaded_feed(bars, **date_range), **cerebro_kwargs)
+    assert 0 < len(actual) < len(bars)
+    assert_same_bars(expected, actual)
+
+
+def test_frame_to_bar_columns_naive_index(bars):
+    # 不带时区的索引按原样转换
+    naive = bars.tz_localize(None)
+    assert [list(column) for column in frame_to_bar_columns(naive)[:-1]] == \
+        [list(column) for column in frame_to_bar_columns(bars)[:-1]]
+
+
+def run_backtest(data, **cerebro_kwargs):
+    cerebro = bt.Cerebro(oldbuysell=True, stdstats=False, **cerebro_kwargs)
+    cerebro.broker.setcash(100000.0)
+    cerebro.adddata(data)
+    cerebro.addstrategy(MagicNineStrategy, magic_period=2, enable_short=True)
+    cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name='trade_analyzer')
+    cerebro.addanalyzer(bt.analyzers.DrawDown, _name='drawdown')
+    strategy = cerebro.run()[0]
+    return (cerebro.broker.getvalue(),
+            strategy.analyzers.trade_analyzer.get_analysis(),
+            strategy.analyzers.drawdown.get_analysis())
+
+
+@pytest.mark.parametrize('runonce', [True, False])
+def test_backtest_results_match_csv_feed(bars, csv_file, runonce):
+    expected = run_backtest(csv_feed(csv_file), runonce=runonce)
+    actual = run_backtest(preloaded_feed(bars), runonce=runonce)
+    assert expected[1].total.total > 0  # 确保样本数据产生了交易
+    assert actual == expected